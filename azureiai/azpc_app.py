@@ -1,16 +1,46 @@
 #  ---------------------------------------------------------
 #  Copyright (c) Microsoft Corporation. All rights reserved.
 #  ---------------------------------------------------------
-"""CLI Wrapper for Creating, Updating, or Deleting Azure Managed Applications"""
+"""
+CLI Wrapper for Creating, Updating, or Deleting Azure Managed Applications
 
+Offer CLIs are imported only once a command runs, so help output does not load the swagger client or Azure SDKs.
+"""
+import importlib
 import sys
 
-from azureiai.partner_center import run
-from azureiai.partner_center.offers.application import ApplicationCLI
-from azureiai.partner_center.offers.container import ContainerCLI
-from azureiai.partner_center.offers.managed_app import ManagedAppCLI
-from azureiai.partner_center.offers.solution_template import SolutionTemplateCLI
-from azureiai.partner_center.offers.virtual_machine import VirtualMachineCLI
+from azureiai.managed_apps.clients import close_clients
+from azureiai.managed_apps.sessions import close_sessions
+from azureiai.partner_center import batch, daemon, fleet, run
+
+COMMANDS = {
+    "app": "azureiai.partner_center.offers.application:ApplicationCLI",
+    "ma": "azureiai.partner_center.offers.managed_app:ManagedAppCLI",
+    "vm": "azureiai.partner_center.offers.virtual_machine:VirtualMachineCLI",
+    "st": "azureiai.partner_center.offers.solution_template:SolutionTemplateCLI",
+    "co": "azureiai.partner_center.offers.container:ContainerCLI",
+}
+
+
+def load_cli(subgroup: str):
+    """
+    Import the CLI Parser of a subgroup
+
+    :param subgroup: subgroup name, e.g. ma
+    :return: CLIParser class
+    """
+    module_name, class_name = COMMANDS[subgroup].split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def create_cli(argv: list):
+    """
+    Import and Create the CLI Parser for a command
+
+    :param argv: command line arguments without the program name, e.g. ["ma", "show", "--name", "offer"]
+    :return: CLIParser bound to argv
+    """
+    return load_cli(argv[0])(argv=argv)
 
 
 def main():
@@ -25,20 +55,64 @@ def main():
         st       : Solution Templates
         vm       : Virtual Machine Images
         co       : Containers
+        serve    : Serve commands from a warm background process, 'azpc serve stop' stops it
+        batch    : Run the commands of a JSONL file concurrently, printing NDJSON results
+        fleet    : Update and publish every offer under a directory concurrently, printing NDJSON results
 """
     subgroup = sys.argv[1]
     if subgroup in ["--help", "-h"]:
         return help_text
 
-    commands = {
-        "app": ApplicationCLI,
-        "ma": ManagedAppCLI,
-        "vm": VirtualMachineCLI,
-        "st": SolutionTemplateCLI,
-        "co": ContainerCLI,
-    }
+    if subgroup == "serve":
+        try:
+            print(daemon.serve(execute, sys.argv[2:]), file=sys.stdout)
+        finally:
+            close_clients()
+            close_sessions()
+        return None
+
+    if subgroup in ["batch", "fleet"]:
+        runner = batch if subgroup == "batch" else fleet
+        try:
+            failures = runner.main(sys.argv[2:], create_cli)
+        finally:
+            close_clients()
+            close_sessions()
+        if failures:
+            sys.exit(1)
+        return None
+
+    if subgroup not in COMMANDS:
+        raise KeyError(subgroup)
+    response = daemon.forward(sys.argv[1:])
+    if response is not None:
+        sys.stdout.write(response["stdout"])
+        sys.stderr.write(response["stderr"])
+        if response["status"]:
+            sys.exit(response["status"])
+        return None
+
+    try:
+        execute(sys.argv[1:])
+    finally:
+        close_clients()
+        close_sessions()
+    return None
+
+
+def execute(argv: list):
+    """
+    Run a command in this process
+
+    :param argv: command line arguments without the program name
+    """
     try:
-        print(run(commands[subgroup]()), file=sys.stdout)
+        output = run(create_cli, argv)
+        if isinstance(output, str):
+            print(output, file=sys.stdout)
+        else:
+            for line in output:
+                print(line, file=sys.stdout, flush=True)
     except NameError as error:
         print(error, file=sys.stderr)
         sys.exit(1)
@@ -4,7 +4,20 @@
 
 """
 This module contains general functions for Azure Managed Application publication.
+
+ManagedApplication is imported on first access, so the lightweight helper modules of this package can be imported
+without loading the swagger client.
 """
-from azureiai.managed_apps.managed_app import ManagedApplication
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from azureiai.managed_apps.managed_app import ManagedApplication
 
 __all__ = ["ManagedApplication"]
+
+
+def __getattr__(name):
+    if name == "ManagedApplication":
+        return importlib.import_module("azureiai.managed_apps.managed_app").ManagedApplication
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
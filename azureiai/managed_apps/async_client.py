@@ -0,0 +1,251 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+Async Ingestion API Client
+
+Sends Partner Center ingestion API requests from coroutines, so a single event loop can keep thousands of requests in
+flight. Requests go through the same process-wide rate limiter, circuit breaker and retry policy as the swagger client,
+with every wait awaited instead of slept. The default transport is one aiohttp ClientSession with a bounded connection
+pool, installed with the async extra: pip install az-partner-center-cli[async]. Any object with awaitable
+request(method, url, headers=None, params=None, json=None, data=None) and close() methods can replace it, as long as
+request returns an AsyncResponse.
+
+aiohttp is only imported once the first request is sent.
+"""
+import asyncio
+import json as json_module
+import mimetypes
+import os
+from collections import namedtuple
+
+from azureiai.managed_apps.block_upload import BlockUploader, get_block_size
+from azureiai.managed_apps.circuit_breaker import BREAKER
+from azureiai.managed_apps.paging import NEXT_LINK_KEYS, SKIP_TOKEN, get_skip_token
+from azureiai.managed_apps.rate_limit import RATE_LIMITER
+from azureiai.managed_apps.retry import POLICY, RetryPolicy
+from azureiai.managed_apps.sessions import REGISTRY
+
+INGESTION_URL = "https://api.partner.microsoft.com/v1.0/ingestion"
+MAX_CONNECTIONS = "AZPC_ASYNC_MAX_CONNECTIONS"
+DEFAULT_MAX_CONNECTIONS = 100
+
+
+class AsyncResponse(namedtuple("AsyncResponse", ["status", "headers", "body"])):
+    """Response of an async transport, body holds the raw bytes"""
+
+    def json(self):
+        """Parse the body as JSON, an empty body is an empty dict"""
+        return json_module.loads(self.body) if self.body else {}
+
+
+class AsyncApiError(Exception):
+    """Raised for ingestion API responses with an error status, mirrors swagger_client.rest.ApiException"""
+
+    def __init__(self, response: AsyncResponse, method: str, url: str):
+        super().__init__(f"{method} {url} failed with status {response.status}: {response.body[:500]!r}")
+        self.status = response.status
+        self.headers = response.headers
+        self.body = response.body
+
+
+class AiohttpTransport:
+    """Async HTTP transport on one aiohttp ClientSession, created in the running event loop on first use"""
+
+    def __init__(self, max_connections: int = None, timeout=None):
+        """
+        :param max_connections: connections kept open at once, default: AZPC_ASYNC_MAX_CONNECTIONS or 100
+        :param timeout: (connect, read) timeout in seconds, default: AZPC_HTTP_CONNECT_TIMEOUT, AZPC_HTTP_READ_TIMEOUT
+        """
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._session = None
+
+    async def request(self, method: str, url: str, headers=None, params=None, json=None, data=None) -> AsyncResponse:
+        """
+        Send a request and read its whole body
+
+        :param method: HTTP method
+        :param url: request url
+        :param headers: request headers
+        :param params: query parameters
+        :param json: body serialized as JSON
+        :param data: raw body
+        :return: response
+        """
+        session = self._get_session()
+        async with session.request(method, url, headers=headers, params=params, json=json, data=data) as response:
+            return AsyncResponse(response.status, response.headers, await response.read())
+
+    async def close(self):
+        """Close the ClientSession and its connections"""
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None:
+            try:
+                import aiohttp  # pylint: disable=import-outside-toplevel
+            except ImportError as error:
+                raise ImportError(
+                    "The async client requires aiohttp, install it with: pip install az-partner-center-cli[async]"
+                ) from error
+
+            connect, read = self.timeout or REGISTRY.get_timeout()
+            max_connections = self.max_connections or int(os.getenv(MAX_CONNECTIONS, str(DEFAULT_MAX_CONNECTIONS)))
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=max_connections),
+                timeout=aiohttp.ClientTimeout(sock_connect=connect, sock_read=read),
+            )
+        return self._session
+
+
+class AsyncIngestionClient:
+    """Ingestion API requests from coroutines, shared by every async offer of an event loop"""
+
+    def __init__(self, transport=None, base_url: str = INGESTION_URL, retry_policy: RetryPolicy = None):
+        """
+        :param transport: async transport, default: an AiohttpTransport
+        :param base_url: ingestion API root
+        :param retry_policy: policy retrying throttled and failed requests, default: the process-wide policy
+        """
+        self.transport = transport if transport is not None else AiohttpTransport()
+        self.base_url = base_url
+        self.retry_policy = retry_policy or POLICY
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def request(
+        self, method: str, path: str, authorization: str, params: dict = None, body=None, if_match: str = None
+    ) -> dict:
+        """
+        Call the ingestion API
+
+        :param method: HTTP method
+        :param path: path below the API root, e.g. products/{id}/variants
+        :param authorization: Authorization header contents
+        :param params: query parameters
+        :param body: JSON body
+        :param if_match: etag the resource must still have
+        :return: parsed JSON response
+        """
+        headers = {"Authorization": authorization, "Content-Type": "application/json"}
+        if if_match is not None:
+            headers["If-Match"] = if_match
+        response = await self.send(method, f"{self.base_url}/{path}", headers=headers, params=params, json=body)
+        return response.json()
+
+    async def send(self, method: str, url: str, raise_for_status: bool = True, **kwargs) -> AsyncResponse:
+        """
+        Send a request through the rate limiter, circuit breaker and retry policy
+
+        :param method: HTTP method
+        :param url: request url
+        :param raise_for_status: raise AsyncApiError for error statuses instead of returning the response
+        :param kwargs: passed through to the transport
+        :return: response
+        """
+
+        async def send_once():
+            response = await self.transport.request(method, url, **kwargs)
+            if raise_for_status and response.status >= 400:
+                raise AsyncApiError(response, method, url)
+            return response
+
+        return await self.retry_policy.call_async(
+            lambda: BREAKER.call_async(url, send_once, before=lambda: RATE_LIMITER.acquire_async(url)), method=method
+        )
+
+    async def iter_pages(self, path: str, authorization: str, params: dict = None):
+        """
+        Request every page of a collection, following @odata.nextLink once the previous page is consumed
+
+        :param path: collection path below the API root
+        :param authorization: Authorization header contents
+        :param params: query parameters, such as $filter
+        :return: async generator of pages as dicts
+        """
+        params = dict(params or {})
+        while True:
+            page = await self.request("GET", path, authorization, params=params)
+            yield page
+            next_link = next((page[key] for key in NEXT_LINK_KEYS if page.get(key)), None)
+            skip_token = get_skip_token(next_link) if next_link else None
+            if not skip_token:
+                return
+            params[SKIP_TOKEN] = skip_token
+
+    async def iter_values(self, path: str, authorization: str, params: dict = None):
+        """
+        Iterate over the items of every page of a collection
+
+        :param path: collection path below the API root
+        :param authorization: Authorization header contents
+        :param params: query parameters, such as $filter
+        :return: async generator of items as dicts
+        """
+        async for page in self.iter_pages(path, authorization, params=params):
+            for item in page.get("value") or []:
+                yield item
+
+    async def upload_using_sas(self, sas_url: str, file_name_full_path) -> int:
+        """
+        Upload to Azure Storage Via SAS URL, files larger than the block size are uploaded in blocks on a worker thread
+
+        :param sas_url: Provided by Partner Center
+        :param file_name_full_path: file path to upload
+        :return: return code status, 201 is expected and indicates success
+        """
+        content_type = mimetypes.types_map["." + str(file_name_full_path).rsplit(".", 1)[1]]
+        if os.path.getsize(file_name_full_path) > get_block_size():
+            return await run_blocking(BlockUploader().upload, sas_url, file_name_full_path, content_type)
+        data = await run_blocking(_read_bytes, file_name_full_path)
+        response = await self.send(
+            "PUT",
+            sas_url,
+            raise_for_status=False,
+            headers={"content-type": content_type, "x-ms-blob-type": "BlockBlob"},
+            data=data,
+        )
+        return response.status
+
+    async def close(self):
+        """Close the transport"""
+        await self.transport.close()
+
+
+async def run_blocking(function, *args):
+    """
+    Run a blocking call, such as file I/O under a cache lock, on a worker thread of the running event loop
+
+    :param function: callable to run
+    :param args: positional arguments of the callable
+    :return: result of the callable
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+
+async def gather_all(*awaitables) -> list:
+    """
+    Await several calls concurrently, raising the first error only once every call has finished
+
+    Unlike a plain asyncio.gather, no call is left running in the background after the error is raised.
+
+    :param awaitables: calls to await
+    :return: results in the order of the calls
+    """
+    results = await asyncio.gather(*awaitables, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+def _read_bytes(file_name_full_path) -> bytes:
+    with open(file_name_full_path, "rb") as file:
+        return file.read()
@@ -0,0 +1,164 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+Block Blob Upload
+
+Uploads large files to the SAS URI returned by Partner Center with Put Block and Put Block List. Blocks are uploaded
+concurrently and retried one at a time by the retry policy. Block ids are derived from the block index and content, so
+when an upload to the same SAS URI is repeated, blocks already staged on the blob are not sent again. An upload that
+fails after its block retries with a throttled, server or connection error is started over on the same SAS URI,
+resuming from the blocks staged so far. Other errors, such as 403 for an expired SAS URI, are raised at once.
+"""
+import base64
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING
+from xml.etree import ElementTree  # nosec - only parses Azure Storage block lists
+from xml.sax.saxutils import escape
+
+from azureiai.managed_apps import sessions
+from azureiai.managed_apps.metrics import METRICS
+from azureiai.managed_apps.polling import THROTTLED_STATUS_CODES
+from azureiai.managed_apps.retry import RetryPolicy, get_failure
+from azureiai.managed_apps.utils import get_max_workers
+
+if TYPE_CHECKING:
+    import requests
+
+BLOCK_SIZE = "AZPC_UPLOAD_BLOCK_SIZE"
+UPLOAD_WORKERS = "AZPC_UPLOAD_MAX_WORKERS"
+UPLOAD_RETRIES = "AZPC_UPLOAD_RETRIES"
+UPLOAD_ATTEMPTS = "AZPC_UPLOAD_ATTEMPTS"
+
+DEFAULT_BLOCK_SIZE = 8 * 1024 * 1024
+DEFAULT_RETRIES = 3
+DEFAULT_ATTEMPTS = 3
+RETRY_DELAY = 1.0
+STORAGE_VERSION = "2019-12-12"
+
+
+class BlockUploadError(ConnectionError):
+    """A block request was answered with an unexpected status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class BlockUploader:
+    """Upload a file to a Block Blob SAS URI in blocks"""
+
+    def __init__(self, block_size: int = None, max_workers: int = None, retries: int = None, attempts: int = None):
+        """
+        :param block_size: size of each block, default: AZPC_UPLOAD_BLOCK_SIZE or 8 MiB
+        :param max_workers: blocks uploaded at once, default: AZPC_UPLOAD_MAX_WORKERS or AZPC_MAX_WORKERS
+        :param retries: retries of each block request, default: AZPC_UPLOAD_RETRIES or 3
+        :param attempts: uploads of the whole file to the same SAS URI, default: AZPC_UPLOAD_ATTEMPTS or 3
+        """
+        self.block_size = block_size or get_block_size()
+        self.max_workers = max_workers or int(os.getenv(UPLOAD_WORKERS, str(get_max_workers())))
+        self.retries = retries if retries is not None else int(os.getenv(UPLOAD_RETRIES, str(DEFAULT_RETRIES)))
+        self.attempts = attempts or int(os.getenv(UPLOAD_ATTEMPTS, str(DEFAULT_ATTEMPTS)))
+        self.retry_policy = RetryPolicy(retries=self.retries, base_delay=RETRY_DELAY)
+
+    def upload(self, sas_url: str, file_name_full_path, content_type: str) -> int:
+        """
+        Upload a file with Put Block and Put Block List, resuming from the staged blocks if an attempt fails
+
+        :param sas_url: Provided by Partner Center
+        :param file_name_full_path: file path to upload
+        :param content_type: content type of the blob
+        :return: status code of Put Block List, 201 is expected and indicates success
+        """
+        for attempt in range(1, self.attempts + 1):
+            try:
+                return self._upload_once(sas_url, file_name_full_path, content_type)
+            except OSError as error:
+                if attempt == self.attempts or not _is_transient(error):
+                    raise
+                METRICS.increment("block_upload.resumed")
+                time.sleep(RETRY_DELAY * attempt)
+        raise ValueError(f"{UPLOAD_ATTEMPTS} must be at least 1")
+
+    def get_staged_blocks(self, sas_url: str) -> dict:
+        """
+        Get the blocks already uploaded to a blob but not committed yet
+
+        :param sas_url: Provided by Partner Center
+        :return: dict of block id to block size, empty if the blob does not exist yet
+        """
+        response = self._send(
+            "GET", sas_url, params={"comp": "blocklist", "blocklisttype": "uncommitted"}, allowed=[200, 404]
+        )
+        if response.status_code != 200:
+            return {}
+        blocks = ElementTree.fromstring(response.content).iter("Block")  # nosec
+        return {block.findtext("Name"): int(block.findtext("Size")) for block in blocks}
+
+    def _upload_once(self, sas_url: str, file_name_full_path, content_type: str) -> int:
+        staged = self.get_staged_blocks(sas_url)
+        file_size = os.path.getsize(file_name_full_path)
+        offsets = range(0, file_size, self.block_size)
+        stage_block = partial(self._stage_block, sas_url, file_name_full_path, staged=staged)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            block_ids = list(executor.map(stage_block, range(len(offsets)), offsets))
+        return self._commit(sas_url, block_ids, content_type)
+
+    def _stage_block(self, sas_url, file_name_full_path, index: int, offset: int, staged: dict) -> str:
+        with open(file_name_full_path, "rb") as file:
+            file.seek(offset)
+            data = file.read(self.block_size)
+        digest = hashlib.md5(data).digest()  # nosec - content checksum required by the Put Block API
+        block_id = base64.b64encode(f"{index:08d}-{digest.hex()}".encode("utf8")).decode("utf8")
+        if staged.get(block_id) == len(data):
+            METRICS.increment("block_upload.skipped")
+            return block_id
+        self._send(
+            "PUT",
+            sas_url,
+            params={"comp": "block", "blockid": block_id},
+            data=data,
+            headers={"Content-MD5": base64.b64encode(digest).decode("utf8")},
+            allowed=[201],
+        )
+        METRICS.increment("block_upload.blocks")
+        return block_id
+
+    def _commit(self, sas_url, block_ids: list, content_type: str) -> int:
+        body = "".join(f"<Latest>{escape(block_id)}</Latest>" for block_id in block_ids)
+        response = self._send(
+            "PUT",
+            sas_url,
+            params={"comp": "blocklist"},
+            data=f'<?xml version="1.0" encoding="utf-8"?><BlockList>{body}</BlockList>'.encode("utf8"),
+            headers={"x-ms-blob-content-type": content_type},
+            allowed=[201],
+        )
+        return response.status_code
+
+    def _send(self, method, sas_url, allowed, headers=None, **kwargs) -> "requests.Response":
+        headers = dict(headers or {}, **{"x-ms-version": STORAGE_VERSION})
+        response = sessions.REGISTRY.request(method, sas_url, retry_policy=self.retry_policy, headers=headers, **kwargs)
+        if response.status_code not in allowed:
+            raise BlockUploadError(
+                response.status_code, f"Block upload failed with status {response.status_code}: {response.text[:200]}"
+            )
+        return response
+
+
+def get_block_size() -> int:
+    """Get the size above which files are uploaded in blocks"""
+    return int(os.getenv(BLOCK_SIZE, str(DEFAULT_BLOCK_SIZE)))
+
+
+def _is_transient(error: OSError) -> bool:
+    status = getattr(error, "status", None)
+    if status:
+        return status in THROTTLED_STATUS_CODES or status >= 500
+    if isinstance(error, (FileNotFoundError, IsADirectoryError, PermissionError)):
+        return False
+    return get_failure(error) == "connection"
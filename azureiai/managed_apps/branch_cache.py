@@ -0,0 +1,106 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+Branch Cache
+
+Draft instance ids only change when a submission or a variant is created, so one Branch API response per product and
+module can serve every configuration object in the process until then.
+"""
+import threading
+
+from azureiai.managed_apps.clients import get_api
+from azureiai.managed_apps.metrics import METRICS
+from azureiai.managed_apps.polling import poll_until_ready
+
+
+class BranchCache:
+    """Process-wide cache of draft instance ids keyed by product and module"""
+
+    def __init__(self):
+        self._entries = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, product_id, authorization, module: str) -> dict:
+        """
+        Get every draft instance id of a module, calling the Branch API only on a cache miss
+
+        :param product_id: Application Product ID
+        :param authorization: Authorization object
+        :param module: name of draft instances to look up
+        :return: dict of variant id to draft instance id, the product level draft instance is keyed by None
+        """
+        key = (product_id, module)
+        with self._get_key_lock(key):
+            if key in self._entries:
+                METRICS.increment("branch_cache.hits")
+                return self._entries[key]
+            return self._fetch(product_id, authorization, module)
+
+    def get_variant(self, product_id, authorization, module: str, variant_id: str):
+        """
+        Get the draft instance id of a variant, waiting for its branch if the variant was just created
+
+        :param product_id: Application Product ID
+        :param authorization: Authorization object
+        :param module: name of draft instance to look up
+        :param variant_id: Application Plan ID
+        :return: draft instance id, or None if the variant has no branch for this module
+        """
+        draft_instance_ids = self.get(product_id, authorization, module)
+        if variant_id not in draft_instance_ids:
+            draft_instance_ids = poll_until_ready(
+                lambda: self.refresh(product_id, authorization, module),
+                lambda ids: variant_id in ids,
+                metric="variant_branch",
+            )
+        return draft_instance_ids.get(variant_id)
+
+    def refresh(self, product_id, authorization, module: str) -> dict:
+        """
+        Replace the cached draft instance ids of a module with a fresh Branch API response
+
+        :param product_id: Application Product ID
+        :param authorization: Authorization object
+        :param module: name of draft instances to look up
+        :return: dict of variant id to draft instance id
+        """
+        with self._get_key_lock((product_id, module)):
+            return self._fetch(product_id, authorization, module)
+
+    def invalidate(self, product_id=None):
+        """
+        Drop cached draft instance ids
+
+        :param product_id: drop only this product's entries, default: drop everything
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if product_id is None or key[0] == product_id:
+                    del self._entries[key]
+
+    def _fetch(self, product_id, authorization, module: str) -> dict:
+        from swagger_client import BranchesApi  # pylint: disable=import-outside-toplevel
+
+        METRICS.increment("branch_cache.misses")
+        api_response = get_api(BranchesApi).products_product_id_branches_get_by_module_modulemodule_get(
+            product_id=product_id,
+            module=module,
+            authorization=authorization,
+        )
+        draft_instance_ids: dict = {}
+        for branch in api_response.value:
+            draft_instance_ids.setdefault(branch.variant_id, branch.current_draft_instance_id)
+        if api_response.value:
+            draft_instance_ids.setdefault(None, api_response.value[0].current_draft_instance_id)
+            with self._lock:
+                self._entries[(product_id, module)] = draft_instance_ids
+        return draft_instance_ids
+
+    def _get_key_lock(self, key) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+
+BRANCH_CACHE = BranchCache()
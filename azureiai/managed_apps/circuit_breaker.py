@@ -0,0 +1,238 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+Circuit Breaker
+
+Calls are grouped into endpoint families: the Partner Center collection they address (branches, listings, packages,
+submissions, ...) or, for every other service such as the SAS blob storage host, the host. A family's circuit opens
+after AZPC_BREAKER_FAILURES consecutive server errors, connection errors or, for the Partner Center API, calls slower
+than AZPC_BREAKER_LATENCY seconds. Slow calls to other hosts, such as large blob uploads on a slow uplink, are not
+failures. While it is open, calls to that family fail at once with CircuitOpenError instead of waiting on a degraded
+service. After AZPC_BREAKER_RESET seconds a single probe call is let through: its success closes the circuit, its
+failure opens it again. Client errors such as 404 and 429 throttling do not count as failures.
+
+Circuits are process-wide, so commands run by azpc batch or the daemon share what earlier calls learned.
+"""
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from azureiai.managed_apps.metrics import METRICS
+from azureiai.managed_apps.retry import get_failure
+
+BREAKER_FAILURES = "AZPC_BREAKER_FAILURES"
+BREAKER_LATENCY = "AZPC_BREAKER_LATENCY"
+BREAKER_RESET = "AZPC_BREAKER_RESET"
+
+DEFAULT_FAILURES = 5
+DEFAULT_LATENCY = 60.0
+DEFAULT_RESET = 30.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+PARTNER_CENTER_HOST = "api.partner.microsoft.com"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an endpoint family whose circuit is open"""
+
+    def __init__(self, family: str, retry_in: float):
+        super().__init__(f"Circuit for {family} is open after repeated failures, retry in {retry_in:.0f} seconds")
+        self.family = family
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Thread-safe circuits per endpoint family"""
+
+    def __init__(self, failures: int = None, latency: float = None, reset_timeout: float = None):
+        """
+        :param failures: consecutive failures that open a circuit, default: AZPC_BREAKER_FAILURES or 5
+        :param latency: seconds after which a Partner Center call counts as failed, default: AZPC_BREAKER_LATENCY or 60
+        :param reset_timeout: seconds a circuit stays open before a probe, default: AZPC_BREAKER_RESET or 30
+        """
+        self.failures = failures
+        self.latency = latency
+        self.reset_timeout = reset_timeout
+        self._circuits: dict = {}
+        self._listeners: list = []
+        self._lock = threading.Lock()
+
+    def call(self, url: str, send, before=None):
+        """
+        Call send unless the circuit of the url's endpoint family is open
+
+        :param url: request url, selects the endpoint family
+        :param send: callable sending the request, returning a response or raising
+        :param before: callable run once the call is admitted and not counted in its latency, e.g. a rate limiter. If it
+            raises, the call is not counted and a half-open circuit lets the next call probe instead
+        :return: result of send
+        """
+        family = get_endpoint_family(url)
+        self._admit(family)
+        recorded = False
+        try:
+            if before is not None:
+                before()
+            start = time.monotonic() if urlparse(url).hostname == PARTNER_CENTER_HOST else None
+            try:
+                result = send()
+            except Exception as error:  # pylint: disable=broad-except
+                recorded = True
+                self._record(family, self._is_failure(error, start))
+                raise
+            recorded = True
+            self._record(family, self._is_failure(result, start))
+            return result
+        finally:
+            if not recorded:
+                self._release(family)
+
+    async def call_async(self, url: str, send, before=None):
+        """
+        Await send unless the circuit of the url's endpoint family is open
+
+        :param url: request url, selects the endpoint family
+        :param send: callable returning an awaitable of the response
+        :param before: callable returning an awaitable, run once the call is admitted and not counted in its latency
+        :return: result of send
+        """
+        family = get_endpoint_family(url)
+        self._admit(family)
+        recorded = False
+        try:
+            if before is not None:
+                await before()
+            start = time.monotonic() if urlparse(url).hostname == PARTNER_CENTER_HOST else None
+            try:
+                result = await send()
+            except Exception as error:  # pylint: disable=broad-except
+                recorded = True
+                self._record(family, self._is_failure(error, start))
+                raise
+            recorded = True
+            self._record(family, self._is_failure(result, start))
+            return result
+        finally:
+            if not recorded:
+                self._release(family)
+
+    def get_state(self, family: str) -> str:
+        """
+        Get the state of an endpoint family's circuit
+
+        :param family: endpoint family, e.g. listings
+        :return: closed, open or half_open
+        """
+        with self._lock:
+            return self._circuits.get(family, {}).get("state", CLOSED)
+
+    def add_listener(self, listener):
+        """
+        Subscribe to circuit transitions
+
+        :param listener: callable(family, old_state, new_state)
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Unsubscribe from circuit transitions"""
+        with self._lock:
+            self._listeners.remove(listener)
+
+    def reset(self):
+        """Close every circuit"""
+        with self._lock:
+            self._circuits = {}
+
+    def _admit(self, family: str):
+        with self._lock:
+            circuit = self._get_circuit(family)
+            if circuit["state"] == CLOSED:
+                return
+            retry_in = circuit["opened_at"] + self._get_setting(self.reset_timeout, BREAKER_RESET, DEFAULT_RESET)
+            retry_in -= time.monotonic()
+            if circuit["state"] == HALF_OPEN or retry_in > 0:
+                METRICS.increment("circuit_breaker.rejected")
+                raise CircuitOpenError(family, max(retry_in, 0.0))
+            transition = self._transition(family, circuit, HALF_OPEN)
+        self._notify(transition)
+
+    def _record(self, family: str, failed: bool):
+        transition = None
+        with self._lock:
+            circuit = self._get_circuit(family)
+            if failed:
+                circuit["failures"] += 1
+                threshold = self._get_setting(self.failures, BREAKER_FAILURES, DEFAULT_FAILURES)
+                if circuit["state"] == HALF_OPEN or (circuit["state"] == CLOSED and circuit["failures"] >= threshold):
+                    circuit["opened_at"] = time.monotonic()
+                    transition = self._transition(family, circuit, OPEN)
+            else:
+                circuit["failures"] = 0
+                if circuit["state"] != CLOSED:
+                    transition = self._transition(family, circuit, CLOSED)
+        self._notify(transition)
+
+    def _release(self, family: str):
+        """Give up the probe of a half-open circuit whose call was never sent, so the next call probes instead"""
+        transition = None
+        with self._lock:
+            circuit = self._get_circuit(family)
+            if circuit["state"] == HALF_OPEN:
+                transition = self._transition(family, circuit, OPEN)
+        self._notify(transition)
+
+    def _get_circuit(self, family: str) -> dict:
+        return self._circuits.setdefault(family, {"state": CLOSED, "failures": 0, "opened_at": 0.0})
+
+    def _is_failure(self, outcome, start: float = None) -> bool:
+        """Check if a call failed, its latency counts only when it was timed from start"""
+        status = getattr(outcome, "status", None) or getattr(outcome, "status_code", None)
+        if get_failure(outcome) in ["server_error", "connection"] or status == 503:
+            return True
+        if start is None:
+            return False
+        return time.monotonic() - start > self._get_setting(self.latency, BREAKER_LATENCY, DEFAULT_LATENCY)
+
+    def _transition(self, family: str, circuit: dict, state: str):
+        old_state, circuit["state"] = circuit["state"], state
+        METRICS.increment(f"circuit_breaker.{state}")
+        return family, old_state, state, list(self._listeners)
+
+    @staticmethod
+    def _notify(transition):
+        if transition is None:
+            return
+        family, old_state, state, listeners = transition
+        for listener in listeners:
+            listener(family, old_state, state)
+
+    @staticmethod
+    def _get_setting(value, env_name, default):
+        if value is not None:
+            return value
+        return float(os.getenv(env_name, str(default)))
+
+
+def get_endpoint_family(url: str) -> str:
+    """
+    Get the endpoint family of a request
+
+    :param url: request url
+    :return: Partner Center collection, e.g. branches for .../products/{id}/branches/getByModule(...), or the host
+    """
+    parsed = urlparse(url)
+    if parsed.hostname != PARTNER_CENTER_HOST:
+        return parsed.hostname or ""
+    segments = [segment for segment in parsed.path.split("/") if segment]
+    index = segments.index("products") + 2 if "products" in segments else len(segments)
+    return segments[index].split("(")[0].lower() if index < len(segments) else "products"
+
+
+BREAKER = CircuitBreaker()
@@ -0,0 +1,134 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+Shared Swagger API Clients
+
+Every swagger API object is bound to a single process-wide ApiClient, so all calls made during one command reuse the
+same keep-alive connection pool instead of opening a new pool per API object. Requests are rate limited, retried, and
+fail fast while their endpoint is down. The swagger client package is large, so it is only imported once the first API
+object is requested.
+"""
+import os
+import threading
+from typing import TYPE_CHECKING, Optional
+
+from azureiai.managed_apps.circuit_breaker import BREAKER
+from azureiai.managed_apps.rate_limit import RATE_LIMITER
+from azureiai.managed_apps.retry import POLICY
+
+if TYPE_CHECKING:
+    from swagger_client import ApiClient
+
+POOL_MAXSIZE = "AZPC_POOL_MAXSIZE"
+DEFAULT_POOL_MAXSIZE = 16
+
+
+class ClientRegistry:
+    """Process-wide registry of swagger API objects sharing one ApiClient"""
+
+    def __init__(self, pool_maxsize: int = None):
+        self.pool_maxsize = pool_maxsize
+        self._client: Optional["ApiClient"] = None
+        self._apis: dict = {}
+        self._lock = threading.RLock()
+
+    def configure(self, pool_maxsize: int = None):
+        """
+        Configure the shared client. Any open client is closed and rebuilt on next use.
+
+        :param pool_maxsize: maximum number of connections kept alive per host
+        """
+        with self._lock:
+            self.close()
+            self.pool_maxsize = pool_maxsize
+
+    def get_client(self) -> "ApiClient":
+        """
+        Get or Create the shared ApiClient
+
+        :return: ApiClient shared by every registered API object
+        """
+        with self._lock:
+            if self._client is None:
+                from swagger_client import ApiClient, Configuration  # pylint: disable=import-outside-toplevel
+
+                configuration = Configuration()
+                configuration.connection_pool_maxsize = self._get_pool_maxsize()
+                self._client = ApiClient(configuration=configuration)
+                self._client.set_default_header("Connection", "keep-alive")
+                _retry_requests(self._client.rest_client)
+            return self._client
+
+    def get_api(self, api_type):
+        """
+        Get or Create a swagger API object bound to the shared ApiClient
+
+        :param api_type: swagger API class, e.g. ProductApi
+        :return: API object of the requested type
+        """
+        with self._lock:
+            if api_type not in self._apis:
+                self._apis[api_type] = api_type(api_client=self.get_client())
+            return self._apis[api_type]
+
+    def close(self):
+        """Close pooled connections and release the shared ApiClient"""
+        with self._lock:
+            if self._client is not None:
+                self._client.rest_client.pool_manager.clear()
+            self._client = None
+            self._apis = {}
+
+    def _get_pool_maxsize(self) -> int:
+        if self.pool_maxsize is not None:
+            return self.pool_maxsize
+        return int(os.getenv(POOL_MAXSIZE, str(DEFAULT_POOL_MAXSIZE)))
+
+
+def _retry_requests(rest_client):
+    """Send every request of a swagger RESTClientObject through the circuit breaker, rate limiter and retry policy"""
+
+    def send(method, url, *args, **kwargs):
+        return BREAKER.call(
+            url,
+            lambda: type(rest_client).request(rest_client, method, url, *args, **kwargs),
+            before=lambda: RATE_LIMITER.acquire(url),
+        )
+
+    def request(method, url, *args, **kwargs):
+        return POLICY.call(lambda: send(method, url, *args, **kwargs), method=method)
+
+    rest_client.request = request
+
+
+REGISTRY = ClientRegistry()
+
+
+def get_api(api_type):
+    """
+    Get a swagger API object bound to the process-wide ApiClient
+
+    :param api_type: swagger API class, e.g. ProductApi
+    :return: API object of the requested type
+    """
+    return REGISTRY.get_api(api_type)
+
+
+def get_api_client() -> "ApiClient":
+    """Get the process-wide ApiClient"""
+    return REGISTRY.get_client()
+
+
+def configure_clients(pool_maxsize: int = None):
+    """
+    Configure the process-wide ApiClient
+
+    :param pool_maxsize: maximum number of connections kept alive per host
+    """
+    REGISTRY.configure(pool_maxsize=pool_maxsize)
+
+
+def close_clients():
+    """Close the process-wide ApiClient and its connection pool"""
+    REGISTRY.close()
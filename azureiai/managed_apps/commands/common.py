@@ -8,8 +8,11 @@ Use add parser argument methods to build arg parser for new commands.
 """
 import os
 from argparse import ArgumentParser
+from pathlib import Path
 
-from azureiai.managed_apps import ManagedApplication
+import yaml
+
+from azureiai.managed_apps import ManagedApplication, schema
 
 
 def add_image_toggle(parser: ArgumentParser):
@@ -98,4 +101,17 @@ def _load_ama(parser):
     manifest_yml = args.manifest_yml
     if not os.path.isfile(manifest_yml):
         raise FileNotFoundError("Manifest File not found: ", manifest_yml)
+    _validate(config_yml, manifest_yml)
     return ama, config_yml, manifest_yml, args
+
+
+def _validate(config_yml, manifest_yml):
+    """Check the configuration, manifest and listing files against their schemas before any API call"""
+    if not schema.is_enabled():
+        return
+    schema.validate_file(config_yml, schema.CONFIG_SCHEMA)
+    with open(manifest_yml, encoding="utf8") as file:
+        manifest = yaml.safe_load(file)
+    schema.validate(manifest, schema.MANIFEST_SCHEMA, manifest_yml)
+    listing_config = Path(manifest.get("app_path") or ".").joinpath(manifest["json_listing_config"])
+    schema.validate_file(listing_config, schema.LISTING_CONFIG_SCHEMA)
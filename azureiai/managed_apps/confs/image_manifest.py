@@ -0,0 +1,65 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+Listing Image Manifest
+
+Records the content hash of every uploaded listing image, so unchanged images are not uploaded again.
+"""
+import hashlib
+from pathlib import Path
+
+from azureiai.managed_apps.file_cache import get_cache_dir, locked, read_json, write_json
+
+MANIFEST_FILE = "listing_images.json"
+
+
+def file_sha256(file_name_full_path) -> str:
+    """
+    Hash a file without loading it into memory
+
+    :param file_name_full_path: file path to hash
+    :return: hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(file_name_full_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImageManifest:
+    """Local record of uploaded listing images keyed by product and logo type"""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else get_cache_dir().joinpath(MANIFEST_FILE)
+
+    def get(self, product_id, logo_type) -> dict:
+        """
+        Get the recorded upload of a logo
+
+        :param product_id: Application Product ID
+        :param logo_type: image logo type, e.g. AzureLogoLarge
+        :return: dict with file_name, sha256 and image_id, or None
+        """
+        with locked(self.path):
+            return read_json(self.path).get(product_id, {}).get(logo_type)
+
+    def record(self, product_id, logo_type, file_name, sha256, image_id):
+        """
+        Record an uploaded logo
+
+        :param product_id: Application Product ID
+        :param logo_type: image logo type, e.g. AzureLogoLarge
+        :param file_name: name of file
+        :param sha256: hex digest of the file contents
+        :param image_id: listing image id returned by Partner Center
+        """
+        with locked(self.path):
+            manifest = read_json(self.path)
+            manifest.setdefault(product_id, {})[logo_type] = {
+                "file_name": file_name,
+                "sha256": sha256,
+                "image_id": image_id,
+            }
+            write_json(self.path, manifest)
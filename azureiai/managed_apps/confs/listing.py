@@ -2,10 +2,10 @@
 #  Copyright (c) Microsoft Corporation. All rights reserved.
 #  ---------------------------------------------------------
 """Listing Configuration for Offer Settings"""
-import json
 import os
 
 from azureiai.managed_apps.confs.offer_configurations import ListingOfferConfigurations
+from azureiai.managed_apps.listing_config import load_listing_config
 
 
 class Listing(ListingOfferConfigurations):
@@ -22,31 +22,43 @@ class Listing(ListingOfferConfigurations):
     def set(self, properties="listing_config.json"):
         """Set Availability for Application
 
-        :param properties: path to configuration json
+        :param properties: path to configuration json, or the parsed listing configuration
         """
         super().set(properties=properties)
 
     def _get_properties(self, properties):
-        if not os.path.isfile(properties):
+        if isinstance(properties, dict):
+            listing_config = properties
+        elif not os.path.isfile(properties):
             raise FileNotFoundError("Listing Configuration Not Found")
+        else:
+            listing_config = load_listing_config(properties)
         settings = self.get()
         odata_etag = settings.odata_etag
         settings_id = settings.id
-        with open(properties, "r", encoding="utf8") as read_file:
-            listing_config = json.load(read_file)
-
-            properties = {
-                "resourceType": "AzureListing",
-                "title": listing_config["offer_listing"]["title"],
-                "publisherName": listing_config["offer_listing"]["publisher_name"],
-                "summary": listing_config["offer_listing"]["summary"],
-                "shortDescription": listing_config["offer_listing"]["short_description"],
-                "description": listing_config["offer_listing"]["description"],
-                "keywords": listing_config["offer_listing"]["keywords"],
-                "listingContacts": listing_config["offer_listing"]["listing_contacts"],
-                "listingUris": listing_config["offer_listing"]["listing_uris"],
-                "languageCode": "en-us",
-                "@odata.etag": odata_etag,
-                "id": settings_id,
-            }
-        return odata_etag, properties, settings_id
+        return odata_etag, self.get_body(listing_config, odata_etag, settings_id), settings_id
+
+    @staticmethod
+    def get_body(listing_config, odata_etag, settings_id) -> dict:
+        """
+        Create the Listing request body
+
+        :param listing_config: parsed listing configuration
+        :param odata_etag: etag of the current listing
+        :param settings_id: listing id
+        :return: AzureListing body
+        """
+        return {
+            "resourceType": "AzureListing",
+            "title": listing_config["offer_listing"]["title"],
+            "publisherName": listing_config["offer_listing"]["publisher_name"],
+            "summary": listing_config["offer_listing"]["summary"],
+            "shortDescription": listing_config["offer_listing"]["short_description"],
+            "description": listing_config["offer_listing"]["description"],
+            "keywords": listing_config["offer_listing"]["keywords"],
+            "listingContacts": listing_config["offer_listing"]["listing_contacts"],
+            "listingUris": listing_config["offer_listing"]["listing_uris"],
+            "languageCode": "en-us",
+            "@odata.etag": odata_etag,
+            "id": settings_id,
+        }
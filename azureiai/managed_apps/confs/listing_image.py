@@ -3,10 +3,14 @@
 #  ---------------------------------------------------------
 """Managed Application Offer - Listing Image Configuration"""
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from azureiai.managed_apps.clients import get_api
+from azureiai.managed_apps.confs.image_manifest import ImageManifest, file_sha256
 from azureiai.managed_apps.confs.listing import Listing
 from azureiai.managed_apps.confs.offer_configurations import OfferConfigurations
+from azureiai.managed_apps.utils import get_max_workers
 from swagger_client import ListingImageApi
 
 
@@ -16,34 +20,81 @@ class ListingImage(OfferConfigurations):
     def __init__(self, product_id, authorization):
         super().__init__(product_id, authorization)
 
-        self.listing_image_api = ListingImageApi()
+        self.listing_image_api = get_api(ListingImageApi)
         self.list = Listing(product_id, authorization)
 
         self._settings = None
         self.settings_id = None
+        self._listing_id = None
+        self.manifest = ImageManifest()
 
-    def set(self, file_name, file_path, logo_type):
+    def get_listing_id(self) -> str:
+        """
+        Get Listing ID, resolved once per Listing Image Configuration
+
+        :return: listing id of the offer listing
+        """
+        if self._listing_id is None:
+            self._listing_id = self.list.get().id
+        return self._listing_id
+
+    def set(self, file_name, file_path, logo_type, force=False):
         """
         Set Listing Image Configuration
 
         :param file_name: name of file
         :param file_path: path to file
         :param logo_type: image logo type: [large, medium, small, wide]
-        :return: api_response
+        :param force: upload the image even if it has not changed since the last upload
+        :return: api_response, or None if the image has not changed
+        """
+        return self.set_logos({logo_type: file_name}, file_path, force=force)[logo_type]
+
+    def set_logos(self, logos: dict, file_path, force=False):
         """
+        Set several Listing Images at once
+
+        The existing images are listed once, images whose content hash matches the last upload are left in place,
+        stale images are deleted and the new images are uploaded concurrently.
+
+        :param logos: dict of image logo type to name of file, e.g. {"AzureLogoLarge": "large.png"}
+        :param file_path: path to files
+        :param force: upload every image even if it has not changed since the last upload
+        :return: dict of image logo type to api_response, None for images that have not changed
+        """
+        images = [
+            (getattr(image, "id", None), image.file_name, getattr(image, "state", None)) for image in self._get_images()
+        ]
+        hashes, changed, stale_ids = get_logo_changes(self.product_id, file_path, logos, images, force)
+        self._delete_images(stale_ids)
+        with ThreadPoolExecutor(max_workers=get_max_workers()) as executor:
+            futures = {
+                logo_type: executor.submit(self._upload, file_name, file_path, logo_type, hashes[logo_type])
+                for logo_type, file_name in changed.items()
+            }
+            responses = {logo_type: future.result() for logo_type, future in futures.items()}
+        return {logo_type: responses.get(logo_type) for logo_type in logos}
+
+    def _get_images(self):
+        return self.listing_image_api.products_product_id_listings_listing_id_images_get(
+            authorization=self.authorization, product_id=self.product_id, listing_id=self.get_listing_id()
+        ).value
 
-        api_response = self.listing_image_api.products_product_id_listings_listing_id_images_get(
-            authorization=self.authorization, product_id=self.product_id, listing_id=self.list.get().id
+    def _delete_images(self, image_ids):
+        if not image_ids:
+            return
+        with ThreadPoolExecutor(max_workers=get_max_workers()) as executor:
+            list(executor.map(self._delete_image, image_ids))
+
+    def _delete_image(self, image_id):
+        return self.listing_image_api.products_product_id_listings_listing_id_images_image_id_delete(
+            authorization=self.authorization,
+            product_id=self.product_id,
+            listing_id=self.get_listing_id(),
+            image_id=image_id,
         )
-        for value in api_response.value:
-            if value.file_name == file_name:
-                self.listing_image_api.products_product_id_listings_listing_id_images_image_id_delete(
-                    authorization=self.authorization,
-                    product_id=self.product_id,
-                    listing_id=self.list.get().id,
-                    image_id=value.id,
-                )
 
+    def _upload(self, file_name, file_path, logo_type, sha256):
         image_id = str(uuid.uuid4())
 
         body = {
@@ -58,7 +109,7 @@ class ListingImage(OfferConfigurations):
         api_response = self.listing_image_api.products_product_id_listings_listing_id_images_post(
             authorization=self.authorization,
             product_id=self.product_id,
-            listing_id=self.list.get().id,
+            listing_id=self.get_listing_id(),
             body=body,
         )
         status_code = self.upload_using_sas(api_response.file_sas_uri, Path(file_path).joinpath(file_name))
@@ -75,11 +126,54 @@ class ListingImage(OfferConfigurations):
             "id": api_response.id,
         }
 
-        return self.listing_image_api.products_product_id_listings_listing_id_images_image_id_put(
+        put_response = self.listing_image_api.products_product_id_listings_listing_id_images_image_id_put(
             authorization=self.authorization,
             if_match=api_response.odata_etag,
             product_id=self.product_id,
-            listing_id=self.list.get().id,
+            listing_id=self.get_listing_id(),
             image_id=api_response.id,
             body=body,
         )
+        self.manifest.record(self.product_id, logo_type, file_name, sha256, api_response.id)
+        return put_response
+
+
+def get_logo_changes(product_id: str, file_path, logos: dict, images: list, force=False) -> tuple:
+    """
+    Find the Listing Images to upload, shared by ListingImage and AsyncSubmission so both skip the same images
+
+    Blocking file I/O, the logo files are hashed and their last uploads are read from the Image Manifest.
+
+    :param product_id: Application Product ID
+    :param file_path: path to files
+    :param logos: dict of image logo type to name of file, e.g. {"AzureLogoLarge": "large.png"}
+    :param images: existing images of the listing as (id, file name, state) tuples
+    :param force: upload every image even if it has not changed since the last upload
+    :return: dict of logo type to content hash, dict of logo type to name of file to upload, ids of images to delete
+    """
+    manifest = ImageManifest()
+    hashes = {logo_type: file_sha256(Path(file_path).joinpath(file_name)) for logo_type, file_name in logos.items()}
+    uploaded = {logo_type: manifest.get(product_id, logo_type) for logo_type in logos}
+    unchanged = set()
+    if not force:
+        unchanged = {
+            logo_type
+            for logo_type, file_name in logos.items()
+            if _is_unchanged(uploaded[logo_type], images, file_name, hashes[logo_type])
+        }
+    changed = {logo_type: file_name for logo_type, file_name in logos.items() if logo_type not in unchanged}
+    kept_ids = {uploaded[logo_type]["image_id"] for logo_type in unchanged}
+    stale_ids = [
+        image_id for image_id, file_name, _ in images if image_id not in kept_ids and file_name in changed.values()
+    ]
+    return hashes, changed, stale_ids
+
+
+def _is_unchanged(uploaded: dict, images: list, file_name: str, sha256: str) -> bool:
+    """Check if the last upload of a logo is the same file and still listed"""
+    if not uploaded or uploaded["file_name"] != file_name or uploaded["sha256"] != sha256:
+        return False
+    return any(
+        image_id == uploaded["image_id"] and image_file_name == file_name and state != "ProcessFailed"
+        for image_id, image_file_name, state in images
+    )
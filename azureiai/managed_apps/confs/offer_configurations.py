@@ -7,9 +7,9 @@ import os
 from abc import abstractmethod
 from collections import namedtuple
 
-import requests
-from azure.storage.blob import ContentSettings  # noqa
-
+from azureiai.managed_apps import sessions
+from azureiai.managed_apps.block_upload import BlockUploader, get_block_size
+from azureiai.managed_apps.clients import get_api
 from azureiai.managed_apps.utils import get_draft_instance_id
 from swagger_client import BranchesApi, ListingApi
 from swagger_client.rest import ApiException
@@ -22,7 +22,7 @@ class OfferConfigurations:
         self.product_id = product_id
         self.authorization = authorization
 
-        self.branches_api = BranchesApi()
+        self.branches_api = get_api(BranchesApi)
         self.module = None
 
         self.get_instance = self.instance
@@ -35,13 +35,13 @@ class OfferConfigurations:
         """Abstract Method to get Instance"""
         return namedtuple("response", ["value", "odata_etag", "id"])(*[[product_id], instance_id, authorization])
 
-    def _get_draft_instance_id(self, module, retry=0):
-        return get_draft_instance_id(self.product_id, self.authorization, module, retry)
+    def _get_draft_instance_id(self, module):
+        return get_draft_instance_id(self.product_id, self.authorization, module)
 
     @staticmethod
     def upload_using_sas(sas_url, file_name_full_path):
         """
-        Upload to Azure Storage Via SAS URL
+        Upload to Azure Storage Via SAS URL, files larger than the block size are uploaded in blocks
 
         :param sas_url: Provided by Partner Center
         :param file_name_full_path: file path to upload
@@ -49,14 +49,17 @@ class OfferConfigurations:
         """
         file_name_only = os.path.basename(file_name_full_path)
         file_ext = "." + file_name_only.rsplit(".", 1)[1]
-        content_type_string = ContentSettings(content_type=mimetypes.types_map[file_ext])
+        content_type = mimetypes.types_map[file_ext]
+
+        if os.path.getsize(file_name_full_path) > get_block_size():
+            return BlockUploader().upload(sas_url, file_name_full_path, content_type)
 
         with open(file_name_full_path, "rb") as file:
-            response = requests.put(
+            response = sessions.put(
                 sas_url,
                 data=file,
                 headers={
-                    "content-type": content_type_string.content_type,
+                    "content-type": content_type,
                     "x-ms-blob-type": "BlockBlob",
                 },
                 params={"file": file_name_full_path},
@@ -80,7 +83,7 @@ class ListingOfferConfigurations(OfferConfigurations):
 
     def __init__(self, product_id, authorization):
         super().__init__(product_id=product_id, authorization=authorization)
-        self.api = ListingApi()
+        self.api = get_api(ListingApi)
 
     def set(self, properties):
         """Set Availability for Application"""
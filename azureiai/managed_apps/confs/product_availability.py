@@ -2,6 +2,7 @@
 #  Copyright (c) Microsoft Corporation. All rights reserved.
 #  ---------------------------------------------------------
 """Product Availability settings for Offer Configuration"""
+from azureiai.managed_apps.clients import get_api
 from azureiai.managed_apps.confs.offer_configurations import OfferConfigurations
 from swagger_client import ProductAvailabilityApi
 
@@ -12,7 +13,7 @@ class ProductAvailability(OfferConfigurations):
     def __init__(self, product_id, authorization):
         super().__init__(product_id, authorization)
 
-        self.api = ProductAvailabilityApi()
+        self.api = get_api(ProductAvailabilityApi)
         self.module = "Availability"
         self.get_instance = (
             self.api.products_product_id_product_availabilities_get_by_instance_id_instance_i_dinstance_id_get
@@ -35,13 +36,7 @@ class ProductAvailability(OfferConfigurations):
         odata_etag = settings.odata_etag
         settings_id = settings.id
 
-        properties = {
-            "resourceType": "ProductAvailability",
-            "visibility": visibility,
-            "audiences": [{"Type": "PreviewMarketplaceGroup", "Values": azure_subscription}],
-            "@odata.etag": odata_etag,
-            "id": settings_id,
-        }
+        properties = self.get_body(azure_subscription, visibility, odata_etag, settings_id)
         self.api.products_product_id_productavailabilities_product_availability_id_put(
             authorization=self.authorization,
             if_match=odata_etag,
@@ -49,3 +44,22 @@ class ProductAvailability(OfferConfigurations):
             product_availability_id=settings_id,
             body=properties,
         )
+
+    @staticmethod
+    def get_body(azure_subscription, visibility, odata_etag, settings_id) -> dict:
+        """
+        Create the Product Availability request body
+
+        :param azure_subscription: Azure Subscriptions with access to Azure Managed Application
+        :param visibility: Public or Private
+        :param odata_etag: etag of the current availability
+        :param settings_id: product availability id
+        :return: ProductAvailability body
+        """
+        return {
+            "resourceType": "ProductAvailability",
+            "visibility": visibility,
+            "audiences": [{"Type": "PreviewMarketplaceGroup", "Values": azure_subscription}],
+            "@odata.etag": odata_etag,
+            "id": settings_id,
+        }
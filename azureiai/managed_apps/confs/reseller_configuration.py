@@ -4,6 +4,7 @@
 """Reseller Settings for Plan configurations"""
 import os
 
+from azureiai.managed_apps.clients import get_api
 from azureiai.managed_apps.confs.offer_configurations import OfferConfigurations
 from swagger_client import ResellerConfigurationApi
 
@@ -15,7 +16,7 @@ class ResellerConfiguration(OfferConfigurations):
 
     def __init__(self, product_id, authorization):
         super().__init__(product_id, authorization)
-        self.api = ResellerConfigurationApi()
+        self.api = get_api(ResellerConfigurationApi)
 
     def get(self):
         """Get Availability for Application"""
@@ -29,20 +30,30 @@ class ResellerConfiguration(OfferConfigurations):
 
         :param reseller_channel_state: must be one of ['PartialOptIn', 'Disabled', 'OptIn']
         """
+        properties = self.get_body(reseller_channel_state)
+
+        self.api.products_product_id_reseller_configuration_post(
+            authorization=self.authorization,
+            product_id=self.product_id,
+            body=properties,
+        )
+
+    @staticmethod
+    def get_body(reseller_channel_state=DEFAULT_STATE) -> dict:
+        """
+        Create the Reseller Configuration request body
+
+        :param reseller_channel_state: one of ['PartialOptIn', 'Disabled', 'OptIn'], overridden by RESELLER_CHANNEL
+        :return: ResellerConfiguration body
+        """
         reseller_channel_state = os.getenv("RESELLER_CHANNEL", reseller_channel_state)
         if reseller_channel_state not in ["PartialOptIn", "Disabled", "Enabled"]:
             raise ValueError(
                 "Not a known value, expected one of the following: 'PartialOptIn', 'Disabled', 'Enabled'; but got ",
                 reseller_channel_state,
             )
-        properties = {
+        return {
             "resourceType": "ResellerConfiguration",
             "ResellerChannelState": reseller_channel_state,
             "TenantIds": [],
         }
-
-        self.api.products_product_id_reseller_configuration_post(
-            authorization=self.authorization,
-            product_id=self.product_id,
-            body=properties,
-        )
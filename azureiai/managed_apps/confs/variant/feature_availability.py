@@ -5,6 +5,7 @@
 import json
 from pathlib import Path
 
+from azureiai.managed_apps.clients import get_api
 from azureiai.managed_apps.confs.variant.variant_plan_configuration import (
     VariantPlanConfiguration,
 )
@@ -19,7 +20,7 @@ class FeatureAvailability(VariantPlanConfiguration):
 
     def __init__(self, product_id, plan_id, authorization, subtype="ma"):
         super().__init__(product_id, plan_id, authorization, subtype)
-        self.fa_api = FeatureAvailabilityApi()
+        self.fa_api = get_api(FeatureAvailabilityApi)
 
     def get(self):
         """Get Availability for Application"""
@@ -47,8 +48,31 @@ class FeatureAvailability(VariantPlanConfiguration):
         odata_etag = settings.odata_etag
         settings_id = settings.id
 
-        if self.subtype == "ma":
-            market_states = self.get_markets()
+        body = self.get_body(azure_subscription, visibility, odata_etag, settings_id, subtype=self.subtype)
+
+        self.fa_api.products_product_id_featureavailabilities_feature_availability_id_put(
+            authorization=self.authorization,
+            if_match=odata_etag,
+            product_id=self.product_id,
+            feature_availability_id=settings_id,
+            body=body,
+            expand="MarketStates,Trial,PriceSchedules",
+        )
+
+    @staticmethod
+    def get_body(azure_subscription, visibility, odata_etag, settings_id, subtype="ma") -> dict:
+        """
+        Create the Feature Availability request body
+
+        :param azure_subscription: Azure Subscriptions with access to application
+        :param visibility: Public or Private
+        :param odata_etag: etag of the current feature availability
+        :param settings_id: feature availability id
+        :param subtype: ma enables the Canada and United States markets with free price schedules
+        :return: FeatureAvailability body
+        """
+        if subtype == "ma":
+            market_states = FeatureAvailability.get_markets()
             # Canada
             market_states[23]["state"] = "Enabled"
             # United States
@@ -101,15 +125,7 @@ class FeatureAvailability(VariantPlanConfiguration):
 
         if visibility == "Private":
             body["subscriptionAudiences"] = azure_subscription
-
-        self.fa_api.products_product_id_featureavailabilities_feature_availability_id_put(
-            authorization=self.authorization,
-            if_match=odata_etag,
-            product_id=self.product_id,
-            feature_availability_id=settings_id,
-            body=body,
-            expand="MarketStates,Trial,PriceSchedules",
-        )
+        return body
 
     @staticmethod
     def get_markets():
@@ -22,6 +22,7 @@ class OfferListing(VariantPlanConfiguration, ListingOfferConfigurations):
         settings = self.get()
         odata_etag = settings.odata_etag
         settings_id = settings.id
+        properties = dict(properties)
         properties["@odata.etag"] = odata_etag
         properties["id"] = settings_id
         return odata_etag, properties, settings_id
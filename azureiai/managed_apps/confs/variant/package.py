@@ -2,25 +2,39 @@
 #  Copyright (c) Microsoft Corporation. All rights reserved.
 #  ---------------------------------------------------------
 """Configuration for Package settings in Plan Settings"""
+import copy
 import os
 import re
 import shutil
-import time
+import sys
+import tempfile
 import zipfile
 from pathlib import Path
 
 import yaml
 
+from azureiai.managed_apps.clients import get_api
 from azureiai.managed_apps.confs.offer_configurations import OfferConfigurations
 from azureiai.managed_apps.confs.variant.variant_plan_configuration import (
     VariantPlanConfiguration,
 )
+from azureiai.managed_apps.listing_config import ListingConfig
+from azureiai.managed_apps.polling import poll_until_ready
 from azureiai.managed_apps.utils import ACCESS_ID, TENANT_ID
 from swagger_client import PackageApi, PackageConfigurationApi
 from swagger_client.rest import ApiException
 
+TEMPLATE_NAME = "mainTemplate.json"
+COPY_CHUNK_SIZE = 1024 * 1024
+PROCESSING_INITIAL_DELAY = 2.0
+PROCESSING_MAX_DELAY = 15.0
+PROCESSING_TIMEOUT = 60 * 5
+# newest Python whose ZipFile internals the raw entry copy has been checked against
+RAW_COPY_MAX_VERSION = (3, 13)
+RAW_COPY_ATTRIBUTES = ["fp", "filelist", "NameToInfo", "start_dir", "_didModify"]
 
-def _inject_pid(file_name_full_path, pid):
+
+def inject_pid(file_name_full_path, pid, output_full_path):
     """
     Add PID to ARM template. For more details see this link. GUID registration information on this page is out of date.
     https://docs.microsoft.com/en-us/azure/marketplace/azure-partner-customer-usage-attribution
@@ -28,21 +42,81 @@ def _inject_pid(file_name_full_path, pid):
     This will find and replace the term "pid-GUID-partnercenter". If this is not present in the template, this method
     will have no effect.
 
+    The source zip is left untouched. Every entry other than mainTemplate.json is copied into the output zip as raw
+    compressed bytes, so only the template is decompressed and recompressed. On Python versions whose ZipFile
+    internals have not been checked, entries are recompressed instead.
+
     :param file_name_full_path: Full file path to zip of Azure Managed Application.
     :param pid: Managed Application PID to be injected into ARM Template.
+    :param output_full_path: Full file path of the zip to write, must differ from the source zip.
     """
-    with zipfile.ZipFile(file_name_full_path, "r") as zip_ref:
-        zip_ref.extractall(file_name_full_path.replace(".zip", "-temp"))
-    with open(file_name_full_path.replace(".zip", "-temp/mainTemplate.json"), "rt", encoding="utf8") as fin:
-        data = fin.read()
-        data = re.sub(r"pid-(.*)-partnercenter", "pid-" + pid + "-partnercenter", data)
+    with zipfile.ZipFile(file_name_full_path, "r") as zip_in, zipfile.ZipFile(output_full_path, "w") as zip_out:
+        entries = sorted(zip_in.infolist(), key=lambda info: info.header_offset)
+        entry_ends = [info.header_offset for info in entries[1:]] + [zip_in.start_dir]
+        raw_copy = _supports_raw_copy(zip_out)
+        with open(file_name_full_path, "rb") as source:
+            for info, entry_end in zip(entries, entry_ends):
+                if info.filename == TEMPLATE_NAME:
+                    data = zip_in.read(info).decode("utf8")
+                    data = re.sub(r"pid-(.*)-partnercenter", "pid-" + pid + "-partnercenter", data)
+                    template = zipfile.ZipInfo(info.filename, info.date_time)
+                    template.compress_type = info.compress_type
+                    template.external_attr = info.external_attr
+                    zip_out.writestr(template, data)
+                elif raw_copy:
+                    _copy_raw_entry(source, zip_out, info, entry_end)
+                else:
+                    _recompress_entry(zip_in, zip_out, info)
+
+
+def _supports_raw_copy(zip_out: zipfile.ZipFile) -> bool:
+    """Check that the private ZipFile members the raw entry copy writes to exist in this Python"""
+    return sys.version_info[:2] <= RAW_COPY_MAX_VERSION and all(
+        hasattr(zip_out, attribute) for attribute in RAW_COPY_ATTRIBUTES
+    )
 
-    with open(file_name_full_path.replace(".zip", "-temp/mainTemplate.json"), "wt", encoding="utf8") as fin:
-        fin.write(data)
 
-    os.remove(file_name_full_path)
-    shutil.make_archive(file_name_full_path.replace(".zip", ""), "zip", file_name_full_path.replace(".zip", "-temp"))
-    shutil.rmtree(file_name_full_path.replace(".zip", "-temp"))
+def _recompress_entry(zip_in: zipfile.ZipFile, zip_out: zipfile.ZipFile, info: zipfile.ZipInfo):
+    """
+    Copy a zip entry by decompressing and recompressing it in chunks
+
+    :param zip_in: source zip
+    :param zip_out: zip being written
+    :param info: source entry
+    """
+    with zip_in.open(info) as entry_in, zip_out.open(copy.copy(info), "w") as entry_out:
+        shutil.copyfileobj(entry_in, entry_out, COPY_CHUNK_SIZE)
+
+
+def _copy_raw_entry(source, zip_out: zipfile.ZipFile, info: zipfile.ZipInfo, entry_end: int):
+    """
+    Copy a zip entry, local header and compressed data, without decompressing it
+
+    Writes to private ZipFile members, only call it when _supports_raw_copy is true.
+
+    :param source: source zip opened in binary mode
+    :param zip_out: zip being written
+    :param info: source entry
+    :param entry_end: offset in the source zip where the next entry starts
+    """
+    output = zip_out.fp
+    if output is None:
+        raise ValueError("Attempt to write to ZIP archive that was already closed")
+    entry = copy.copy(info)
+    entry.header_offset = output.tell()
+    source.seek(info.header_offset)
+    remaining = entry_end - info.header_offset
+    while remaining > 0:
+        chunk = source.read(min(COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated entry {info.filename}")
+        output.write(chunk)
+        remaining -= len(chunk)
+    # the central directory is written from filelist when zip_out is closed
+    zip_out.filelist.append(entry)
+    zip_out.NameToInfo[entry.filename] = entry
+    zip_out.start_dir = output.tell()
+    setattr(zip_out, "_didModify", True)
 
 
 class Package(VariantPlanConfiguration):
@@ -50,9 +124,10 @@ class Package(VariantPlanConfiguration):
 
     def __init__(self, product_id, plan_id, authorization, subtype="ma"):
         super().__init__(product_id, plan_id, authorization, subtype)
-        self.package_api = PackageApi()
-        self.api = PackageConfigurationApi()
+        self.package_api = get_api(PackageApi)
+        self.api = get_api(PackageConfigurationApi)
         self.module = "Package"
+        self.on_progress = None
 
     def get(self):
         """Get Availability for Application"""
@@ -93,13 +168,6 @@ class Package(VariantPlanConfiguration):
         :param allowed_data_actions: Control Plane Operation Permissions, single string, ; separated
         :param json_config: listing configuration in json format
         """
-        if policies is None:
-            policies = []
-        if allowed_customer_actions is None:
-            allowed_customer_actions = []
-        if allowed_data_actions is None:
-            allowed_data_actions = []
-
         post_body = {
             "resourceType": "AzureApplicationPackage",
             "fileName": file_name,
@@ -111,11 +179,11 @@ class Package(VariantPlanConfiguration):
 
         file_name_full_path = str(Path(app_zip_dir).joinpath(file_name))
 
-        _inject_pid(file_name_full_path, self.product_id)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            upload_full_path = Path(temp_dir).joinpath(file_name)
+            inject_pid(file_name_full_path, self.product_id, str(upload_full_path))
 
-        upload_response = OfferConfigurations.upload_using_sas(
-            post_response.file_sas_uri, Path(app_zip_dir).joinpath(file_name)
-        )
+            upload_response = OfferConfigurations.upload_using_sas(post_response.file_sas_uri, upload_full_path)
 
         if upload_response != 201:
             raise ConnectionError("Upload via SAS has failed.")
@@ -140,35 +208,18 @@ class Package(VariantPlanConfiguration):
         odata_etag = settings["@odata.etag"]
         settings_id = settings["id"]
 
-        if resource_type == "AzureSolutionTemplatePackageConfiguration":
-            settings = {
-                "resourceType": resource_type,
-                "version": version,
-                "packageReferences": [{"type": "AzureApplicationPackage", "value": post_response.id}],
-                "ID": settings_id,
-            }
-        else:
-            plan_config = self._load_plan_config(json_config, plan_name)
-            tenant_id = os.getenv(TENANT_ID, plan_config["technical_configuration"]["tenant_id"])
-            access_id = os.getenv(ACCESS_ID, plan_config["technical_configuration"]["authorizations"][0]["id"])
-            role = os.getenv("ACCESS_OWNER", plan_config["technical_configuration"]["authorizations"][0]["role"])
-            deployment_mode = plan_config["technical_configuration"].get("deploymentMode", "Incremental")
-            settings = {
-                "resourceType": resource_type,
-                "version": version,
-                "allowJitAccess": allow_jit_access,
-                "canEnableCustomerActions": "true",
-                "allowedCustomerActions": allowed_customer_actions,
-                "allowedDataActions": allowed_data_actions,
-                "deploymentMode": deployment_mode,
-                "publicAzureTenantID": tenant_id,
-                "publicAzureAuthorizations": [{"principalID": access_id, "roleDefinitionID": role}],
-                "azureGovernmentTenantID": "string",
-                "azureGovernmentAuthorizations": [],
-                "policies": policies,
-                "packageReferences": [{"type": "AzureApplicationPackage", "value": post_response.id}],
-                "ID": settings_id,
-            }
+        settings = self.get_configuration_body(
+            resource_type,
+            version,
+            post_response.id,
+            settings_id,
+            allow_jit_access=allow_jit_access,
+            policies=policies,
+            allowed_customer_actions=allowed_customer_actions,
+            allowed_data_actions=allowed_data_actions,
+            json_config=json_config,
+            plan_name=plan_name,
+        )
 
         try:
             response = self.api.products_product_id_packageconfigurations_package_configuration_id_put(
@@ -184,8 +235,67 @@ class Package(VariantPlanConfiguration):
             raise error
         return response
 
+    @staticmethod
+    def get_configuration_body(
+        resource_type: str,
+        version: str,
+        package_id: str,
+        settings_id: str,
+        allow_jit_access: bool = False,
+        policies: list = None,
+        allowed_customer_actions: list = None,
+        allowed_data_actions: list = None,
+        json_config: dict = None,
+        plan_name: str = None,
+    ) -> dict:
+        """
+        Create the Package Configuration request body
+
+        :param resource_type: AzureManagedApplicationPackageConfiguration or AzureSolutionTemplatePackageConfiguration
+        :param version: Version of package
+        :param package_id: id of the uploaded package
+        :param settings_id: package configuration id
+        :param allow_jit_access: boolean enable or disable jit access to customer resources
+        :param policies: access policies
+        :param allowed_customer_actions: Control Plane Operation Permissions, single string, ; separated
+        :param allowed_data_actions: Control Plane Operation Permissions, single string, ; separated
+        :param json_config: listing configuration in json format
+        :param plan_name: plan whose technical configuration is used
+        :return: package configuration body
+        """
+        if resource_type == "AzureSolutionTemplatePackageConfiguration":
+            return {
+                "resourceType": resource_type,
+                "version": version,
+                "packageReferences": [{"type": "AzureApplicationPackage", "value": package_id}],
+                "ID": settings_id,
+            }
+        plan_config = Package._load_plan_config(json_config, plan_name)
+        tenant_id = os.getenv(TENANT_ID, plan_config["technical_configuration"]["tenant_id"])
+        access_id = os.getenv(ACCESS_ID, plan_config["technical_configuration"]["authorizations"][0]["id"])
+        role = os.getenv("ACCESS_OWNER", plan_config["technical_configuration"]["authorizations"][0]["role"])
+        deployment_mode = plan_config["technical_configuration"].get("deploymentMode", "Incremental")
+        return {
+            "resourceType": resource_type,
+            "version": version,
+            "allowJitAccess": allow_jit_access,
+            "canEnableCustomerActions": "true",
+            "allowedCustomerActions": allowed_customer_actions or [],
+            "allowedDataActions": allowed_data_actions or [],
+            "deploymentMode": deployment_mode,
+            "publicAzureTenantID": tenant_id,
+            "publicAzureAuthorizations": [{"principalID": access_id, "roleDefinitionID": role}],
+            "azureGovernmentTenantID": "string",
+            "azureGovernmentAuthorizations": [],
+            "policies": policies or [],
+            "packageReferences": [{"type": "AzureApplicationPackage", "value": package_id}],
+            "ID": settings_id,
+        }
+
     @staticmethod
     def _load_plan_config(json_config: dict, plan_name=None):
+        if isinstance(json_config, ListingConfig):
+            return json_config.get_plan(plan_name)
         plan_overview = json_config["plan_overview"]
         if isinstance(plan_overview, list):
             return plan_overview[0]
@@ -194,16 +304,20 @@ class Package(VariantPlanConfiguration):
         return plan_overview[next(iter(plan_overview))]
 
     def _check_upload(self, post_response):
-        state = None
-        t_end = time.time() + 60 * 5
-        while state != "Processed":
-            get_response = self.package_api.products_product_id_packages_package_id_get(
+        get_response = poll_until_ready(
+            lambda: self.package_api.products_product_id_packages_package_id_get(
                 product_id=self.product_id,
                 package_id=post_response.id,
                 authorization=self.authorization,
-            )
-            state = get_response.state
-            if state == "ProcessFailed":
-                raise ConnectionError("Uploading AMA Zip Failed with State: ProcessedFailed. Check if PID is required")
-            if time.time() > t_end:
-                raise ConnectionError("Uploading AMA Zip Failed after 5 minutes. Please retry")
+            ),
+            lambda response: response.state in ["Processed", "ProcessFailed"],
+            initial_delay=PROCESSING_INITIAL_DELAY,
+            max_delay=PROCESSING_MAX_DELAY,
+            timeout=PROCESSING_TIMEOUT,
+            metric="package_processing",
+            on_progress=self.on_progress,
+        )
+        if get_response.state == "ProcessFailed":
+            raise ConnectionError("Uploading AMA Zip Failed with State: ProcessedFailed. Check if PID is required")
+        if get_response.state != "Processed":
+            raise ConnectionError("Uploading AMA Zip Failed after 5 minutes. Please retry")
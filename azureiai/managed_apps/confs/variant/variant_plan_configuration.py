@@ -6,8 +6,7 @@ Interface for Plan Configuration Settings
 
 Plan configurations must use the variant draft instance to retrieve settings.
 """
-import time
-
+from azureiai.managed_apps.branch_cache import BRANCH_CACHE
 from azureiai.managed_apps.confs.offer_configurations import OfferConfigurations
 
 
@@ -19,20 +18,12 @@ class VariantPlanConfiguration(OfferConfigurations):
         self.subtype = subtype
         self.plan_id = plan_id
 
-    def _get_draft_instance_id(self, module, retry=0):
+    def _get_draft_instance_id(self, module):
         """
         Args:
             module:
         """
-        time.sleep(3)
-        api_response = self.branches_api.products_product_id_branches_get_by_module_modulemodule_get(
-            product_id=self.product_id, module=module, authorization=self.authorization
-        )
-        return self._find_plan(api_response)
-
-    def _find_plan(self, api_response, i=0):
-        if i >= len(api_response.value):
-            raise ValueError(f"Expected Plan {self.plan_id} not found in {api_response}")
-        if api_response.value[i].variant_id == self.plan_id:
-            return api_response.value[i].current_draft_instance_id
-        return self._find_plan(api_response, i + 1)
+        draft_instance_id = BRANCH_CACHE.get_variant(self.product_id, self.authorization, module, self.plan_id)
+        if draft_instance_id is None:
+            raise ValueError(f"Expected Plan {self.plan_id} not found in {module} branches")
+        return draft_instance_id
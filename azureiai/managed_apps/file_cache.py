@@ -0,0 +1,91 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+File Cache
+
+Helpers for JSON caches under AZPC_CACHE_DIR that are shared by concurrent azpc processes on the same host. Readers
+and writers hold an exclusive lock on a sidecar lock file, and writes replace the cache file atomically.
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+CACHE_DIR = "AZPC_CACHE_DIR"
+
+_THREAD_LOCKS: dict = {}
+_THREAD_LOCKS_LOCK = threading.Lock()
+
+
+def get_cache_dir() -> Path:
+    """Get the directory used for caches that persist between azpc invocations"""
+    return Path(os.getenv(CACHE_DIR, str(Path.home().joinpath(".azpc"))))
+
+
+@contextmanager
+def locked(path: Path):
+    """
+    Hold an exclusive lock for a cache file, across threads and processes
+
+    :param path: cache file to lock, the lock is taken on '<path>.lock'
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _THREAD_LOCKS_LOCK:
+        thread_lock = _THREAD_LOCKS.setdefault(str(path.resolve()), threading.Lock())
+    with thread_lock, open(path.with_name(path.name + ".lock"), "a+b") as lock_file:
+        if sys.platform == "win32":
+            import msvcrt  # pylint: disable=import-outside-toplevel,import-error
+
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl  # pylint: disable=import-outside-toplevel
+
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def read_json(path: Path) -> dict:
+    """
+    Read a JSON cache file
+
+    :param path: cache file
+    :return: cached contents, empty if the file is missing or unreadable
+    """
+    try:
+        with open(path, "r", encoding="utf8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_json(path: Path, data: dict):
+    """
+    Atomically replace a JSON cache file, readable and writable by the current user only
+
+    :param path: cache file
+    :param data: contents to cache
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    file_descriptor, temp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "w", encoding="utf8") as file:
+            json.dump(data, file, indent=4)
+        os.chmod(temp_name, 0o600)
+        os.replace(temp_name, path)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
@@ -0,0 +1,121 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+ID Index
+
+Maps offer names to product ids and plan names to variant ids under AZPC_CACHE_DIR, so repeated commands on the same
+offer skip the OData lookups. Entries are recorded whenever a list, show or create returns ids, separately for every
+account the requests are authorized as, since the same offer name can belong to products of different tenants. An
+indexed id is confirmed with a GET of the product or variant before it is used, and dropped if that answers 404 or
+returns a different offer. Without a known account, e.g. an Azure CLI login without a readable profile, the index is
+not used. Set AZPC_ID_INDEX=0 to disable the index.
+"""
+import os
+from pathlib import Path
+
+from azureiai.managed_apps.file_cache import get_cache_dir, locked, read_json, write_json
+
+ID_INDEX = "AZPC_ID_INDEX"
+INDEX_FILE = "ids.json"
+
+_NOT_RESOLVED = object()
+
+
+class IdIndex:
+    """Local record of product ids by offer name and variant ids by product and plan name, per account"""
+
+    def __init__(self, config_yaml: str = "config.yml", path=None):
+        """
+        :param config_yaml: configuration the requests are authorized with, see get_partner_center_authorization
+        :param path: index file, default: ids.json in AZPC_CACHE_DIR
+        """
+        self.config_yaml = config_yaml
+        self.path = Path(path) if path else get_cache_dir().joinpath(INDEX_FILE)
+        self._account = _NOT_RESOLVED
+
+    def get_product_id(self, name: str):
+        """
+        Get the recorded product id of an offer
+
+        :param name: offer name, the AzureOfferId external id
+        :return: product id, or None
+        """
+        if not name:
+            return None
+        return self._read().get("products", {}).get(name)
+
+    def get_plan_id(self, product_id: str, plan_name: str):
+        """
+        Get the recorded variant id of a plan
+
+        :param product_id: Application Product ID
+        :param plan_name: plan name, the variant externalID
+        :return: variant id, or None
+        """
+        if not product_id or not plan_name:
+            return None
+        return self._read().get("plans", {}).get(product_id, {}).get(plan_name)
+
+    def record_products(self, product_ids: dict):
+        """
+        Record product ids
+
+        :param product_ids: dict of offer name to product id
+        """
+        if product_ids:
+            self._update(lambda index: index.setdefault("products", {}).update(product_ids))
+
+    def record_plans(self, product_id: str, plan_ids: dict):
+        """
+        Record variant ids of a product
+
+        :param product_id: Application Product ID
+        :param plan_ids: dict of plan name to variant id
+        """
+        if product_id and plan_ids:
+            self._update(lambda index: index.setdefault("plans", {}).setdefault(product_id, {}).update(plan_ids))
+
+    def forget_product(self, name: str):
+        """Drop the recorded product id of an offer and the variant ids recorded under it"""
+
+        def forget(index):
+            product_id = index.get("products", {}).pop(name, None)
+            index.get("plans", {}).pop(product_id, None)
+
+        self._update(forget)
+
+    def forget_plan(self, product_id: str, plan_name: str):
+        """Drop the recorded variant id of a plan"""
+        self._update(lambda index: index.get("plans", {}).get(product_id, {}).pop(plan_name, None))
+
+    def _read(self) -> dict:
+        account = self._get_account()
+        if account is None:
+            return {}
+        with locked(self.path):
+            return read_json(self.path).get("accounts", {}).get(account, {})
+
+    def _update(self, change):
+        account = self._get_account()
+        if account is None:
+            return
+        with locked(self.path):
+            index = read_json(self.path)
+            change(index.setdefault("accounts", {}).setdefault(account, {}))
+            write_json(self.path, index)
+
+    def _get_account(self):
+        """Get the account the entries are recorded under, None while the index is disabled"""
+        if not is_enabled():
+            return None
+        if self._account is _NOT_RESOLVED:
+            from azureiai.managed_apps.token_cache import get_account_id  # pylint: disable=import-outside-toplevel
+
+            self._account = get_account_id(self.config_yaml)
+        return self._account
+
+
+def is_enabled() -> bool:
+    """Check if the ID Index is enabled, see AZPC_ID_INDEX"""
+    return os.getenv(ID_INDEX, "1") != "0"
@@ -0,0 +1,77 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+Listing Config
+
+The json listing configuration of an offer, parsed once and shared by every configuration class that reads it. Parsed
+configs are memoized by path and modification time, so an edited file is parsed again on its next load.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+
+_CACHE: dict = {}
+_CACHE_LOCK = threading.Lock()
+
+
+class ListingConfig(dict):
+    """Parsed json listing configuration, shared between callers and therefore read-only by convention"""
+
+    def __init__(self, data: dict, path=None):
+        super().__init__(data)
+        self.path = Path(path) if path else None
+        plan_overview = self.get("plan_overview", {})
+        if isinstance(plan_overview, list):
+            self._first_plan = plan_overview[0] if plan_overview else None
+            self._plans = {}
+        else:
+            self._first_plan = plan_overview[next(iter(plan_overview))] if plan_overview else None
+            self._plans = dict(plan_overview)
+
+    def get_plan(self, plan_name: str = None) -> dict:
+        """
+        Get the configuration of a plan
+
+        A plan_overview list holds a single plan, which is returned for any plan name.
+
+        :param plan_name: key of the plan in plan_overview, default: the first plan
+        :return: plan configuration
+        """
+        if plan_name and self._plans:
+            return self._plans[plan_name]
+        if self._first_plan is None:
+            raise KeyError("plan_overview")
+        return self._first_plan
+
+    def get_plan_names(self) -> list:
+        """
+        Get the names of the plans
+
+        :return: keys of plan_overview, empty for a plan_overview list since its plan is not named
+        """
+        return list(self._plans)
+
+
+def load_listing_config(path) -> ListingConfig:
+    """
+    Load a json listing configuration, reusing the parsed config while the file is unchanged
+
+    :param path: path to configuration json
+    :return: parsed configuration
+    """
+    path = Path(path)
+    stat = os.stat(path)
+    key = str(path.resolve())
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _CACHE_LOCK:
+        cached = _CACHE.get(key)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    with open(path, "r", encoding="utf8") as read_file:
+        listing_config = ListingConfig(json.load(read_file), path)
+    with _CACHE_LOCK:
+        _CACHE[key] = (version, listing_config)
+    return listing_config
@@ -4,7 +4,6 @@
 """This module contains methods and classes for Azure Managed Application publication."""
 from __future__ import absolute_import
 
-import json
 import os
 import uuid
 from pathlib import Path
@@ -12,6 +11,7 @@ from pathlib import Path
 import yaml
 
 from azureiai import RetryException
+from azureiai.managed_apps.branch_cache import BRANCH_CACHE
 from azureiai.managed_apps.confs import (
     Listing,
     ListingImage,
@@ -24,6 +24,8 @@ from azureiai.managed_apps.confs.variant import (
     Package,
 )
 from azureiai.managed_apps.counter import inc_counter
+from azureiai.managed_apps.listing_config import load_listing_config
+from azureiai.managed_apps.retry import POLICY
 from azureiai.partner_center.offer import Offer
 from swagger_client.rest import ApiException
 
@@ -117,8 +119,7 @@ class ManagedApplication(Offer):
             raise FileNotFoundError("Managed Application Zip - Not Found", os.path.join(app_path, app))
         if not os.path.isfile(os.path.join(app_path, json_listing_config)):
             raise FileNotFoundError("JSON Config - Not Found")
-        with open(Path(app_path).joinpath(json_listing_config), "r", encoding="utf8") as read_file:
-            json_config = json.load(read_file)
+        json_config = load_listing_config(Path(app_path).joinpath(json_listing_config))
 
         self._create_plan(app, app_path, config_yml, json_config, plan_name)
 
@@ -152,8 +153,7 @@ class ManagedApplication(Offer):
             raise FileNotFoundError(f"Managed Application Zip - Not Found - {app_path}{os.path.sep}{app}")
         if not os.path.isfile(os.path.join(app_path, json_listing_config)):
             raise FileNotFoundError("JSON Config - Not Found")
-        with open(Path(app_path).joinpath(json_listing_config), "r", encoding="utf8") as read_file:
-            json_config = json.load(read_file)
+        json_config = load_listing_config(Path(app_path).joinpath(json_listing_config))
 
         self._create_plan(app, app_path, config_yml, json_config, plan_name)
 
@@ -204,6 +204,7 @@ class ManagedApplication(Offer):
         )
 
         self._ids["submission_id"] = response.id
+        BRANCH_CACHE.invalidate(self.get_product_id())
         return response
 
     def submission_status(self):
@@ -231,8 +232,7 @@ class ManagedApplication(Offer):
 
         :return: binary outcome of preparation
         """
-        with open(Path(app_path).joinpath(json_listing_config), "r", encoding="utf8") as read_file:
-            json_config = json.load(read_file)
+        json_config = load_listing_config(Path(app_path).joinpath(json_listing_config))
 
         self._set_properties(json_config)
         self._set_offer_listing(app_path, json_listing_config, update_image)
@@ -246,12 +246,11 @@ class ManagedApplication(Offer):
             config_yml,
         )
 
-    def _create_new_plan(self, plan_name: str, retry=0):
+    def _create_new_plan(self, plan_name: str):
         """
-        Create new AMA Plan and retry up to 5 times.
+        Create new AMA Plan, throttled requests are retried by the retry policy
 
         :param plan_name: Display Name of Plan
-        :param retry: number of times to retry
         return: variant post api response
         """
         body = {
@@ -271,10 +270,9 @@ class ManagedApplication(Offer):
                 body=body,
             )
             self._ids["plan_id"] = api_response["id"]
+            BRANCH_CACHE.invalidate(self.get_product_id())
             return api_response
         except ApiException as api_expection:
-            if retry < 5:
-                return self._create_new_plan(plan_name=plan_name, retry=retry + 1)
             raise RetryException() from api_expection
 
     @staticmethod
@@ -295,11 +293,10 @@ class ManagedApplication(Offer):
         offer_listing.set(properties=offer_listing_properties)
 
     def _set_offer_listing(self, app_path, json_listing_config, update_image=False):
-        with open(Path(app_path).joinpath(json_listing_config), "r", encoding="utf8") as read_file:
-            json_config = json.load(read_file)
+        json_config = load_listing_config(Path(app_path).joinpath(json_listing_config))
 
         listing = Listing(product_id=self.get_product_id(), authorization=self.get_auth())
-        listing.set(properties=Path(app_path).joinpath(json_listing_config))
+        listing.set(properties=json_config)
 
         if update_image:
             logo_large = json_config["offer_listing"]["listing_logos"]["logo_large"]
@@ -317,10 +314,15 @@ class ManagedApplication(Offer):
                 raise FileNotFoundError("Logo Wide - Not Found")
 
             listing_image = ListingImage(product_id=self.get_product_id(), authorization=self.get_auth())
-            listing_image.set(file_name=logo_large, file_path=app_path, logo_type="AzureLogoLarge")
-            listing_image.set(file_name=logo_small, file_path=app_path, logo_type="AzureLogoSmall")
-            listing_image.set(file_name=logo_medium, file_path=app_path, logo_type="AzureLogoMedium")
-            listing_image.set(file_name=logo_wide, file_path=app_path, logo_type="AzureLogoWide")
+            listing_image.set_logos(
+                {
+                    "AzureLogoLarge": logo_large,
+                    "AzureLogoSmall": logo_small,
+                    "AzureLogoMedium": logo_medium,
+                    "AzureLogoWide": logo_wide,
+                },
+                file_path=app_path,
+            )
 
     def _set_properties(self, json_config):
         plan_config = self._load_plan_config(json_config)
@@ -392,15 +394,16 @@ class ManagedApplication(Offer):
             allowed_data_actions = plan_config["technical_configuration"]["allowedDataActions"]
         return allowed_customer_actions, allowed_data_actions
 
-    def _get_variant_draft_instance_id(self, module: str, retry: int = 0) -> str:
-        api_response = self._apis["branches"].products_product_id_branches_get_by_module_modulemodule_get(
-            product_id=self.get_product_id(),
-            module=module,
-            authorization=self.get_auth(),
+    def _get_variant_draft_instance_id(self, module: str) -> str:
+        api_response = POLICY.call(
+            lambda: self._apis["branches"].products_product_id_branches_get_by_module_modulemodule_get(
+                product_id=self.get_product_id(),
+                module=module,
+                authorization=self.get_auth(),
+            ),
+            should_retry=lambda response: not response.value,
         )
         if not api_response.value:
-            if retry < 3:
-                return self._get_variant_draft_instance_id(module=module, retry=retry + 1)
             raise RetryException("Retry Failed")
         i = inc_counter(api_response)
         return api_response.value[i].current_draft_instance_id
@@ -0,0 +1,58 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Process-wide Counters and Timings"""
+import threading
+
+
+class Metrics:
+    """Thread-safe registry of counters and observed values"""
+
+    def __init__(self):
+        self._counters = {}
+        self._observations = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1):
+        """
+        Increment a counter
+
+        :param name: counter name
+        :param value: amount to add
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        """
+        Record an observed value, such as a wait time in seconds
+
+        :param name: observation name
+        :param value: observed value
+        """
+        with self._lock:
+            observation = self._observations.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            observation["count"] += 1
+            observation["total"] += value
+            observation["max"] = max(observation["max"], value)
+
+    def snapshot(self) -> dict:
+        """
+        Get a copy of every counter and observation
+
+        :return: dict of counters and observations
+        """
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "observations": {name: dict(value) for name, value in self._observations.items()},
+            }
+
+    def reset(self):
+        """Clear every counter and observation"""
+        with self._lock:
+            self._counters = {}
+            self._observations = {}
+
+
+METRICS = Metrics()
@@ -6,9 +6,9 @@ import os
 from abc import abstractmethod
 
 import yaml
-from adal import AuthenticationContext
-from azure.identity import AzureCliCredential
 
+from azureiai.managed_apps.clients import get_api
+from azureiai.managed_apps.token_cache import get_cli_token, get_client_credentials_token
 from azureiai.managed_apps.utils import (
     AAD_CRED,
     AAD_ID,
@@ -34,12 +34,12 @@ class Offer:
         self._authorization = None
 
         self._apis = {
-            "product": ProductApi(),
-            "variant": VariantApi(),
-            "property": PropertyApi(),
-            "branches": BranchesApi(),
-            "product_availability": ProductAvailabilityApi(),
-            "submission": SubmissionApi(),
+            "product": get_api(ProductApi),
+            "variant": get_api(VariantApi),
+            "property": get_api(PropertyApi),
+            "branches": get_api(BranchesApi),
+            "product_availability": get_api(ProductAvailabilityApi),
+            "submission": get_api(SubmissionApi),
         }
 
         self._ids = {
@@ -66,18 +66,12 @@ class Offer:
                 client_secret = os.getenv(AAD_CRED, settings["aad_secret"])
                 tenant_id = os.getenv(TENANT_ID, settings["tenant_id"])
 
-                auth_context = AuthenticationContext(f"https://login.microsoftonline.com/{tenant_id}")
-                token_response = auth_context.acquire_token_with_client_credentials(
-                    resource="https://api.partner.microsoft.com",
-                    client_id=client_id,
-                    client_secret=client_secret,
+                token = get_client_credentials_token(
+                    tenant_id, client_id, client_secret, "https://api.partner.microsoft.com"
                 )
-                self._authorization = f"Bearer {token_response['accessToken']}"
+                self._authorization = f"Bearer {token}"
             except KeyError:
-                azure_cli = AzureCliCredential()
-                token_response = azure_cli.get_token("https://api.partner.microsoft.com")
-
-                self._authorization = f"Bearer {token_response.token}"
+                self._authorization = f"Bearer {get_cli_token('https://api.partner.microsoft.com')}"
         return self._authorization
 
     def get_product_id(self) -> str:
@@ -119,6 +113,6 @@ class Offer:
     def create(self) -> str:
         """Create new Azure Managed Application and set product id."""
 
-    def _get_draft_instance_id(self, module: str, retry: int = 0):
+    def _get_draft_instance_id(self, module: str):
         """Call Branch API to get Configuration ID"""
-        return get_draft_instance_id(self.get_product_id(), self.get_auth(), module, retry)
+        return get_draft_instance_id(self.get_product_id(), self.get_auth(), module)
@@ -0,0 +1,55 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+Paging
+
+Ingestion API collections are returned in pages linked by @odata.nextLink. These generators request the next page only
+once the items of the previous one are consumed, so listing a large catalog holds one page in memory at a time.
+"""
+from urllib.parse import parse_qs, urlparse
+
+SKIP_TOKEN = "$skipToken"
+NEXT_LINK_KEYS = ["odata_next_link", "@odata.nextLink"]
+
+
+def get_skip_token(next_link: str):
+    """
+    Get the continuation token of a next link
+
+    :param next_link: @odata.nextLink of a page, e.g. products?$skipToken=abc
+    :return: $skipToken value, or None
+    """
+    values = parse_qs(urlparse(next_link).query).get(SKIP_TOKEN)
+    return values[0] if values else None
+
+
+def iter_pages(list_page, **kwargs):
+    """
+    Request every page of a collection, following @odata.nextLink lazily
+
+    :param list_page: swagger list method taking skip_token, e.g. ProductApi().products_get
+    :param kwargs: arguments of the list method, such as authorization and filter
+    :return: generator of pages as dicts
+    """
+    skip_token = None
+    while True:
+        page = list_page(**kwargs, skip_token=skip_token) if skip_token else list_page(**kwargs)
+        page = page.to_dict() if hasattr(page, "to_dict") else page
+        yield page
+        next_link = next((page[key] for key in NEXT_LINK_KEYS if page.get(key)), None)
+        skip_token = get_skip_token(next_link) if next_link else None
+        if not skip_token:
+            return
+
+
+def iter_values(list_page, **kwargs):
+    """
+    Iterate over the items of every page of a collection
+
+    :param list_page: swagger list method taking skip_token
+    :param kwargs: arguments of the list method
+    :return: generator of items as dicts
+    """
+    for page in iter_pages(list_page, **kwargs):
+        yield from page.get("value") or []
@@ -0,0 +1,169 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+Readiness Polling
+
+Partner Center creates some resources, such as the branches of a new plan, asynchronously. Instead of sleeping a fixed
+time before every lookup, poll the resource: return as soon as it is ready and back off only while it is not.
+Throttled polls wait at least as long as the Retry-After header asks for.
+"""
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+from azureiai.managed_apps.metrics import METRICS
+
+DEFAULT_INITIAL_DELAY = 0.5
+DEFAULT_MAX_DELAY = 8.0
+DEFAULT_TIMEOUT = 60.0
+READINESS_TIMEOUT = "AZPC_READINESS_TIMEOUT"
+THROTTLED_STATUS_CODES = [429, 503]
+
+
+def poll_until_ready(
+    fetch,
+    is_ready,
+    initial_delay: float = DEFAULT_INITIAL_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    timeout: float = None,
+    metric: str = "readiness",
+    on_progress=None,
+):
+    """
+    Call fetch until is_ready accepts its result, backing off exponentially with jitter in between
+
+    The first call is made immediately. If fetch raises a throttling error (429 or 503) carrying a Retry-After header,
+    the next poll waits at least that long; other errors are raised. Time spent waiting is recorded as the
+    '<metric>.wait_seconds' observation and the number of polls of every wait as '<metric>.polls_per_wait'.
+
+    :param fetch: callable returning the resource
+    :param is_ready: callable returning True when the resource is ready
+    :param initial_delay: first backoff delay in seconds
+    :param max_delay: upper bound of a single backoff delay in seconds
+    :param timeout: give up after this many seconds and return the last result, default: AZPC_READINESS_TIMEOUT or 60
+    :param metric: metric name prefix
+    :param on_progress: callable(polls, elapsed_seconds, result) called after every poll that is not ready
+    :return: last result of fetch
+    """
+    if timeout is None:
+        timeout = float(os.getenv(READINESS_TIMEOUT, str(DEFAULT_TIMEOUT)))
+    start = time.monotonic()
+    deadline = start + timeout
+    delay = initial_delay
+    waited = 0.0
+    polls = 0
+    result = None
+    while True:
+        polls += 1
+        retry_after = None
+        try:
+            result = fetch()
+        except Exception as error:  # pylint: disable=broad-except
+            retry_after = get_retry_after(error)
+            if retry_after is None or time.monotonic() >= deadline:
+                _record(metric, waited, polls)
+                raise
+            METRICS.increment(f"{metric}.throttled")
+        else:
+            if is_ready(result):
+                break
+            if on_progress is not None:
+                on_progress(polls, time.monotonic() - start, result)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        wait = min(max(delay * random.uniform(0.5, 1.0), retry_after or 0), remaining)
+        time.sleep(wait)
+        waited += wait
+        delay = min(delay * 2, max_delay)
+    _record(metric, waited, polls)
+    return result
+
+
+async def poll_until_ready_async(
+    fetch,
+    is_ready,
+    initial_delay: float = DEFAULT_INITIAL_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    timeout: float = None,
+    metric: str = "readiness",
+    on_progress=None,
+):
+    """
+    Await fetch until is_ready accepts its result, see poll_until_ready. Waits do not block the event loop.
+
+    :param fetch: callable returning an awaitable of the resource
+    :param is_ready: callable returning True when the resource is ready
+    :param initial_delay: first backoff delay in seconds
+    :param max_delay: upper bound of a single backoff delay in seconds
+    :param timeout: give up after this many seconds and return the last result, default: AZPC_READINESS_TIMEOUT or 60
+    :param metric: metric name prefix
+    :param on_progress: callable(polls, elapsed_seconds, result) called after every poll that is not ready
+    :return: last result of fetch
+    """
+    import asyncio  # pylint: disable=import-outside-toplevel
+
+    if timeout is None:
+        timeout = float(os.getenv(READINESS_TIMEOUT, str(DEFAULT_TIMEOUT)))
+    start = time.monotonic()
+    deadline = start + timeout
+    delay = initial_delay
+    waited = 0.0
+    polls = 0
+    result = None
+    while True:
+        polls += 1
+        retry_after = None
+        try:
+            result = await fetch()
+        except Exception as error:  # pylint: disable=broad-except
+            retry_after = get_retry_after(error)
+            if retry_after is None or time.monotonic() >= deadline:
+                _record(metric, waited, polls)
+                raise
+            METRICS.increment(f"{metric}.throttled")
+        else:
+            if is_ready(result):
+                break
+            if on_progress is not None:
+                on_progress(polls, time.monotonic() - start, result)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        wait = min(max(delay * random.uniform(0.5, 1.0), retry_after or 0), remaining)
+        await asyncio.sleep(wait)
+        waited += wait
+        delay = min(delay * 2, max_delay)
+    _record(metric, waited, polls)
+    return result
+
+
+def get_retry_after(error):
+    """
+    Get the delay a throttling error asks for
+
+    :param error: exception raised by an API call, such as swagger_client.rest.ApiException, or an HTTP response
+    :return: seconds to wait, or None if the error is not a throttling error with a Retry-After header
+    """
+    if (getattr(error, "status", None) or getattr(error, "status_code", None)) not in THROTTLED_STATUS_CODES:
+        return None
+    value = (getattr(error, "headers", None) or {}).get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def _record(metric, waited, polls):
+    METRICS.observe(f"{metric}.wait_seconds", waited)
+    METRICS.observe(f"{metric}.polls_per_wait", polls)
+    METRICS.increment(f"{metric}.polls", polls)
@@ -0,0 +1,136 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+Client-side Rate Limiting
+
+Requests to a rate limited host draw from a token bucket shared by every thread and every azpc process on the machine.
+The bucket lives in a small state file under AZPC_CACHE_DIR, updated under the file lock. A request takes its token
+immediately, possibly going into debt, and then sleeps until the debt is repaid, so waiting callers are served in the
+order they arrived with one locked read and write each. Aggregate throughput stays at the configured rate instead of
+bursting into 429s and backing off.
+
+AZPC_RATE_LIMITS overrides the limits per host, e.g. "api.partner.microsoft.com=5/10,cloudpartner.azure.com=2", as
+requests per second with an optional burst size. A rate of 0 disables limiting for that host.
+
+Coroutines take their token with acquire_async, which updates the bucket file on a worker thread and waits off the
+debt without blocking the event loop.
+"""
+import os
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+from azureiai.managed_apps.file_cache import get_cache_dir, locked, read_json, write_json
+from azureiai.managed_apps.metrics import METRICS
+
+RATE_LIMITS = "AZPC_RATE_LIMITS"
+RATE_LIMIT_DIR = "rate_limits"
+DEFAULT_RATE_LIMITS = {
+    "api.partner.microsoft.com": (5.0, 10.0),
+    "cloudpartner.azure.com": (5.0, 10.0),
+}
+
+
+class RateLimiter:
+    """Token buckets per host, shared across threads and processes through lock files"""
+
+    def __init__(self, limits: dict = None, path=None):
+        """
+        :param limits: dict of host to (requests per second, burst size), default: AZPC_RATE_LIMITS over the defaults
+        :param path: directory of the bucket state files, default: AZPC_CACHE_DIR/rate_limits
+        """
+        self.limits = limits
+        self.path = path
+
+    def acquire(self, url: str) -> float:
+        """
+        Take a token for a request, sleeping until the host's rate allows it
+
+        :param url: request url, its host selects the bucket
+        :return: seconds waited
+        """
+        wait = self.reserve(url)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, url: str) -> float:
+        """
+        Take a token for a request, awaiting until the host's rate allows it
+
+        The bucket file is locked, read and written on a worker thread, so the event loop keeps running meanwhile.
+
+        :param url: request url, its host selects the bucket
+        :return: seconds waited
+        """
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        wait = await asyncio.get_running_loop().run_in_executor(None, self.reserve, url)
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def reserve(self, url: str) -> float:
+        """
+        Take a token for a request without waiting for it
+
+        :param url: request url, its host selects the bucket
+        :return: seconds the request must wait before it is sent
+        """
+        host = urlparse(url).hostname or ""
+        rate, burst = self.get_limit(host)
+        if rate <= 0:
+            return 0.0
+        bucket_path = self._get_bucket_path(host)
+        with locked(bucket_path):
+            bucket = read_json(bucket_path)
+            now = time.time()
+            elapsed = max(now - bucket.get("updated", now), 0.0)
+            tokens = min(bucket.get("tokens", burst) + elapsed * rate, burst) - 1
+            write_json(bucket_path, {"tokens": tokens, "updated": now})
+        wait = -tokens / rate if tokens < 0 else 0.0
+        if wait:
+            METRICS.increment("rate_limit.delayed")
+            METRICS.observe("rate_limit.wait_seconds", wait)
+        return wait
+
+    def get_limit(self, host: str) -> tuple:
+        """
+        Get the limit of a host
+
+        :param host: API host name
+        :return: (requests per second, burst size), a rate of 0 means unlimited
+        """
+        return self._get_limits().get(host, (0.0, 0.0))
+
+    def _get_limits(self) -> dict:
+        if self.limits is not None:
+            return self.limits
+        return dict(DEFAULT_RATE_LIMITS, **parse_rate_limits(os.getenv(RATE_LIMITS, "")))
+
+    def _get_bucket_path(self, host: str):
+        if self.path is not None:
+            return Path(self.path).joinpath(f"{host}.json")
+        return get_cache_dir().joinpath(RATE_LIMIT_DIR, f"{host}.json")
+
+
+def parse_rate_limits(value: str) -> dict:
+    """
+    Parse per host rate limits
+
+    :param value: comma separated host=rate[/burst], e.g. "api.partner.microsoft.com=5/10"
+    :return: dict of host to (requests per second, burst size), the burst defaults to one second of requests
+    """
+    limits = {}
+    for entry in filter(None, (entry.strip() for entry in value.split(","))):
+        try:
+            host, limit = entry.split("=")
+            rate, _, burst = limit.partition("/")
+            limits[host.strip()] = (float(rate), max(float(burst or rate), 1.0))
+        except ValueError as error:
+            raise ValueError(f"Invalid {RATE_LIMITS} entry {entry!r}, expected host=rate[/burst]") from error
+    return limits
+
+
+RATE_LIMITER = RateLimiter()
@@ -0,0 +1,214 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+Retry Policy
+
+Every call made through the shared swagger ApiClient or the shared HTTP sessions is retried by one policy: exponential
+backoff with jitter, waiting at least as long as a 429 or 503 Retry-After header asks for. Throttled requests were not
+processed and are always retried. Other server errors, timeouts and connection errors are retried only for idempotent
+methods, so a POST that may have been applied is never sent twice. Each command, and each thread it fans out to, may
+retry at most AZPC_RETRY_BUDGET times in total, so a degraded API fails a command instead of stalling it. Calls awaited
+through call_async wait without blocking the event loop and draw from the budget of their asyncio task instead.
+"""
+import contextvars
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+from azureiai.managed_apps.metrics import METRICS
+from azureiai.managed_apps.polling import THROTTLED_STATUS_CODES, get_retry_after
+
+RETRIES = "AZPC_RETRIES"
+RETRY_BASE_DELAY = "AZPC_RETRY_BASE_DELAY"
+RETRY_MAX_DELAY = "AZPC_RETRY_MAX_DELAY"
+RETRY_BUDGET = "AZPC_RETRY_BUDGET"
+
+DEFAULT_RETRIES = 4
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30.0
+DEFAULT_BUDGET = 20
+
+IDEMPOTENT_METHODS = ["GET", "HEAD", "OPTIONS", "PUT", "DELETE"]
+SERVER_ERROR_STATUS_CODES = [408, 500, 502, 504]
+
+_BUDGET = threading.local()
+_TASK_BUDGET: "contextvars.ContextVar[Optional[int]]" = contextvars.ContextVar("azpc_retry_budget", default=None)
+
+
+class RetryPolicy:
+    """Retry calls with exponential backoff and jitter, within the retry budget of the current command"""
+
+    def __init__(self, retries: int = None, base_delay: float = None, max_delay: float = None):
+        """
+        :param retries: retries of a single call, default: AZPC_RETRIES or 4
+        :param base_delay: delay before the first retry in seconds, default: AZPC_RETRY_BASE_DELAY or 0.5
+        :param max_delay: upper bound of a backoff delay in seconds, default: AZPC_RETRY_MAX_DELAY or 30
+        """
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def call(self, send, method: str = "GET", should_retry=None):
+        """
+        Call send until it succeeds, a failure is not retryable, or the retries are used up
+
+        :param send: callable sending the request, returning a response or raising
+        :param method: HTTP method of the request, decides whether a failure after sending may be retried
+        :param should_retry: callable returning True when a successful result is not ready and should be fetched again
+        :return: last result of send, a response with a retryable status is returned once the retries are used up
+        """
+        attempt = 0
+        while True:
+            try:
+                result = send()
+            except Exception as error:  # pylint: disable=broad-except
+                delay = self._get_retry_delay(classify(method, error), error, attempt, _take_budget)
+                if delay is None:
+                    raise
+            else:
+                reason = "not_ready" if should_retry is not None and should_retry(result) else classify(method, result)
+                delay = self._get_retry_delay(reason, result, attempt, _take_budget)
+                if delay is None:
+                    return result
+            time.sleep(delay)
+            attempt += 1
+
+    async def call_async(self, send, method: str = "GET", should_retry=None):
+        """
+        Await send until it succeeds, a failure is not retryable, or the retries are used up
+
+        Backoff delays are awaited without blocking the event loop, and retries are taken from the budget of the
+        current asyncio task, see start_task.
+
+        :param send: callable returning an awaitable of the response
+        :param method: HTTP method of the request, decides whether a failure after sending may be retried
+        :param should_retry: callable returning True when a successful result is not ready and should be fetched again
+        :return: last result of send, a response with a retryable status is returned once the retries are used up
+        """
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        attempt = 0
+        while True:
+            try:
+                result = await send()
+            except Exception as error:  # pylint: disable=broad-except
+                delay = self._get_retry_delay(classify(method, error), error, attempt, _take_task_budget)
+                if delay is None:
+                    raise
+            else:
+                reason = "not_ready" if should_retry is not None and should_retry(result) else classify(method, result)
+                delay = self._get_retry_delay(reason, result, attempt, _take_task_budget)
+                if delay is None:
+                    return result
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _get_retry_delay(self, reason, outcome, attempt: int, take_budget):
+        """Get the delay before the next attempt, or None if the call must not be retried"""
+        if not self._can_retry(reason, attempt, take_budget):
+            return None
+        delay = self._get_delay(attempt, get_retry_after(outcome))
+        METRICS.increment("retry.retries")
+        METRICS.increment(f"retry.{reason}")
+        METRICS.observe("retry.wait_seconds", delay)
+        return delay
+
+    def _can_retry(self, reason, attempt: int, take_budget) -> bool:
+        if reason is None:
+            return False
+        if attempt >= _get_setting(self.retries, RETRIES, DEFAULT_RETRIES, int):
+            METRICS.increment("retry.exhausted")
+            return False
+        if not take_budget():
+            METRICS.increment("retry.budget_exhausted")
+            return False
+        return True
+
+    def _get_delay(self, attempt: int, retry_after) -> float:
+        base_delay = _get_setting(self.base_delay, RETRY_BASE_DELAY, DEFAULT_BASE_DELAY, float)
+        max_delay = _get_setting(self.max_delay, RETRY_MAX_DELAY, DEFAULT_MAX_DELAY, float)
+        delay = min(base_delay * 2**attempt, max_delay) * random.uniform(0.5, 1.0)  # nosec - jitter, not security
+        return max(delay, retry_after or 0.0)
+
+
+def classify(method: str, outcome):
+    """
+    Decide whether a failed call may be sent again
+
+    :param method: HTTP method of the request
+    :param outcome: exception raised by the call, or the response it returned
+    :return: retry reason, one of throttled, server_error or connection, or None if it must not be retried
+    """
+    reason = get_failure(outcome)
+    if reason == "throttled" or (method or "GET").upper() in IDEMPOTENT_METHODS:
+        return reason
+    return None
+
+
+def get_failure(outcome):
+    """
+    Classify the outcome of a call regardless of its method
+
+    :param outcome: exception raised by the call, or the response it returned
+    :return: throttled, server_error or connection, or None if the call succeeded or was rejected as a client error
+    """
+    status = getattr(outcome, "status", None) or getattr(outcome, "status_code", None)
+    if status in THROTTLED_STATUS_CODES:
+        return "throttled"
+    if status in SERVER_ERROR_STATUS_CODES:
+        return "server_error"
+    if isinstance(outcome, BaseException) and not status and _is_connection_error(outcome):
+        return "connection"
+    return None
+
+
+def start_command():
+    """Give the command about to run on this thread a full retry budget"""
+    _BUDGET.state = {"remaining": _get_setting(None, RETRY_BUDGET, DEFAULT_BUDGET, int)}
+
+
+def start_task():
+    """Give the asyncio task about to run a full retry budget, tasks it creates start with what it has left"""
+    _TASK_BUDGET.set(_get_setting(None, RETRY_BUDGET, DEFAULT_BUDGET, int))
+
+
+def _get_budget() -> dict:
+    if not hasattr(_BUDGET, "state"):
+        start_command()
+    return _BUDGET.state
+
+
+def _take_budget() -> bool:
+    budget = _get_budget()
+    if budget["remaining"] <= 0:
+        return False
+    budget["remaining"] -= 1
+    return True
+
+
+def _take_task_budget() -> bool:
+    if _TASK_BUDGET.get() is None:
+        start_task()
+    remaining = _TASK_BUDGET.get()
+    if not remaining:
+        return False
+    _TASK_BUDGET.set(remaining - 1)
+    return True
+
+
+def _is_connection_error(error) -> bool:
+    if isinstance(error, (OSError, TimeoutError)):
+        return True
+    return type(error).__module__.split(".")[0] == "urllib3"
+
+
+def _get_setting(value, env_name, default, convert):
+    if value is not None:
+        return value
+    return convert(os.getenv(env_name, str(default)))
+
+
+POLICY = RetryPolicy()
@@ -0,0 +1,260 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+Schema Validation
+
+Checks configuration, manifest and listing files against the schemas in azureiai/schemas before any API call, so a
+missing or mistyped key fails in milliseconds instead of part way through a submission. Schemas are compiled once into
+nested checks covering the JSON Schema keywords they use: type, properties, additionalProperties, required, items, enum,
+minItems, maxItems, uniqueItems, minLength, maxLength and local $ref. Set AZPC_VALIDATE=0 to skip validation.
+"""
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+VALIDATE = "AZPC_VALIDATE"
+
+SCHEMA_DIR = Path(__file__).parents[1].joinpath("schemas")
+CONFIG_SCHEMA = "schema_config"
+LISTING_CONFIG_SCHEMA = "schema_listing_config"
+MANIFEST_SCHEMA = "schema_manifest"
+
+_TYPES = {
+    "object": (lambda value: isinstance(value, dict)),
+    "array": (lambda value: isinstance(value, list)),
+    "list": (lambda value: isinstance(value, list)),
+    "string": (lambda value: isinstance(value, str)),
+    "boolean": (lambda value: isinstance(value, bool)),
+    "integer": (lambda value: isinstance(value, int) and not isinstance(value, bool)),
+    "number": (lambda value: isinstance(value, (int, float)) and not isinstance(value, bool)),
+    "null": (lambda value: value is None),
+}
+
+
+class SchemaValidationError(ValueError):
+    """Raised with every violation found in a file"""
+
+    def __init__(self, source, errors: list):
+        self.source = source
+        self.errors = errors
+        super().__init__(f"{source} does not match its schema:\n" + "\n".join(f"  {error}" for error in errors))
+
+
+def is_enabled() -> bool:
+    """Check if validation is enabled, see AZPC_VALIDATE"""
+    return os.getenv(VALIDATE, "1") != "0"
+
+
+@lru_cache(maxsize=None)
+def get_validator(schema_name: str):
+    """
+    Load and compile a schema from azureiai/schemas
+
+    :param schema_name: schema file name without extension, e.g. schema_listing_config
+    :return: callable taking an instance and returning a list of error messages
+    """
+    with open(SCHEMA_DIR.joinpath(f"{schema_name}.json"), "r", encoding="utf8") as read_file:
+        check = compile_schema(json.load(read_file))
+
+    def validator(instance) -> list:
+        errors: list = []
+        check(instance, "$", errors)
+        return errors
+
+    return validator
+
+
+def compile_schema(schema, root: dict = None, refs: dict = None):
+    """
+    Compile a schema into a check
+
+    Subschemas that are not objects, such as the malformed entries some hand-written schemas carry, accept anything.
+
+    :param schema: JSON Schema object
+    :param root: schema that local references such as #/$defs/plan resolve against, default: schema
+    :param refs: compiled references shared within one root schema
+    :return: callable taking an instance, its path and a list to append error messages to
+    """
+    if not isinstance(schema, dict):
+        return lambda instance, path, errors: None
+    root = schema if root is None else root
+    refs = {} if refs is None else refs
+
+    checks = []
+    if "$ref" in schema:
+        checks.append(_compile_ref(schema["$ref"], root, refs))
+    if "type" in schema:
+        checks.append(_compile_type(schema["type"]))
+    if "enum" in schema:
+        checks.append(_compile_enum(schema["enum"]))
+    if "required" in schema:
+        checks.append(_compile_required(schema["required"]))
+    if "properties" in schema or "additionalProperties" in schema:
+        checks.append(
+            _compile_properties(schema.get("properties", {}), schema.get("additionalProperties", True), root, refs)
+        )
+    if "items" in schema:
+        checks.append(_compile_items(schema["items"], root, refs))
+    checks.extend(_compile_bounds(schema))
+
+    def check(instance, path, errors):
+        for sub_check in checks:
+            if sub_check(instance, path, errors) is False:
+                return
+
+    return check
+
+
+def validate(instance, schema_name: str, source=None):
+    """
+    Validate an instance, reporting all violations at once
+
+    :param instance: parsed configuration
+    :param schema_name: schema file name without extension
+    :param source: file the instance was read from, used in the error message
+    :raises SchemaValidationError: if the instance does not match the schema
+    """
+    errors = get_validator(schema_name)(instance)
+    if errors:
+        raise SchemaValidationError(source or schema_name, errors)
+
+
+def validate_file(path, schema_name: str):
+    """
+    Validate a json or yaml file, skipped when AZPC_VALIDATE=0 or the file does not exist
+
+    Missing files are left to the commands reading them, which raise their own errors.
+
+    :param path: json, yml or yaml file
+    :param schema_name: schema file name without extension
+    :raises SchemaValidationError: if the file does not match the schema
+    """
+    path = Path(path)
+    if not is_enabled() or not path.is_file():
+        return
+    with open(path, "r", encoding="utf8") as read_file:
+        if path.suffix in [".yml", ".yaml"]:
+            import yaml  # pylint: disable=import-outside-toplevel
+
+            instance = yaml.safe_load(read_file)
+        else:
+            instance = json.load(read_file)
+    validate(instance, schema_name, path)
+
+
+def _compile_type(type_names):
+    type_names = type_names if isinstance(type_names, list) else [type_names]
+    type_checks = [_TYPES[type_name] for type_name in type_names if type_name in _TYPES]
+    expected = " or ".join(type_names)
+
+    def check(instance, path, errors):
+        if type_checks and not any(type_check(instance) for type_check in type_checks):
+            errors.append(f"{path}: expected {expected}, got {type(instance).__name__}")
+            return False
+        return True
+
+    return check
+
+
+def _compile_enum(values):
+    def check(instance, path, errors):
+        if instance not in values:
+            errors.append(f"{path}: {instance!r} is not one of {values}")
+
+    return check
+
+
+def _compile_required(keys):
+    def check(instance, path, errors):
+        if isinstance(instance, dict):
+            for key in keys:
+                if key not in instance:
+                    errors.append(f"{path}: missing required key '{key}'")
+
+    return check
+
+
+def _compile_ref(ref: str, root: dict, refs: dict):
+    if not ref.startswith("#"):
+        raise ValueError(f"Only local schema references are supported: {ref}")
+    if ref not in refs:
+        refs[ref] = None
+        target = root
+        for token in filter(None, ref[1:].split("/")):
+            target = target[token.replace("~1", "/").replace("~0", "~")]
+        refs[ref] = compile_schema(target, root, refs)
+
+    def check(instance, path, errors):
+        return refs[ref](instance, path, errors)
+
+    return check
+
+
+def _compile_properties(properties, additional_properties, root, refs):
+    property_checks = {name: compile_schema(subschema, root, refs) for name, subschema in properties.items()}
+    additional_check = None
+    if additional_properties is False:
+        additional_check = _reject_additional_property
+    elif isinstance(additional_properties, dict):
+        additional_check = compile_schema(additional_properties, root, refs)
+
+    def check(instance, path, errors):
+        if isinstance(instance, dict):
+            for name, value in instance.items():
+                property_check = property_checks.get(name, additional_check)
+                if property_check is not None:
+                    property_check(value, f"{path}.{name}", errors)
+
+    return check
+
+
+def _reject_additional_property(instance, path, errors):  # pylint: disable=unused-argument
+    errors.append(f"{path}: unexpected key")
+
+
+def _compile_items(items, root, refs):
+    item_check = compile_schema(items, root, refs)
+
+    def check(instance, path, errors):
+        if isinstance(instance, list):
+            for index, item in enumerate(instance):
+                item_check(item, f"{path}[{index}]", errors)
+
+    return check
+
+
+def _compile_bounds(schema):
+    bounds = [
+        ("minItems", list, lambda size, bound: size >= bound, "at least {} items"),
+        ("maxItems", list, lambda size, bound: size <= bound, "at most {} items"),
+        ("minLength", str, lambda size, bound: size >= bound, "at least {} characters"),
+        ("maxLength", str, lambda size, bound: size <= bound, "at most {} characters"),
+    ]
+    checks = [
+        _compile_bound(schema[keyword], kind, compare, message)
+        for keyword, kind, compare, message in bounds
+        if keyword in schema
+    ]
+    if schema.get("uniqueItems"):
+        checks.append(_check_unique_items)
+    return checks
+
+
+def _compile_bound(bound, kind, compare, message):
+    def check(instance, path, errors):
+        if isinstance(instance, kind) and not compare(len(instance), bound):
+            errors.append(f"{path}: expected {message.format(bound)}, got {len(instance)}")
+
+    return check
+
+
+def _check_unique_items(instance, path, errors):
+    if isinstance(instance, list):
+        seen = []
+        for item in instance:
+            if item in seen:
+                errors.append(f"{path}: {item!r} is not unique")
+                return
+            seen.append(item)
@@ -0,0 +1,181 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+Shared HTTP Sessions
+
+Calls that do not go through the swagger client, such as SAS uploads to blob storage and the Cloud Partner Portal API,
+use these sessions. Each thread gets its own requests.Session, and all of them mount one HTTPAdapter, so connections
+are pooled and reused across the whole process. Requests are rate limited, retried, and fail fast while their endpoint
+is down. requests is only imported once the first session is created.
+"""
+import os
+import threading
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+from azureiai.managed_apps.circuit_breaker import BREAKER
+from azureiai.managed_apps.rate_limit import RATE_LIMITER
+from azureiai.managed_apps.retry import POLICY, RetryPolicy
+
+if TYPE_CHECKING:
+    import requests
+
+POOL_CONNECTIONS = "AZPC_HTTP_POOL_CONNECTIONS"
+POOL_MAXSIZE = "AZPC_HTTP_POOL_MAXSIZE"
+CONNECT_TIMEOUT = "AZPC_HTTP_CONNECT_TIMEOUT"
+READ_TIMEOUT = "AZPC_HTTP_READ_TIMEOUT"
+
+DEFAULT_POOL_CONNECTIONS = 8
+DEFAULT_POOL_MAXSIZE = 16
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 300.0
+
+
+class SessionRegistry:
+    """Thread-safe registry of requests Sessions sharing one connection pool"""
+
+    def __init__(self, pool_connections: int = None, pool_maxsize: int = None, timeout=None):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self._adapter = None
+        self._sessions: list = []
+        self._local = threading.local()
+        self._lock = threading.RLock()
+
+    def configure(self, pool_connections: int = None, pool_maxsize: int = None, timeout=None):
+        """
+        Configure the shared sessions. Open sessions are closed and rebuilt on next use.
+
+        :param pool_connections: number of hosts to keep connection pools for
+        :param pool_maxsize: maximum number of connections kept alive per host
+        :param timeout: default timeout in seconds, or a (connect, read) tuple
+        """
+        with self._lock:
+            self.close()
+            self.pool_connections = pool_connections
+            self.pool_maxsize = pool_maxsize
+            self.timeout = timeout
+
+    def get_session(self) -> "requests.Session":
+        """
+        Get or Create the calling thread's Session
+
+        :return: Session mounted on the shared connection pool
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests  # pylint: disable=import-outside-toplevel,redefined-outer-name
+            from requests.adapters import HTTPAdapter  # pylint: disable=import-outside-toplevel
+
+            with self._lock:
+                if self._adapter is None:
+                    self._adapter = HTTPAdapter(
+                        pool_connections=self._get_setting(
+                            self.pool_connections, POOL_CONNECTIONS, DEFAULT_POOL_CONNECTIONS
+                        ),
+                        pool_maxsize=self._get_setting(self.pool_maxsize, POOL_MAXSIZE, DEFAULT_POOL_MAXSIZE),
+                    )
+                session = requests.Session()
+                session.mount("https://", self._adapter)
+                session.mount("http://", self._adapter)
+                self._sessions.append(session)
+                self._local.session = session
+        return session
+
+    def request(self, method: str, url: str, retry_policy: RetryPolicy = None, **kwargs) -> "requests.Response":
+        """
+        Send a request on the shared connection pool
+
+        :param method: HTTP method
+        :param url: request url
+        :param retry_policy: policy retrying throttled and failed requests, default: the process-wide policy
+        :param kwargs: passed through to requests, a default timeout is applied when none is given
+        :return: response
+        """
+        kwargs.setdefault("timeout", self.get_timeout())
+        body = kwargs.get("data")
+        start = _tell(body)
+
+        def send():
+            if start is not None:
+                body.seek(start)
+            return BREAKER.call(
+                url, lambda: self.get_session().request(method, url, **kwargs), before=lambda: RATE_LIMITER.acquire(url)
+            )
+
+        if start is None and (hasattr(body, "read") or isinstance(body, Iterator)):
+            # a streamed body that cannot be rewound would be sent empty on a retry
+            return send()
+        return (retry_policy or POLICY).call(send, method=method)
+
+    def get_timeout(self):
+        """Get the default (connect, read) timeout"""
+        if self.timeout is not None:
+            return self.timeout
+        return (
+            float(os.getenv(CONNECT_TIMEOUT, str(DEFAULT_CONNECT_TIMEOUT))),
+            float(os.getenv(READ_TIMEOUT, str(DEFAULT_READ_TIMEOUT))),
+        )
+
+    def close(self):
+        """Close every Session and the shared connection pool"""
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            if self._adapter is not None:
+                self._adapter.close()
+            self._adapter = None
+            self._sessions = []
+            self._local = threading.local()
+
+    @staticmethod
+    def _get_setting(value, env_name, default):
+        if value is not None:
+            return value
+        return int(os.getenv(env_name, str(default)))
+
+
+REGISTRY = SessionRegistry()
+
+
+def get(url: str, **kwargs) -> "requests.Response":
+    """Send a GET request on the shared connection pool"""
+    return REGISTRY.request("GET", url, **kwargs)
+
+
+def _tell(body):
+    """Get the position a file body is read from, None if it is not a seekable file"""
+    if not hasattr(body, "seek") or not hasattr(body, "tell"):
+        return None
+    try:
+        return body.tell()
+    except OSError:
+        return None
+
+
+def put(url: str, data=None, **kwargs) -> "requests.Response":
+    """Send a PUT request on the shared connection pool"""
+    return REGISTRY.request("PUT", url, data=data, **kwargs)
+
+
+def post(url: str, data=None, json=None, **kwargs) -> "requests.Response":
+    """Send a POST request on the shared connection pool"""
+    return REGISTRY.request("POST", url, data=data, json=json, **kwargs)
+
+
+def configure_sessions(pool_connections: int = None, pool_maxsize: int = None, timeout=None):
+    """
+    Configure the process-wide sessions
+
+    :param pool_connections: number of hosts to keep connection pools for
+    :param pool_maxsize: maximum number of connections kept alive per host
+    :param timeout: default timeout in seconds, or a (connect, read) tuple
+    """
+    REGISTRY.configure(pool_connections=pool_connections, pool_maxsize=pool_maxsize, timeout=timeout)
+
+
+def close_sessions():
+    """Close the process-wide sessions and their connection pool"""
+    REGISTRY.close()
@@ -0,0 +1,206 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+Token Cache
+
+AAD access tokens are cached on disk under AZPC_CACHE_DIR/tokens, keyed by tenant, client and resource, so consecutive
+azpc invocations reuse one token instead of logging in every time. A token is refreshed once it is within
+AZPC_TOKEN_REFRESH_MARGIN seconds of expiry. Set AZPC_TOKEN_CACHE=0 to disable the cache.
+
+Azure CLI tokens are keyed by the tenant and user of the account the CLI is logged in to, read from its profile, so
+az login and az account set take effect on the next invocation. Without a readable profile they are not cached.
+"""
+import hashlib
+import json
+import os
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from azureiai.managed_apps.file_cache import get_cache_dir, locked, read_json, write_json
+from azureiai.managed_apps.utils import AAD_CRED, AAD_ID, TENANT_ID
+
+TOKEN_CACHE = "AZPC_TOKEN_CACHE"
+TOKEN_REFRESH_MARGIN = "AZPC_TOKEN_REFRESH_MARGIN"
+
+DEFAULT_REFRESH_MARGIN = 300
+DEFAULT_TOKEN_LIFETIME = 3599
+TOKEN_CACHE_DIR = "tokens"
+AZURE_CLI = "azure-cli"
+AZURE_CONFIG_DIR = "AZURE_CONFIG_DIR"
+AZURE_PROFILE = "azureProfile.json"
+PARTNER_CENTER_RESOURCE = "https://api.partner.microsoft.com"
+
+AccessToken = namedtuple("AccessToken", ["token", "expires_on"])
+
+
+def get_access_token(tenant_id: str, client_id: str, resource: str, acquire) -> AccessToken:
+    """
+    Get a cached access token, acquiring a new one if there is none or it is about to expire
+
+    Every token is cached in its own file, which stays locked while the token is acquired, so concurrent processes
+    wait for one login instead of all logging in at once while tokens for other resources are acquired in parallel.
+
+    :param tenant_id: AAD tenant id
+    :param client_id: AAD application id
+    :param resource: resource the token is for, e.g. https://api.partner.microsoft.com
+    :param acquire: callable returning a new (access token, expiry as epoch seconds) tuple
+    :return: access token and its expiry
+    """
+    if os.getenv(TOKEN_CACHE, "1") == "0":
+        return AccessToken(*acquire())
+    path = get_token_path(tenant_id, client_id, resource)
+    with locked(path):
+        cached = read_json(path)
+        if cached and not needs_refresh(AccessToken(cached["access_token"], cached["expires_on"])):
+            return AccessToken(cached["access_token"], cached["expires_on"])
+        access_token = AccessToken(*acquire())
+        write_json(path, {"access_token": access_token.token, "expires_on": access_token.expires_on})
+    return access_token
+
+
+def get_token(tenant_id: str, client_id: str, resource: str, acquire) -> str:
+    """
+    Get a cached access token, see get_access_token
+
+    :return: access token
+    """
+    return get_access_token(tenant_id, client_id, resource, acquire).token
+
+
+def get_token_path(tenant_id: str, client_id: str, resource: str) -> Path:
+    """Get the cache file of a token"""
+    key = hashlib.sha256(f"{tenant_id}|{client_id}|{resource}".encode("utf8")).hexdigest()
+    return get_cache_dir().joinpath(TOKEN_CACHE_DIR, f"{key}.json")
+
+
+def needs_refresh(access_token: AccessToken) -> bool:
+    """Check if a token expires within AZPC_TOKEN_REFRESH_MARGIN seconds"""
+    return access_token.expires_on - _get_refresh_margin() <= time.time()
+
+
+def get_client_credentials_access_token(
+    tenant_id: str, client_id: str, client_secret: str, resource: str
+) -> AccessToken:
+    """
+    Get an access token for a service principal through ADAL
+
+    :param tenant_id: AAD tenant id
+    :param client_id: AAD application id
+    :param client_secret: AAD application secret
+    :param resource: resource the token is for
+    :return: access token and its expiry
+    """
+
+    def acquire():
+        from adal import AuthenticationContext  # pylint: disable=import-outside-toplevel
+
+        auth_context = AuthenticationContext(f"https://login.microsoftonline.com/{tenant_id}")
+        token_response = auth_context.acquire_token_with_client_credentials(
+            resource=resource,
+            client_id=client_id,
+            client_secret=client_secret,
+        )
+        expires_in = int(token_response.get("expiresIn", DEFAULT_TOKEN_LIFETIME))
+        return token_response["accessToken"], time.time() + expires_in
+
+    return get_access_token(tenant_id, client_id, resource, acquire)
+
+
+def get_client_credentials_token(tenant_id: str, client_id: str, client_secret: str, resource: str) -> str:
+    """
+    Get an access token for a service principal through ADAL
+
+    :param tenant_id: AAD tenant id
+    :param client_id: AAD application id
+    :param client_secret: AAD application secret
+    :param resource: resource the token is for
+    :return: access token
+    """
+    return get_client_credentials_access_token(tenant_id, client_id, client_secret, resource).token
+
+
+def get_cli_token(resource: str) -> str:
+    """
+    Get an access token for the account logged in to the Azure CLI
+
+    :param resource: resource the token is for
+    :return: access token
+    """
+
+    def acquire():
+        from azure.identity import AzureCliCredential  # pylint: disable=import-outside-toplevel
+
+        token = AzureCliCredential().get_token(resource)
+        return token.token, token.expires_on
+
+    account = get_cli_account()
+    if account is None:
+        return acquire()[0]
+    tenant_id, user = account
+    return get_token(tenant_id, f"{AZURE_CLI}|{user}", resource, acquire)
+
+
+def get_cli_account():
+    """
+    Get the account the Azure CLI is logged in to, from the default subscription of its profile
+
+    :return: (tenant id, user name) tuple, or None if the profile cannot be read or has no default subscription
+    """
+    config_dir = os.getenv(AZURE_CONFIG_DIR) or Path.home().joinpath(".azure")
+    try:
+        profile = json.loads(Path(config_dir).joinpath(AZURE_PROFILE).read_text(encoding="utf-8-sig"))
+    except (OSError, ValueError):
+        return None
+    for subscription in profile.get("subscriptions") or []:
+        if subscription.get("isDefault"):
+            return subscription.get("tenantId"), (subscription.get("user") or {}).get("name")
+    return None
+
+
+def get_partner_center_authorization(config_yaml: str) -> str:
+    """
+    Create the Authorization header of Partner Center API requests
+
+    :param config_yaml: configuration with aad_id, aad_secret and tenant_id, without it the Azure CLI login is used
+    :return: Authorization Header contents
+    """
+    if not os.path.exists(config_yaml):
+        return f"Bearer {get_cli_token(PARTNER_CENTER_RESOURCE)}"
+    tenant_id, client_id, client_secret = _get_client_credentials(config_yaml)
+    return f"Bearer {get_client_credentials_token(tenant_id, client_id, client_secret, PARTNER_CENTER_RESOURCE)}"
+
+
+def get_account_id(config_yaml: str):
+    """
+    Identify the account Partner Center requests are authorized as, see get_partner_center_authorization
+
+    :param config_yaml: configuration with aad_id, aad_secret and tenant_id, without it the Azure CLI login is used
+    :return: tenant id and client id, or tenant id and Azure CLI user, or None if the Azure CLI account is unknown
+    """
+    if not os.path.exists(config_yaml):
+        account = get_cli_account()
+        if account is None:
+            return None
+        tenant_id, user = account
+        return f"{tenant_id}|{AZURE_CLI}|{user}"
+    tenant_id, client_id, _ = _get_client_credentials(config_yaml)
+    return f"{tenant_id}|{client_id}"
+
+
+def _get_client_credentials(config_yaml: str) -> tuple:
+    """Get the tenant id, client id and client secret of the configuration, overridden by the environment"""
+    import yaml  # pylint: disable=import-outside-toplevel
+
+    with open(config_yaml, encoding="utf8") as file:
+        settings = yaml.safe_load(file)
+
+    client_id = os.getenv(AAD_ID, settings["aad_id"])
+    client_secret = os.getenv(AAD_CRED, settings["aad_secret"])
+    tenant_id = os.getenv(TENANT_ID, settings["tenant_id"])
+    return tenant_id, client_id, client_secret
+
+
+def _get_refresh_margin() -> float:
+    return float(os.getenv(TOKEN_REFRESH_MARGIN, str(DEFAULT_REFRESH_MARGIN)))
@@ -2,31 +2,31 @@
 #  Copyright (c) Microsoft Corporation. All rights reserved.
 #  ---------------------------------------------------------
 """Common Utilities and Constants"""
-from time import sleep
+import os
+from concurrent.futures import ThreadPoolExecutor
 
-from swagger_client import BranchesApi
+from azureiai.managed_apps.branch_cache import BRANCH_CACHE
+from azureiai.managed_apps.retry import POLICY
 
-BRANCHES_API = BranchesApi()
 
-
-def get_draft_instance_id(product_id, authorization, module: str, retry: int = 0):
+def get_draft_instance_id(product_id, authorization, module: str):
     """
     Common Static Method for Retrieving Draft Instance ID for applications or properties
 
+    Branches of a new product appear asynchronously, so the lookup is retried with backoff until the product level
+    draft instance exists.
+
     :param product_id: Managed Application Product ID
     :param authorization: Authorization object
     :param module: name of draft instance to look up
-    :param retry: retry attempt number, will retry 3 times before failing
     :return: response
     """
-    api_response = BRANCHES_API.products_product_id_branches_get_by_module_modulemodule_get(
-        product_id=product_id, module=module, authorization=authorization
+    draft_instance_ids = POLICY.call(
+        lambda: BRANCH_CACHE.get(product_id, authorization, module), should_retry=lambda ids: None not in ids
     )
-    if not api_response.value:
-        if retry < 5:
-            return get_draft_instance_id(product_id, authorization, module=module, retry=retry + 1)
+    if None not in draft_instance_ids:
         raise ConnectionError("Retry Failed")
-    return api_response.value[0].current_draft_instance_id
+    return draft_instance_ids[None]
 
 
 def get_variant_draft_instance_id(plan_id, product_id, authorization, module: str):
@@ -39,22 +39,50 @@ def get_variant_draft_instance_id(plan_id, product_id, authorization, module: st
     :param module: name of draft instance to look up
     :return: response
     """
-    sleep(3)
-    api_response = BRANCHES_API.products_product_id_branches_get_by_module_modulemodule_get(
-        product_id=product_id,
-        module=module,
-        authorization=authorization,
-    )
-    return _find_plan(plan_id, api_response)
+    draft_instance_id = BRANCH_CACHE.get_variant(product_id, authorization, module, plan_id)
+    if draft_instance_id is None:
+        raise ValueError(f"Expected Plan {plan_id} not found in {module} branches")
+    return draft_instance_id
+
+
+def get_branch_draft_instance_ids(product_id, authorization, module: str) -> dict:
+    """
+    Retrieve every Draft Instance ID of a module, shared through the process-wide Branch Cache
+
+    :param product_id: Application Product ID
+    :param authorization: Authorization object
+    :param module: name of draft instances to look up
+    :return: dict of variant id to draft instance id, the product level draft instance is keyed by None
+    """
+    return BRANCH_CACHE.get(product_id, authorization, module)
+
+
+def resolve_draft_instance_ids(product_id, authorization, modules, max_workers: int = None) -> dict:
+    """
+    Retrieve the Draft Instance IDs of several modules concurrently, one Branch API call per module
+
+    :param product_id: Application Product ID
+    :param authorization: Authorization object
+    :param modules: names of modules to look up
+    :param max_workers: maximum number of concurrent requests, default: AZPC_MAX_WORKERS or 4
+    :return: dict of module to dict of variant id to draft instance id
+    """
+    with ThreadPoolExecutor(max_workers=max_workers or get_max_workers()) as executor:
+        futures = {
+            module: executor.submit(get_branch_draft_instance_ids, product_id, authorization, module)
+            for module in modules
+        }
+        return {module: future.result() for module, future in futures.items()}
 
 
-def _find_plan(plan_id, api_response, i=0):
-    if api_response.value[i].variant_id == plan_id:
-        return api_response.value[i].current_draft_instance_id
-    return _find_plan(plan_id, api_response, i + 1)
+def get_max_workers() -> int:
+    """Get the maximum number of concurrent requests a single command may issue"""
+    return int(os.getenv(MAX_WORKERS, str(DEFAULT_MAX_WORKERS)))
 
 
 ACCESS_ID = "AZURE_CLIENT_ID"
 TENANT_ID = "AZURE_TENANT_ID"
 AAD_ID = "AZURE_CLIENT_ID"
 AAD_CRED = "AZURE_CLIENT_SECRET"
+MAX_WORKERS = "AZPC_MAX_WORKERS"
+DEFAULT_MAX_WORKERS = 4
@@ -4,15 +4,24 @@
 """CLI Wrapper for Creating, Updating, or Deleting Azure Managed Applications"""
 import json
 import sys
+from collections.abc import Iterator
 
+from azureiai.managed_apps import retry
 from azureiai.partner_center.cli_parser import CLIParser
-from azureiai.partner_center.plan import PlanCLIParser
 
 
-def run(submission: CLIParser):
-    """CLI Application"""
-    subgroup = sys.argv[1]
-    command = sys.argv[2]
+def run(submission, argv: list = None):
+    """
+    CLI Application
+
+    :param submission: CLIParser, or a callable taking argv and returning one, called only when a command is run
+    :param argv: command line arguments without the program name, default: sys.argv[1:]
+    :return: help text or indented JSON, or a generator of one JSON line per item for list --output ndjson
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    subgroup = argv[0]
+    command = argv[1]
     help_text = f"""
     Group:
         azpc {subgroup}: Manage Partner Center submissions.
@@ -32,6 +41,36 @@ def run(submission: CLIParser):
     if command in ["--help", "-h"]:
         return help_text
 
+    output = dispatch(submission, argv)
+    if isinstance(output, Iterator):
+        return (json.dumps(item, default=_to_json) for item in output)
+    return json.dumps(output, default=_to_json, indent=4)
+
+
+def _to_json(value):
+    return hasattr(value, "__dict__") if value.__dict__ else value
+
+
+def dispatch(submission, argv: list):
+    """
+    Run a command and return its result without formatting it
+
+    Every command starts with a full retry budget. Ids served from the ID Index are confirmed before they are used, so
+    a command runs once even if an entry is stale.
+
+    :param submission: CLIParser, or a callable taking argv and returning one
+    :param argv: command line arguments without the program name, e.g. ["ma", "show", "--name", "offer"]
+    :return: command result
+    """
+    retry.start_command()
+    return _dispatch(submission, argv)
+
+
+def _dispatch(submission, argv: list):
+    if argv[1] == "plan":
+        return run_plan(argv)
+    if not isinstance(submission, CLIParser):
+        submission = submission(argv)
     commands = {
         "create": submission.create,
         "delete": submission.delete,
@@ -41,17 +80,21 @@ def run(submission: CLIParser):
         "show": submission.show,
         "update": submission.update,
         "release": submission.release,
-        "plan": run_plan,
     }
-    output = commands[command]()
-    return json.dumps(output, default=lambda x: hasattr(x, "__dict__") if x.__dict__ else x, indent=4)
+    return commands[argv[1]]()
 
 
-def run_plan():
-    """CLI Application"""
-    subgroup = sys.argv[1]
-    command = sys.argv[2]
-    plan_command = sys.argv[3]
+def run_plan(argv: list = None):
+    """
+    CLI Application
+
+    :param argv: command line arguments without the program name, default: sys.argv[1:]
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    subgroup = argv[0]
+    command = argv[1]
+    plan_command = argv[2]
     help_text = f"""
     Group:
         azpc {subgroup} {command}: Manage Partner Center Plan submissions.
@@ -67,7 +110,9 @@ def run_plan():
     if plan_command in ["--help", "-h"]:
         return help_text
 
-    plan = PlanCLIParser()
+    from azureiai.partner_center.plan import PlanCLIParser  # pylint: disable=import-outside-toplevel
+
+    plan = PlanCLIParser(argv=argv)
     commands = {
         "create": plan.create,
         "delete": plan.delete,
@@ -5,12 +5,13 @@
 from abc import abstractmethod
 
 import yaml
-from adal import AuthenticationContext
 from azure.core.exceptions import ClientAuthenticationError
 from azure.identity import CredentialUnavailableError
 
+from azureiai.managed_apps.clients import get_api
 from azureiai.managed_apps.confs import ResellerConfiguration
 from azureiai.managed_apps.confs.variant import FeatureAvailability
+from azureiai.managed_apps.token_cache import get_cli_token, get_client_credentials_token
 from azureiai.managed_apps.utils import (
     get_draft_instance_id,
     get_variant_draft_instance_id,
@@ -35,12 +36,12 @@ class AbstractOffer:
         self._authorization = None
 
         self._apis = {
-            "product": ProductApi(),
-            "variant": VariantApi(),
-            "property": PropertyApi(),
-            "branches": BranchesApi(),
-            "product_availability": ProductAvailabilityApi(),
-            "submission": SubmissionApi(),
+            "product": get_api(ProductApi),
+            "variant": get_api(VariantApi),
+            "property": get_api(PropertyApi),
+            "branches": get_api(BranchesApi),
+            "product_availability": get_api(ProductAvailabilityApi),
+            "submission": get_api(SubmissionApi),
         }
 
         self._ids = {
@@ -60,12 +61,7 @@ class AbstractOffer:
         """
         if self._authorization is None:
             try:
-                from azure.identity import AzureCliCredential
-                from azure.mgmt.resource import SubscriptionClient
-
-                credential = AzureCliCredential()
-                token = credential.get_token("https://api.partner.microsoft.com").token
-                self._authorization = f"Bearer {token}"
+                self._authorization = f"Bearer {get_cli_token('https://api.partner.microsoft.com')}"
             except (CredentialUnavailableError, ClientAuthenticationError):
                 with open(self.config_yaml, encoding="utf8") as file:
                     settings = yaml.safe_load(file)
@@ -74,13 +70,10 @@ class AbstractOffer:
                 client_secret = settings["aad_secret"]
                 tenant_id = settings["tenant_id"]
 
-                auth_context = AuthenticationContext(f"https://login.microsoftonline.com/{tenant_id}")
-                token_response = auth_context.acquire_token_with_client_credentials(
-                    resource="https://api.partner.microsoft.com",
-                    client_id=client_id,
-                    client_secret=client_secret,
+                token = get_client_credentials_token(
+                    tenant_id, client_id, client_secret, "https://api.partner.microsoft.com"
                 )
-                self._authorization = f"Bearer {token_response['accessToken'].token}"
+                self._authorization = f"Bearer {token}"
         return self._authorization
 
     def get_product_id(self) -> str:
@@ -122,9 +115,9 @@ class AbstractOffer:
     def create(self) -> str:
         """Create new Azure Managed Application and set product id."""
 
-    def _get_draft_instance_id(self, module: str, retry: int = 0):
+    def _get_draft_instance_id(self, module: str):
         """Call Branch API to get Configuration ID"""
-        return get_draft_instance_id(self.get_product_id(), self.get_auth(), module, retry)
+        return get_draft_instance_id(self.get_product_id(), self.get_auth(), module)
 
     def _get_variant_draft_instance_id(self, module: str, retry: int = 0) -> str:
         return get_variant_draft_instance_id(self.get_product_id(), self.get_auth(), module, retry)
@@ -0,0 +1,320 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Asyncio counterpart of Plan"""
+import asyncio
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from azureiai.managed_apps import retry
+from azureiai.managed_apps.async_client import AsyncApiError, AsyncIngestionClient, gather_all, run_blocking
+from azureiai.managed_apps.confs.variant import FeatureAvailability, Package
+from azureiai.managed_apps.confs.variant.package import (
+    PROCESSING_INITIAL_DELAY,
+    PROCESSING_MAX_DELAY,
+    PROCESSING_TIMEOUT,
+    inject_pid,
+)
+from azureiai.managed_apps.id_index import IdIndex
+from azureiai.managed_apps.polling import poll_until_ready_async
+from azureiai.managed_apps.utils import get_max_workers
+from azureiai.partner_center.async_submission import AsyncSubmission
+from azureiai.partner_center.plan import AZURE_APPLICATION, get_plan_ids, get_plan_result
+from azureiai.partner_center.submission import VARIANT_SUBMISSION_MODULES
+
+PACKAGE_RESOURCE_TYPES = {
+    "ma": "AzureManagedApplicationPackageConfiguration",
+    "st": "AzureSolutionTemplatePackageConfiguration",
+}
+FEATURE_AVAILABILITY_EXPAND = "MarketStates,Trial,PriceSchedules"
+
+
+class AsyncPlan(AsyncSubmission):
+    """Azure Partner Center Plan driven by an async ingestion API client"""
+
+    def __init__(
+        self,
+        plan_name=None,
+        name=None,
+        config_yaml=r"config.yml",
+        app_path: str = ".",
+        json_listing_config="ma_config.json",
+        subtype="",
+        client: AsyncIngestionClient = None,
+        authorization: Optional[str] = None,
+        branches: Optional[dict] = None,
+        product_id: str = "",
+        plan_id: Optional[str] = None,
+    ):
+        """
+        :param plan_name: plan name, the externalID of the variant
+        :param subtype: ma for a managed application, st for a solution template
+        :param plan_id: variant id if already known
+        :param name: offer name, for the other parameters see AsyncSubmission
+        """
+        super().__init__(
+            name=name,
+            config_yaml=config_yaml,
+            resource_type=AZURE_APPLICATION,
+            app_path=app_path,
+            json_listing_config=json_listing_config,
+            client=client,
+            authorization=authorization,
+            branches=branches,
+            product_id=product_id,
+        )
+        self.plan_name = plan_name
+        self.subtype = subtype
+        self._ids["plan_id"] = plan_id
+
+    async def create(self) -> dict:
+        """
+        Create new AMA Plan
+
+        return: variant post api response
+        """
+        body = {
+            "resourceType": "AzureSkuVariant",
+            "state": "Active",
+            "friendlyName": self.plan_name.replace("-", " "),
+            "leadGenID": "publisher_name." + self.plan_name,
+            "externalID": self.plan_name,
+            "cloudAvailabilities": ["public-azure"],
+        }
+        if self.subtype == "ma":
+            body["SubType"] = "managed-application"
+        elif self.subtype == "st":
+            body["SubType"] = "solution-template"
+
+        product_id = await self.get_product_id()
+        variant = await self._request("POST", f"products/{product_id}/variants", body=body)
+        self._ids["plan_id"] = variant["id"]
+        await run_blocking(IdIndex(self.config_yaml).record_plans, product_id, {self.plan_name: variant["id"]})
+        self._branches.clear()
+        await self.update()
+        return variant
+
+    async def update(self):
+        """Update Existing Plan, its listing, pricing and availability and technical configuration at once"""
+        product_id = await self.get_product_id()
+        if not self._ids["plan_id"]:
+            await self.show()
+
+        await gather_all(
+            self._update_plan_listing(),
+            self._update_pricing_and_availability(),
+            self._update_technical_configuration(),
+        )
+        return product_id
+
+    async def update_all(self, max_concurrency: int = None) -> dict:
+        """
+        Update every plan of the listing configuration concurrently
+
+        The product id, the variant list and the branches of each variant module are looked up once and shared by all
+        plans. A plan that fails is reported in the result and does not stop the others.
+
+        :param max_concurrency: number of plans updated at once, default: AZPC_MAX_WORKERS or 4
+        :return: dict with the product id and, per plan name, its status and variant id or error
+        """
+        plan_names = self.get_listing_config().get_plan_names()
+        if not plan_names:
+            raise ValueError(
+                f"plan_overview of {self.json_listing_config} must be keyed by plan name to update all plans"
+            )
+        product_id = await self.get_product_id()
+        plan_ids = get_plan_ids((await self.list_contents())["value"])
+        await self.resolve_draft_instance_ids(VARIANT_SUBMISSION_MODULES)
+
+        semaphore = asyncio.Semaphore(max_concurrency or get_max_workers())
+        results = await asyncio.gather(
+            *(self._update_plan(name, plan_ids.get(name), semaphore) for name in plan_names), return_exceptions=True
+        )
+        plans = {name: get_plan_result(result) for name, result in zip(plan_names, results)}
+        return {"product_id": product_id, "plans": plans}
+
+    async def _update_plan(self, plan_name: str, plan_id: str, semaphore: asyncio.Semaphore) -> dict:
+        if plan_id is None:
+            raise LookupError(f"Plan with this name not found: {plan_name}")
+        retry.start_task()
+        plan = AsyncPlan(
+            plan_name,
+            self.name,
+            config_yaml=self.config_yaml,
+            app_path=self.app_path,
+            json_listing_config=self.json_listing_config,
+            subtype=self.subtype,
+            client=self.client,
+            authorization=self._authorization,
+            branches=self._branches,
+            product_id=self._ids["product_id"],
+            plan_id=plan_id,
+        )
+        async with semaphore:
+            await plan.update()
+        return {"status": "ok", "plan_id": plan_id}
+
+    async def iter_contents(self):
+        """Iterate over the Plans of the Submission, requesting the next page only once the previous one is consumed."""
+        product_id = await self.get_product_id()
+        async for page in self.client.iter_pages(f"products/{product_id}/variants", await self.get_auth()):
+            await run_blocking(IdIndex(self.config_yaml).record_plans, product_id, get_plan_ids(page["value"]))
+            for variant in page["value"]:
+                yield variant
+
+    async def show(self) -> dict:
+        """Show details of a Plan"""
+        variant = await self._show_indexed_plan()
+        if variant is not None:
+            return variant
+
+        async for variant in self.iter_contents():
+            if variant.get("externalID") == self.plan_name:
+                self._ids["plan_id"] = variant["id"]
+                return variant
+        raise LookupError(f"Plan with this name not found: {self.plan_name}")
+
+    async def delete(self) -> dict:
+        """Delete a Plan"""
+        if not self._ids["plan_id"]:
+            await self.show()
+        product_id = await self.get_product_id()
+        await self._request("DELETE", f"products/{product_id}/variants/{self._ids['plan_id']}")
+        await run_blocking(IdIndex(self.config_yaml).forget_plan, product_id, self.plan_name)
+        return {}
+
+    async def _show_indexed_plan(self):
+        """Get the Plan by the variant id in the ID Index, dropping the entry if it is gone or renamed"""
+        product_id = await self.get_product_id()
+        plan_id = await run_blocking(IdIndex(self.config_yaml).get_plan_id, product_id, self.plan_name)
+        if not plan_id:
+            return None
+        try:
+            variant = await self._request("GET", f"products/{product_id}/variants/{plan_id}")
+        except AsyncApiError as error:
+            if error.status != 404:
+                raise
+            variant = None
+        if not variant or variant.get("externalID") != self.plan_name:
+            await run_blocking(IdIndex(self.config_yaml).forget_plan, product_id, self.plan_name)
+            return None
+        self._ids["plan_id"] = plan_id
+        return variant
+
+    def _load_plan_config(self, plan_name=None):
+        return super()._load_plan_config(plan_name=self.plan_name)
+
+    async def _update_plan_listing(self):
+        plan_config = self._load_plan_config()
+        settings = await self._get_settings("Listing", "listings", variant_id=self._ids["plan_id"])
+        body = dict(
+            plan_config["plan_listing"],
+            resourceType="AzureListing",
+            id=settings["id"],
+            **{"@odata.etag": settings["@odata.etag"]},
+        )
+        await self._put_listing(settings, body)
+
+    async def _update_pricing_and_availability(self):
+        plan_config = self._load_plan_config()
+        params = {"$expand": FEATURE_AVAILABILITY_EXPAND}
+        settings = await self._get_settings(
+            "Availability", "featureAvailabilities", variant_id=self._ids["plan_id"], params=params
+        )
+        body = FeatureAvailability.get_body(
+            plan_config["pricing_and_availability"].get("azure_private_subscriptions", []),
+            plan_config["pricing_and_availability"]["visibility"],
+            settings["@odata.etag"],
+            settings["id"],
+            subtype=self.subtype,
+        )
+        path = f"products/{await self.get_product_id()}/featureavailabilities/{settings['id']}"
+        try:
+            await self._request("PUT", path, params=params, body=body, if_match=settings["@odata.etag"])
+        except AsyncApiError as error:
+            raise PermissionError(bytes.decode(error.body).replace("\\", "")) from error
+
+    async def _update_technical_configuration(self):
+        if self.subtype not in PACKAGE_RESOURCE_TYPES:
+            return None
+        json_config = self.get_listing_config()
+        technical_configuration = self._load_plan_config()["technical_configuration"]
+        file_name = await run_blocking(_get_manifest_app)
+
+        try:
+            package_id = await self._upload_package(file_name)
+            settings = await self._get_settings("Package", "packageConfigurations", variant_id=self._ids["plan_id"])
+            if self.subtype == "ma":
+                body = Package.get_configuration_body(
+                    PACKAGE_RESOURCE_TYPES[self.subtype],
+                    technical_configuration["version"],
+                    package_id,
+                    settings["id"],
+                    allow_jit_access=technical_configuration["allow_jit_access"],
+                    policies=technical_configuration["policy_settings"],
+                    allowed_customer_actions=technical_configuration.get("allowedCustomerActions"),
+                    allowed_data_actions=technical_configuration.get("allowedDataActions"),
+                    json_config=json_config,
+                    plan_name=self.plan_name,
+                )
+            else:
+                body = Package.get_configuration_body(
+                    PACKAGE_RESOURCE_TYPES[self.subtype], technical_configuration["version"], package_id, settings["id"]
+                )
+            path = f"products/{await self.get_product_id()}/packageconfigurations/{settings['id']}"
+            return await self._request("PUT", path, body=body, if_match=settings["@odata.etag"])
+        except AsyncApiError as error:
+            raise ValueError(bytes.decode(error.body).replace("\\", "")) from error
+
+    async def _upload_package(self, file_name: str) -> str:
+        """
+        Upload the application zip with the product id injected as its PID and wait until it is processed
+
+        :param file_name: name of the application zip in app_path
+        :return: package id
+        """
+        product_id = await self.get_product_id()
+        path = f"products/{product_id}/packages"
+        body = {"resourceType": "AzureApplicationPackage", "fileName": file_name}
+        package = await self._request("POST", path, body=body)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            upload_full_path = Path(temp_dir).joinpath(file_name)
+            await run_blocking(
+                inject_pid, str(Path(self.app_path).joinpath(file_name)), product_id, str(upload_full_path)
+            )
+            status_code = await self.client.upload_using_sas(package["fileSasUri"], upload_full_path)
+        if status_code != 201:
+            raise ConnectionError("Upload via SAS has failed.")
+
+        body = {
+            "resourceType": "AzureApplicationPackage",
+            "fileName": file_name,
+            "fileSasUri": package["fileSasUri"],
+            "State": "Uploaded",
+            "@odata.etag": package["@odata.etag"],
+        }
+        await self._request("PUT", f"{path}/{package['id']}", body=body)
+
+        processed = await poll_until_ready_async(
+            lambda: self._request("GET", f"{path}/{package['id']}"),
+            lambda response: response.get("state") in ["Processed", "ProcessFailed"],
+            initial_delay=PROCESSING_INITIAL_DELAY,
+            max_delay=PROCESSING_MAX_DELAY,
+            timeout=PROCESSING_TIMEOUT,
+            metric="package_processing",
+        )
+        if processed.get("state") == "ProcessFailed":
+            raise ConnectionError("Uploading AMA Zip Failed with State: ProcessedFailed. Check if PID is required")
+        if processed.get("state") != "Processed":
+            raise ConnectionError("Uploading AMA Zip Failed after 5 minutes. Please retry")
+        return package["id"]
+
+
+def _get_manifest_app() -> str:
+    """Get the application zip name from manifest.yml, blocking file I/O to run on a worker thread"""
+    import yaml  # pylint: disable=import-outside-toplevel
+
+    with open("manifest.yml", encoding="utf8") as file:
+        return yaml.safe_load(file)["app"]
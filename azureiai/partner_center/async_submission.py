@@ -0,0 +1,411 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+Asyncio counterpart of Submission
+
+Every method is a coroutine calling the ingestion API through an AsyncIngestionClient, so many offers can be created,
+updated and published concurrently in one event loop. Share one client between all offers of a loop to share its
+connection pool. Request bodies are built by the same configuration classes as the blocking Submission, and product
+ids are read from and recorded in the same ID Index.
+"""
+import os
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from azureiai.managed_apps.async_client import AsyncApiError, AsyncIngestionClient, gather_all, run_blocking
+from azureiai.managed_apps.confs import Listing, ProductAvailability, Properties, ResellerConfiguration
+from azureiai.managed_apps.confs.image_manifest import ImageManifest
+from azureiai.managed_apps.confs.listing_image import get_logo_changes
+from azureiai.managed_apps.confs.reseller_configuration import DEFAULT_STATE
+from azureiai.managed_apps.id_index import IdIndex
+from azureiai.managed_apps.listing_config import ListingConfig, load_listing_config
+from azureiai.managed_apps.polling import poll_until_ready_async
+from azureiai.managed_apps.token_cache import get_partner_center_authorization
+from azureiai.partner_center.submission import SUBMISSION_MODULES, get_submission_body
+
+LOGO_TYPES = {
+    "AzureLogoLarge": "logo_large",
+    "AzureLogoSmall": "logo_small",
+    "AzureLogoMedium": "logo_medium",
+    "AzureLogoWide": "logo_wide",
+}
+
+
+class AsyncSubmission:
+    """Azure Partner Center Submission driven by an async ingestion API client"""
+
+    def __init__(
+        self,
+        name=None,
+        config_yaml: str = "config.yml",
+        resource_type: str = "",
+        app_path: str = ".",
+        json_listing_config: str = "listing_config.json",
+        client: AsyncIngestionClient = None,
+        authorization: Optional[str] = None,
+        branches: Optional[dict] = None,
+        product_id: str = "",
+    ):
+        """
+        :param name: offer name, the AzureOfferId external id
+        :param config_yaml: configuration with the AAD application, without it the Azure CLI login is used
+        :param resource_type: product resource type, e.g. AzureApplication
+        :param app_path: directory of the listing configuration, logos and packages
+        :param json_listing_config: listing configuration file name
+        :param client: client shared by the offers of an event loop, default: a new client with its own connections
+        :param authorization: Authorization header contents, default: acquired on first use
+        :param branches: draft instance ids per module, shared with other objects updating the same product
+        :param product_id: Product ID if already known
+        """
+        self.name = name
+        self.config_yaml = config_yaml
+        self.resource_type = resource_type
+        self.app_path = app_path
+        self.json_listing_config = json_listing_config
+        self.client = client if client is not None else AsyncIngestionClient()
+        self._authorization: Optional[str] = authorization
+        self._branches: dict = branches if branches is not None else {}
+        self._ids: dict = {"product_id": product_id, "plan_id": None, "submission_id": None}
+
+    async def get_auth(self) -> str:
+        """
+        Create Authentication Header, acquiring the token on a worker thread
+
+        :return: Authorization Header contents
+        """
+        if self._authorization is None:
+            self._authorization = await run_blocking(get_partner_center_authorization, self.config_yaml)
+        return self._authorization
+
+    async def get_product_id(self) -> str:
+        """
+        Get or Set Product ID
+
+        :return: Product ID of the offer
+        """
+        if not self._ids["product_id"]:
+            await self._find_product()
+        return self._ids["product_id"]
+
+    async def get_submission_id(self) -> str:
+        """
+        Get or Set Submission ID
+
+        :return: id of the latest Submission of the offer
+        """
+        if self._ids["submission_id"] is None:
+            submissions = await self._request("GET", f"products/{await self.get_product_id()}/submissions")
+            self._ids["submission_id"] = submissions["value"][0]["id"]
+        return self._ids["submission_id"]
+
+    async def list_contents(self) -> dict:
+        """List Azure Submissions."""
+        return {"value": [submission async for submission in self.iter_contents()]}
+
+    async def iter_contents(self):
+        """Iterate over Azure Submissions, requesting the next page only once the previous one is consumed."""
+        pages = self.client.iter_pages(
+            "products", await self.get_auth(), params={"$filter": f"ResourceType eq '{self.resource_type}'"}
+        )
+        async for page in pages:
+            await run_blocking(IdIndex(self.config_yaml).record_products, _get_product_ids(page["value"]))
+            for submission in page["value"]:
+                yield submission
+
+    async def create(self) -> dict:
+        """Create new Azure Submission and set product id."""
+        body = {
+            "resourceType": self.resource_type,
+            "name": self.name,
+            "externalIDs": [{"type": "AzureOfferId", "value": self.name}],
+            "isModularPublishing": True,
+        }
+        try:
+            product = await self._request("POST", "products", body=body)
+        except AsyncApiError as error:
+            raise NameError("Application already exists. Try using 'update'?") from error
+
+        self._ids["product_id"] = product["id"]
+        await run_blocking(IdIndex(self.config_yaml).record_products, {self.name: product["id"]})
+        await self.update()
+        return product
+
+    async def update(self):
+        """Update Existing Application, its properties, listing, preview audience and reseller settings at once"""
+        product_id = await self.get_product_id()
+        await gather_all(
+            self._update_properties(),
+            self._update_offer_listing(),
+            self._update_preview_audience(),
+            self._set_resell_through_csps(),
+        )
+        return product_id
+
+    async def show(self) -> dict:
+        """Show details of an Azure Submission"""
+        return await self._find_product()
+
+    async def delete(self):
+        """Delete an Azure Submission"""
+        response = await self._request("DELETE", f"products/{await self.get_product_id()}")
+        await run_blocking(IdIndex(self.config_yaml).forget_product, self.name)
+        return response
+
+    async def publish(self) -> dict:
+        """Publish Submission by submitting Instance IDs"""
+        product_id = await self.get_product_id()
+        variants, draft_instance_ids = await gather_all(
+            self._list_variants(), self.resolve_draft_instance_ids(SUBMISSION_MODULES)
+        )
+        variant_ids = [variant["id"] for variant in variants if variant["id"] != "testdrive"]
+        body = get_submission_body(product_id, draft_instance_ids, variant_ids)
+        try:
+            submission = await self._request("POST", f"products/{product_id}/submissions", body=body)
+        except AsyncApiError as error:
+            raise SystemError(
+                "Publish Failed! An internal error occurred when trying to publish the package"
+            ) from error
+        self._ids["submission_id"] = submission["id"]
+        self._branches.clear()
+        return await self._request("GET", f"products/{product_id}/submissions/{submission['id']}")
+
+    async def release(self) -> dict:
+        """
+        Release Marketplace Application by submitting Submission ID
+
+        :return: Submission API Response
+        """
+        path = f"products/{await self.get_product_id()}/submissions/{await self.get_submission_id()}/promote"
+        try:
+            return await self._request("POST", path)
+        except AsyncApiError as error:
+            raise SystemError("Release Failed! Is preview creation in progress?") from error
+
+    async def resolve_draft_instance_ids(self, modules) -> dict:
+        """
+        Retrieve the Draft Instance IDs of several modules concurrently, one Branch API call per module
+
+        :param modules: names of modules to look up
+        :return: dict of module to dict of variant id to draft instance id, the product level one is keyed by None
+        """
+        ids = await gather_all(*(self._get_branches(module) for module in modules))
+        return dict(zip(modules, ids))
+
+    def get_listing_config(self) -> ListingConfig:
+        """
+        Get the parsed json listing configuration
+
+        :return: listing configuration, parsed again only when the file has changed
+        """
+        return load_listing_config(Path(self.app_path).joinpath(self.json_listing_config))
+
+    def _load_plan_config(self, plan_name: str = None):
+        return self.get_listing_config().get_plan(plan_name)
+
+    async def _request(self, method: str, path: str, **kwargs) -> dict:
+        return await self.client.request(method, path, await self.get_auth(), **kwargs)
+
+    async def _find_product(self) -> dict:
+        """Get the product by the id in the ID Index, or else by its AzureOfferId"""
+        product = await self._show_indexed()
+        if product is not None:
+            return product
+
+        filter_name = "ExternalIDs/Any(i:i/Type eq 'AzureOfferId' and i/Value eq '" + self.name + "')"
+        products = self.client.iter_values("products", await self.get_auth(), params={"$filter": filter_name})
+        async for product in products:
+            product_id = _get_product_ids([product]).get(self.name)
+            if product_id:
+                self._ids["product_id"] = product_id
+                await run_blocking(IdIndex(self.config_yaml).record_products, {self.name: product_id})
+                return product
+        raise LookupError(f"{self.resource_type} with this name not found: {self.name}")
+
+    async def _show_indexed(self):
+        """Get the product by the id in the ID Index, dropping the entry if it is gone or renamed"""
+        product_id = await run_blocking(IdIndex(self.config_yaml).get_product_id, self.name)
+        if not product_id:
+            return None
+        try:
+            product = await self._request("GET", f"products/{product_id}")
+        except AsyncApiError as error:
+            if error.status != 404:
+                raise
+            product = None
+        if product is None or _get_product_ids([product]).get(self.name) != product_id:
+            await run_blocking(IdIndex(self.config_yaml).forget_product, self.name)
+            return None
+        self._ids["product_id"] = product_id
+        return product
+
+    async def _list_variants(self) -> list:
+        path = f"products/{await self.get_product_id()}/variants"
+        return [variant async for variant in self.client.iter_values(path, await self.get_auth())]
+
+    async def _get_branches(self, module: str, variant_id: str = None) -> dict:
+        """
+        Get every Draft Instance ID of a module, polling until the product level or the variant's one exists
+
+        Branches are fetched once per module and shared by the plans updated through this Submission.
+
+        :param module: name of draft instances to look up
+        :param variant_id: variant whose branch must exist, default: the product level branch
+        :return: dict of variant id to draft instance id
+        """
+        draft_instance_ids = self._branches.get(module)
+        if draft_instance_ids is None:
+            draft_instance_ids = await self._fetch_branches(module)
+        if variant_id not in draft_instance_ids:
+            draft_instance_ids = await poll_until_ready_async(
+                lambda: self._fetch_branches(module),
+                lambda ids: variant_id in ids,
+                metric="variant_branch" if variant_id else "branch",
+            )
+        return draft_instance_ids
+
+    async def _fetch_branches(self, module: str) -> dict:
+        path = f"products/{await self.get_product_id()}/branches/getByModule(module={module})"
+        branches = [branch async for branch in self.client.iter_values(path, await self.get_auth())]
+        draft_instance_ids: dict = {}
+        for branch in branches:
+            draft_instance_ids.setdefault(branch.get("variantID"), branch["currentDraftInstanceID"])
+        if branches:
+            draft_instance_ids.setdefault(None, branches[0]["currentDraftInstanceID"])
+            self._branches[module] = draft_instance_ids
+        return draft_instance_ids
+
+    async def _get_draft_instance_id(self, module: str, variant_id: str = None) -> str:
+        draft_instance_ids = await self._get_branches(module, variant_id)
+        if variant_id not in draft_instance_ids:
+            raise ValueError(f"Expected Plan {variant_id} not found in {module} branches")
+        return draft_instance_ids[variant_id]
+
+    async def _get_settings(self, module: str, collection: str, variant_id: str = None, params: dict = None) -> dict:
+        """
+        Get the draft settings of a module
+
+        :param module: branch module, e.g. Listing
+        :param collection: ingestion API collection of the module, e.g. listings
+        :param variant_id: plan whose settings are read, default: the product's
+        :param params: query parameters, such as $expand
+        :return: settings with their id and @odata.etag
+        """
+        instance_id = await self._get_draft_instance_id(module, variant_id)
+        path = f"products/{await self.get_product_id()}/{collection}/getByInstanceID(instanceID={instance_id})"
+        return (await self._request("GET", path, params=params))["value"][0]
+
+    async def _put_listing(self, settings: dict, body: dict):
+        path = f"products/{await self.get_product_id()}/listings/{settings['id']}"
+        try:
+            return await self._request("PUT", path, body=body, if_match=settings["@odata.etag"])
+        except AsyncApiError as error:
+            if "Missing" in bytes.decode(error.body):
+                raise ValueError(f"{bytes.decode(error.body)} missing from {body}") from error
+            raise
+
+    async def _update_properties(self):
+        json_config = self.get_listing_config()
+        version = self._load_plan_config()["technical_configuration"]["version"]
+        settings = await self._get_settings("Property", "properties")
+        body = Properties.get_body(
+            version,
+            settings["@odata.etag"],
+            leveled_categories=json_config["property_settings"].get("leveledCategories", {}),
+        )
+        path = f"products/{await self.get_product_id()}/properties/{settings['id']}"
+        await self._request("PUT", path, body=body, if_match=settings["@odata.etag"])
+
+    async def _set_resell_through_csps(self):
+        json_config = self.get_listing_config()
+        body = ResellerConfiguration.get_body(json_config["offer_listing"].get("reseller_channel", DEFAULT_STATE))
+        await self._request("POST", f"products/{await self.get_product_id()}/resellerConfiguration", body=body)
+
+    async def _update_preview_audience(self):
+        json_config = self.get_listing_config()
+        settings = await self._get_settings("Availability", "productAvailabilities")
+        body = ProductAvailability.get_body(
+            json_config["preview_audience"]["subscriptions"], "Public", settings["@odata.etag"], settings["id"]
+        )
+        path = f"products/{await self.get_product_id()}/productavailabilities/{settings['id']}"
+        await self._request("PUT", path, body=body, if_match=settings["@odata.etag"])
+
+    async def _update_offer_listing(self, update_image=True):
+        json_config = self.get_listing_config()
+        settings = await self._get_settings("Listing", "listings")
+        await self._put_listing(settings, Listing.get_body(json_config, settings["@odata.etag"], settings["id"]))
+
+        if update_image:
+            listing_logos = json_config["offer_listing"]["listing_logos"]
+            logos = {logo_type: listing_logos[key] for logo_type, key in LOGO_TYPES.items()}
+            for logo_type, file_name in logos.items():
+                if not os.path.isfile(os.path.join(self.app_path, file_name)):
+                    raise FileNotFoundError(f"{logo_type} not Found at location: {self.app_path}/{file_name}")
+            await self._set_logos(settings["id"], logos)
+
+    async def _set_logos(self, listing_id: str, logos: dict, force=False) -> dict:
+        """
+        Set the Listing Images, leaving images whose content hash matches the last upload in place
+
+        :param listing_id: listing the images belong to
+        :param logos: dict of image logo type to name of file, e.g. {"AzureLogoLarge": "large.png"}
+        :param force: upload every image even if it has not changed since the last upload
+        :return: dict of image logo type to api_response, None for images that have not changed
+        """
+        product_id = await self.get_product_id()
+        path = f"products/{product_id}/listings/{listing_id}/images"
+        images = [
+            (image.get("id"), image.get("fileName"), image.get("state"))
+            async for image in self.client.iter_values(path, await self.get_auth())
+        ]
+        hashes, changed, stale_ids = await run_blocking(
+            get_logo_changes, product_id, self.app_path, logos, images, force
+        )
+        await gather_all(*(self._request("DELETE", f"{path}/{image_id}") for image_id in stale_ids))
+        responses = await gather_all(
+            *(
+                self._upload_image(path, file_name, logo_type, hashes[logo_type])
+                for logo_type, file_name in changed.items()
+            )
+        )
+        uploads = dict(zip(changed, responses))
+        return {logo_type: uploads.get(logo_type) for logo_type in logos}
+
+    async def _upload_image(self, path: str, file_name: str, logo_type: str, sha256: str) -> dict:
+        body = {
+            "resourceType": "ListingImage",
+            "fileName": file_name,
+            "type": logo_type,
+            "state": "PendingUpload",
+            "order": 0,
+            "id": str(uuid.uuid4()),
+        }
+        image = await self._request("POST", path, body=body)
+        status_code = await self.client.upload_using_sas(image["fileSasUri"], Path(self.app_path).joinpath(file_name))
+        if status_code != 201:
+            raise ConnectionError("Upload via SAS Failed")
+        body = {
+            "resourceType": "ListingImage",
+            "fileName": file_name,
+            "type": logo_type,
+            "fileSasUri": image["fileSasUri"],
+            "state": "Uploaded",
+            "order": 0,
+            "@odata.etag": image["@odata.etag"],
+            "id": image["id"],
+        }
+        response = await self._request("PUT", f"{path}/{image['id']}", body=body, if_match=image["@odata.etag"])
+        product_id = await self.get_product_id()
+        await run_blocking(ImageManifest().record, product_id, logo_type, file_name, sha256, image["id"])
+        return response
+
+
+def _get_product_ids(products: list) -> dict:
+    """Map the AzureOfferId of every product to its product id"""
+    return {
+        external_id["value"]: product["id"]
+        for product in products
+        for external_id in product.get("externalIDs") or product.get("externalIds") or []
+        if external_id.get("type") == "AzureOfferId"
+    }
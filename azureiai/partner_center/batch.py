@@ -0,0 +1,111 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+azpc batch
+
+Runs every command of a JSONL file in one process, sharing credentials and connection pools, and streams one NDJSON
+result line per command as it completes. Each command line looks like:
+
+    {"subgroup": "ma", "command": "show", "args": {"name": "my-offer"}}
+    {"subgroup": "ma", "command": "plan", "plan_command": "update", "args": ["--name", "my-offer", "--plan-name", "p"]}
+
+args are the options CLIParser and PlanCLIParser accept, either as a list or as a dict of option name to value.
+"""
+import argparse
+import json
+import sys
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from azureiai.managed_apps.utils import get_max_workers
+from azureiai.partner_center import dispatch
+
+
+def to_argv(command: dict) -> list:
+    """
+    Build command line arguments from a batch command
+
+    :param command: dict with subgroup, command, optional plan_command and args
+    :return: command line arguments without the program name
+    """
+    argv = [command["subgroup"], command["command"]]
+    if "plan_command" in command:
+        argv.append(command["plan_command"])
+    args = command.get("args", [])
+    if isinstance(args, dict):
+        for name, value in args.items():
+            argv.extend([f"--{name.replace('_', '-')}", str(value)])
+    else:
+        argv.extend(str(arg) for arg in args)
+    return argv
+
+
+def run_batch(lines, create_cli, max_workers: int = None, output=None) -> int:
+    """
+    Run batch commands concurrently, writing a result line as each command completes
+
+    :param lines: iterable of JSON command lines, blank lines and lines starting with # are skipped
+    :param create_cli: callable taking argv and returning the CLIParser of its subgroup
+    :param max_workers: number of commands run at once, default: AZPC_MAX_WORKERS
+    :param output: text stream for NDJSON results, default: sys.stdout
+    :return: number of failed commands
+    """
+    output = output or sys.stdout
+    failures = 0
+    with ThreadPoolExecutor(max_workers=max_workers or get_max_workers()) as executor:
+        futures = [
+            executor.submit(_run_line, line_number, line, create_cli)
+            for line_number, line in enumerate(lines, start=1)
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            failures += result["status"] == "error"
+            output.write(json.dumps(result, default=to_json) + "\n")
+            output.flush()
+    return failures
+
+
+def main(argv: list, create_cli) -> int:
+    """
+    azpc batch FILE [--max-workers N]
+
+    :param argv: arguments after 'batch'
+    :param create_cli: callable taking argv and returning the CLIParser of its subgroup
+    :return: number of failed commands
+    """
+    parser = argparse.ArgumentParser("azpc batch")
+    parser.add_argument("file", type=str, help="JSONL file with one command per line, - for stdin")
+    parser.add_argument("--max-workers", type=int, help="Number of commands run at once", default=None)
+    args = parser.parse_args(argv)
+    if args.file == "-":
+        return run_batch(sys.stdin.readlines(), create_cli, max_workers=args.max_workers)
+    with open(args.file, "r", encoding="utf8") as file:
+        return run_batch(file.readlines(), create_cli, max_workers=args.max_workers)
+
+
+def _run_line(line_number: int, line: str, create_cli) -> dict:
+    result: dict = {"line": line_number}
+    try:
+        command = json.loads(line)
+        result["argv"] = to_argv(command)
+        output = dispatch(create_cli, result["argv"])
+        result["result"] = list(output) if isinstance(output, Iterator) else output
+        result["status"] = "ok"
+    except SystemExit as error:
+        result["status"] = "error"
+        result["error"] = f"Invalid arguments, exit code {error.code}"
+    except Exception as error:  # pylint: disable=broad-except
+        result["status"] = "error"
+        result["error"] = f"{type(error).__name__}: {error}"
+    return result
+
+
+def to_json(value):
+    """Serialize swagger models and other objects json cannot encode, used as json.dumps default"""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if hasattr(value, "__dict__"):
+        return value.__dict__
+    return str(value)
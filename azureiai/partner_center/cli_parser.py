@@ -3,15 +3,39 @@
 #  ---------------------------------------------------------
 """CLI Wrapper for Creating, Updating, or Deleting Azure Partner Center Submissions"""
 import argparse
-from distutils.util import strtobool
+from pathlib import Path
 
-from azureiai.partner_center.submission import Submission
+OUTPUT_JSON = "json"
+OUTPUT_NDJSON = "ndjson"
+
+
+def strtobool(value: str) -> bool:
+    """
+    Convert a command line flag value to a boolean, like distutils.util.strtobool without importing distutils
+
+    :param value: y, yes, t, true, on, 1, n, no, f, false, off or 0, case insensitive
+    :return: boolean value
+    """
+    value = value.lower()
+    if value in ["y", "yes", "t", "true", "on", "1"]:
+        return True
+    if value in ["n", "no", "f", "false", "off", "0"]:
+        return False
+    raise ValueError(f"invalid truth value {value!r}")
 
 
 class CLIParser:
     """Interface for Submission Types"""
 
-    def __init__(self, submission_type=Submission):
+    def __init__(self, submission_type=None, argv: list = None):
+        """
+        :param submission_type: Submission class the commands operate on
+        :param argv: command line arguments to parse, default: sys.argv[1:]
+        """
+        if submission_type is None:
+            from azureiai.partner_center.submission import Submission  # pylint: disable=import-outside-toplevel
+
+            submission_type = Submission
         self.parser = argparse.ArgumentParser("azpc")
         self.parser.add_argument("subgroup", type=str, help="Which subgroup to run")
         self.parser.add_argument("command", type=str, help="Which command to run")
@@ -24,6 +48,7 @@ class CLIParser:
         )
 
         self.submission_type = submission_type
+        self.argv = argv
 
         self._name = "--name"
         self._notification_emails = "--notification-emails"
@@ -57,8 +82,12 @@ class CLIParser:
 
     def list_command(self) -> dict:
         """List Managed Applications"""
-        args = self.parser.parse_args()
-        return self.submission_type(config_yaml=args.config_yml).list_contents()
+        self._add_output_argument()
+        args = self.parser.parse_args(self.argv)
+        submission = self.submission_type(config_yaml=args.config_yml)
+        if getattr(args, "output", OUTPUT_JSON) == OUTPUT_NDJSON:
+            return submission.iter_contents()
+        return submission.list_contents()
 
     def publish(self) -> dict:
         """Publish a Managed Application"""
@@ -90,9 +119,18 @@ class CLIParser:
         args = self._add_name_argument()
         return self.submission_type(args.name, config_yaml=args.config_yml).status()
 
+    def _add_output_argument(self):
+        self.parser.add_argument(
+            "--output",
+            type=str,
+            choices=[OUTPUT_JSON, OUTPUT_NDJSON],
+            default=OUTPUT_JSON,
+            help="json prints one document once every page is read, ndjson prints one line per item as it is read",
+        )
+
     def _add_name_argument(self):
         self.parser.add_argument(self._name, type=str, help="Managed App Name")
-        args = self.parser.parse_args()
+        args = self.parser.parse_args(self.argv)
         return args
 
     def _add_name_config_json_argument(self):
@@ -101,9 +139,19 @@ class CLIParser:
             self._config_json, type=str, help="Listing Configuration Json", default="listing_config.json"
         )
         self.parser.add_argument(self._app_path, type=str, help="Application Root Directory", default=".")
-        args = self.parser.parse_args()
+        args = self.parser.parse_args(self.argv)
+        self._validate(args)
         return args
 
+    def _validate(self, args):
+        """Check the configuration and listing files against their schemas before any API call"""
+        from azureiai.managed_apps import schema  # pylint: disable=import-outside-toplevel
+
+        schema.validate_file(args.config_yml, schema.CONFIG_SCHEMA)
+        listing_schema = getattr(self.submission_type, "listing_schema", None)
+        if listing_schema:
+            schema.validate_file(Path(args.app_path).joinpath(args.config_json), listing_schema)
+
     def _add_name_notification_emails_argument(self):
         self.parser.add_argument(self._name, type=str, required=True, help="Managed App Name")
         self.parser.add_argument(
@@ -114,5 +162,5 @@ class CLIParser:
             self._config_json, type=str, help="Listing Configuration Json", default="listing_config.json"
         )
         self.parser.add_argument(self._app_path, type=str, help="Application Root Directory", default=".")
-        args = self.parser.parse_args()
+        args = self.parser.parse_args(self.argv)
         return args
@@ -0,0 +1,216 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+azpc Daemon
+
+`azpc serve` keeps one process running with the offer CLIs imported, AAD tokens cached and API connections pooled,
+and accepts commands on a Unix domain socket. `azpc` forwards its arguments, working directory and environment to the
+daemon when one is listening and runs the command in-process otherwise. Commands run one at a time, because relative
+paths and settings such as AAD_ID, TENANT_ID or AZPC_* resolve against the process-wide working directory and
+environment, which are switched to the client's for the duration of each command.
+"""
+import io
+import json
+import os
+import socket
+import socketserver
+import threading
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+from azureiai.managed_apps.branch_cache import BRANCH_CACHE
+from azureiai.managed_apps.file_cache import get_cache_dir
+
+SOCKET = "AZPC_SOCKET"
+NO_DAEMON = "AZPC_NO_DAEMON"
+SOCKET_FILE = "azpc.sock"
+CONNECT_TIMEOUT = 0.5
+
+
+def get_socket_path() -> Path:
+    """Get the path of the daemon socket, default: AZPC_CACHE_DIR/azpc.sock"""
+    return Path(os.getenv(SOCKET, str(get_cache_dir().joinpath(SOCKET_FILE))))
+
+
+def is_supported() -> bool:
+    """Check if this platform supports Unix domain sockets"""
+    return hasattr(socket, "AF_UNIX")
+
+
+class Daemon:
+    """Long-lived azpc process serving commands over a Unix domain socket"""
+
+    def __init__(self, execute, socket_path=None):
+        """
+        :param execute: callable taking command line arguments, running the command and printing its output
+        :param socket_path: socket to listen on, default: get_socket_path()
+        """
+        self._execute = execute
+        self.socket_path = Path(socket_path) if socket_path else get_socket_path()
+        self._lock = threading.Lock()
+        self._server = None
+
+    def execute(self, argv: list, cwd: str = None, env: dict = None) -> dict:
+        """
+        Run one command in this process
+
+        Commands resolve paths relative to the working directory and read settings from the environment, so they are
+        serialized. Draft instance ids are dropped before every command, as the offer may have been submitted from
+        elsewhere since.
+
+        :param argv: command line arguments without the program name, e.g. ["ma", "show", "--name", "offer"]
+        :param cwd: working directory of the client
+        :param env: environment of the client, replaces the daemon's environment while the command runs
+        :return: dict with status, stdout and stderr of the command
+        """
+        stdout, stderr = io.StringIO(), io.StringIO()
+        status = 0
+        with self._lock:
+            previous_cwd = os.getcwd()
+            previous_env = dict(os.environ)
+            try:
+                if env is not None:
+                    _replace_environ(env)
+                if cwd:
+                    os.chdir(cwd)
+                BRANCH_CACHE.invalidate()
+                with redirect_stdout(stdout), redirect_stderr(stderr):
+                    self._execute(list(argv))
+            except SystemExit as error:
+                status = _exit_status(error, stderr)
+            except Exception:  # pylint: disable=broad-except
+                status = 1
+                stderr.write(traceback.format_exc())
+            finally:
+                os.chdir(previous_cwd)
+                _replace_environ(previous_env)
+        return {"status": status, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+    def serve_forever(self):
+        """Listen on the socket until a stop request arrives"""
+        if not is_supported():
+            raise OSError("azpc serve requires Unix domain sockets")
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if forward_request({"command": "ping"}, self.socket_path) is not None:
+            raise OSError(f"An azpc daemon is already listening on {self.socket_path}")
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+        previous_umask = os.umask(0o177)
+        try:
+            self._server = _Server(str(self.socket_path), _Handler, self)
+        finally:
+            os.umask(previous_umask)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+
+    def shutdown(self):
+        """Stop serving, from another thread"""
+        if self._server is not None:
+            self._server.shutdown()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """Threaded Unix domain socket server, equivalent to UnixStreamServer, which only exists where AF_UNIX does"""
+
+    address_family = getattr(socket, "AF_UNIX", socket.AF_INET)
+    daemon_threads = True
+
+    def __init__(self, socket_path, handler, azpc_daemon: Daemon):
+        super().__init__(socket_path, handler)
+        self.azpc_daemon = azpc_daemon
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        request = json.loads(self.rfile.readline())
+        command = request.get("command", "run")
+        if command == "ping":
+            response = {"status": 0, "stdout": "", "stderr": ""}
+        elif command == "stop":
+            message = f"azpc daemon on {self.server.azpc_daemon.socket_path} stopped\n"
+            response = {"status": 0, "stdout": message, "stderr": ""}
+            threading.Thread(target=self.server.azpc_daemon.shutdown).start()
+        else:
+            response = self.server.azpc_daemon.execute(request["argv"], request.get("cwd"), request.get("env"))
+        self.wfile.write(json.dumps(response).encode("utf8") + b"\n")
+
+
+def forward(argv: list, socket_path=None):
+    """
+    Run a command in the daemon, if one is listening, with the working directory and environment of this process
+
+    :param argv: command line arguments without the program name
+    :param socket_path: daemon socket, default: get_socket_path()
+    :return: dict with status, stdout and stderr of the command, or None if no daemon is listening
+    """
+    if os.getenv(NO_DAEMON):
+        return None
+    request = {"command": "run", "argv": list(argv), "cwd": os.getcwd(), "env": dict(os.environ)}
+    return forward_request(request, socket_path)
+
+
+def forward_request(request: dict, socket_path=None):
+    """
+    Send a request to the daemon
+
+    :param request: dict with a command of run, ping or stop
+    :param socket_path: daemon socket, default: get_socket_path()
+    :return: response dict, or None if no daemon is listening
+    """
+    socket_path = Path(socket_path) if socket_path else get_socket_path()
+    if not is_supported() or not socket_path.exists():
+        return None
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:  # pylint: disable=no-member
+        client.settimeout(CONNECT_TIMEOUT)
+        try:
+            client.connect(str(socket_path))
+        except (ConnectionRefusedError, FileNotFoundError, socket.timeout):
+            return None
+        client.settimeout(None)
+        try:
+            client.sendall(json.dumps(request).encode("utf8") + b"\n")
+        except (BrokenPipeError, ConnectionResetError):
+            return None
+        with client.makefile("rb") as reply:
+            line = reply.readline()
+    if not line:
+        raise ConnectionError(f"azpc daemon on {socket_path} closed the connection")
+    return json.loads(line)
+
+
+def serve(execute, argv: list) -> str:
+    """
+    azpc serve: run the daemon in the foreground, or stop a running daemon with 'azpc serve stop'
+
+    :param execute: callable taking command line arguments, running the command and printing its output
+    :param argv: arguments after 'serve'
+    :return: message for the console
+    """
+    if argv[:1] == ["stop"]:
+        response = forward_request({"command": "stop"})
+        if response is None:
+            return f"No azpc daemon is listening on {get_socket_path()}"
+        return response["stdout"].strip()
+    Daemon(execute).serve_forever()
+    return f"azpc daemon on {get_socket_path()} stopped"
+
+
+def _replace_environ(env: dict):
+    os.environ.clear()
+    os.environ.update(env)
+
+
+def _exit_status(error: SystemExit, stderr) -> int:
+    if error.code is None:
+        return 0
+    if isinstance(error.code, int):
+        return error.code
+    print(error.code, file=stderr)
+    return 1
@@ -0,0 +1,134 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""
+azpc fleet
+
+Updates and publishes every offer found under a root directory in one process, sharing credentials and connection
+pools. An offer is a directory holding a manifest.yml; its name is the manifest's name or the directory name, and its
+app_path is resolved from the manifest's directory. A config.yml next to the manifest takes precedence over
+--config-yml.
+
+Offers run on a bounded worker pool, each one update then publish, so a slow or failing offer only holds its own worker.
+One NDJSON result line is written per offer as it completes, followed by a summary line.
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from azureiai.managed_apps.utils import get_max_workers
+from azureiai.partner_center import dispatch
+from azureiai.partner_center.batch import to_json
+
+MANIFEST_NAME = "manifest.yml"
+STAGES = ["update", "publish"]
+
+
+def discover_offers(root, config_yml: str = "config.yml", manifest_name: str = MANIFEST_NAME) -> list:
+    """
+    Find the offers under a root directory
+
+    :param root: directory searched recursively for manifests
+    :param config_yml: configuration used by offers without a config.yml next to their manifest
+    :param manifest_name: file name of offer manifests
+    :return: list of dicts with name, manifest and the options of the offer's commands
+    """
+    import yaml  # pylint: disable=import-outside-toplevel
+
+    offers = []
+    for manifest_path in sorted(Path(root).rglob(manifest_name)):
+        with open(manifest_path, "r", encoding="utf8") as read_file:
+            manifest = yaml.safe_load(read_file) or {}
+        offer_dir = manifest_path.parent
+        offer_config = offer_dir.joinpath("config.yml")
+        offers.append(
+            {
+                "name": manifest.get("name") or offer_dir.name,
+                "manifest": str(manifest_path),
+                "options": {
+                    "config_yml": str(offer_config if offer_config.is_file() else config_yml),
+                    "config_json": manifest.get("json_listing_config", "listing_config.json"),
+                    "app_path": str(offer_dir.joinpath(manifest.get("app_path", "."))),
+                },
+            }
+        )
+    return offers
+
+
+def run_fleet(offers: list, create_cli, subgroup: str = "ma", max_workers: int = None, output=None) -> int:
+    """
+    Update and publish offers concurrently, writing a result line as each offer completes and a summary at the end
+
+    :param offers: offers found by discover_offers
+    :param create_cli: callable taking argv and returning the CLIParser of its subgroup
+    :param subgroup: offer type, e.g. ma or st
+    :param max_workers: number of offers processed at once, default: AZPC_MAX_WORKERS
+    :param output: text stream for NDJSON results, default: sys.stdout
+    :return: number of failed offers
+    """
+    output = output or sys.stdout
+    start = time.monotonic()
+    failures = 0
+    with ThreadPoolExecutor(max_workers=max_workers or get_max_workers()) as executor:
+        futures = [executor.submit(_run_offer, offer, create_cli, subgroup) for offer in offers]
+        for future in as_completed(futures):
+            result = future.result()
+            failures += result["status"] == "error"
+            output.write(json.dumps(result, default=to_json) + "\n")
+            output.flush()
+    summary = {
+        "offers": len(offers),
+        "ok": len(offers) - failures,
+        "failed": failures,
+        "seconds": round(time.monotonic() - start, 3),
+    }
+    output.write(json.dumps({"summary": summary}) + "\n")
+    output.flush()
+    return failures
+
+
+def main(argv: list, create_cli) -> int:
+    """
+    azpc fleet ROOT [--subgroup ma] [--config-yml config.yml] [--manifest-name manifest.yml] [--max-workers N]
+
+    :param argv: arguments after 'fleet'
+    :param create_cli: callable taking argv and returning the CLIParser of its subgroup
+    :return: number of failed offers
+    """
+    parser = argparse.ArgumentParser("azpc fleet")
+    parser.add_argument("root", type=str, help="Directory searched recursively for offer manifests")
+    parser.add_argument("--subgroup", type=str, help="Offer type of every offer, e.g. ma or st", default="ma")
+    parser.add_argument("--config-yml", type=str, help="Configuration YML shared by the offers", default="config.yml")
+    parser.add_argument("--manifest-name", type=str, help="File name of offer manifests", default=MANIFEST_NAME)
+    parser.add_argument("--max-workers", type=int, help="Number of offers processed at once", default=None)
+    args = parser.parse_args(argv)
+    offers = discover_offers(args.root, config_yml=args.config_yml, manifest_name=args.manifest_name)
+    return run_fleet(offers, create_cli, subgroup=args.subgroup, max_workers=args.max_workers)
+
+
+def _run_offer(offer: dict, create_cli, subgroup: str) -> dict:
+    result = {"offer": offer["name"], "manifest": offer["manifest"]}
+    start = time.monotonic()
+    try:
+        for stage in STAGES:
+            result["stage"] = stage
+            result["result"] = dispatch(create_cli, _to_argv(subgroup, stage, offer))
+        result["status"] = "ok"
+    except SystemExit as error:
+        result["status"] = "error"
+        result["error"] = f"Invalid arguments, exit code {error.code}"
+    except Exception as error:  # pylint: disable=broad-except
+        result["status"] = "error"
+        result["error"] = f"{type(error).__name__}: {error}"
+    result["seconds"] = round(time.monotonic() - start, 3)
+    return result
+
+
+def _to_argv(subgroup: str, stage: str, offer: dict) -> list:
+    argv = [subgroup, stage, "--name", offer["name"], "--config-yml", offer["options"]["config_yml"]]
+    if stage == "update":
+        argv += ["--config-json", offer["options"]["config_json"], "--app-path", offer["options"]["app_path"]]
+    return argv
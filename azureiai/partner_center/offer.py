@@ -2,22 +2,14 @@
 #  Copyright (c) Microsoft Corporation. All rights reserved.
 #  ---------------------------------------------------------
 """Offer Interface"""
-import os
 from abc import abstractmethod
 
-import yaml
-from adal import AuthenticationContext
-from azure.identity import AzureCliCredential
-
+from azureiai.managed_apps.clients import get_api
 from azureiai.managed_apps.confs import ResellerConfiguration
 from azureiai.managed_apps.confs.variant import FeatureAvailability
-from azureiai.managed_apps.utils import (
-    AAD_CRED,
-    AAD_ID,
-    TENANT_ID,
-    get_draft_instance_id,
-    get_variant_draft_instance_id,
-)
+from azureiai.managed_apps.id_index import IdIndex
+from azureiai.managed_apps.token_cache import get_partner_center_authorization
+from azureiai.managed_apps.utils import get_draft_instance_id, get_variant_draft_instance_id
 from swagger_client import (
     BranchesApi,
     ProductApi,
@@ -26,6 +18,7 @@ from swagger_client import (
     SubmissionApi,
     VariantApi,
 )
+from swagger_client.rest import ApiException
 
 
 class Offer:
@@ -37,12 +30,12 @@ class Offer:
         self._authorization = None
 
         self._apis = {
-            "product": ProductApi(),
-            "variant": VariantApi(),
-            "property": PropertyApi(),
-            "branches": BranchesApi(),
-            "product_availability": ProductAvailabilityApi(),
-            "submission": SubmissionApi(),
+            "product": get_api(ProductApi),
+            "variant": get_api(VariantApi),
+            "property": get_api(PropertyApi),
+            "branches": get_api(BranchesApi),
+            "product_availability": get_api(ProductAvailabilityApi),
+            "submission": get_api(SubmissionApi),
         }
 
         self._ids = {
@@ -61,36 +54,18 @@ class Offer:
         :return: Authorization Header contents
         """
         if self._authorization is None:
-            if os.path.exists(self.config_yaml):
-                with open(self.config_yaml, encoding="utf8") as file:
-                    settings = yaml.safe_load(file)
-
-                client_id = os.getenv(AAD_ID, settings["aad_id"])
-                client_secret = os.getenv(AAD_CRED, settings["aad_secret"])
-                tenant_id = os.getenv(TENANT_ID, settings["tenant_id"])
-
-                auth_context = AuthenticationContext(f"https://login.microsoftonline.com/{tenant_id}")
-
-                token_response = auth_context.acquire_token_with_client_credentials(
-                    resource="https://api.partner.microsoft.com",
-                    client_id=client_id,
-                    client_secret=client_secret,
-                )
-                self._authorization = f"Bearer {token_response['accessToken']}"
-            else:
-                azure_cli = AzureCliCredential()
-                token_response = azure_cli.get_token("https://api.partner.microsoft.com")
-
-                self._authorization = f"Bearer {token_response.token}"
+            self._authorization = get_partner_center_authorization(self.config_yaml)
         return self._authorization
 
     def get_product_id(self) -> str:
         """
         Get or Set Product ID
 
-        Will call create method if AMA has not yet been created.
+        Product IDs found before are read from the ID Index and confirmed instead of looked up by name.
         :return: Product ID of new Managed Application
         """
+        if self._ids["product_id"] == "":
+            self._show_indexed_product()
         if self._ids["product_id"] == "":
             filter_name = "ExternalIDs/Any(i:i/Type eq 'AzureOfferId' and i/Value eq '" + self.name + "')"
             api_response = self._apis["product"].products_get(authorization=self.get_auth(), filter=filter_name)
@@ -98,9 +73,31 @@ class Offer:
             for submission in submissions["value"]:
                 if submission["name"] == self.name:
                     self._ids["product_id"] = submission["id"]
+                    IdIndex(self.config_yaml).record_products({self.name: submission["id"]})
 
         return self._ids["product_id"]
 
+    def _show_indexed_product(self):
+        """Get the product by the product id in the ID Index, dropping the entry if it is gone or renamed"""
+        product_id = IdIndex(self.config_yaml).get_product_id(self.name)
+        if not product_id:
+            return None
+        try:
+            product = (
+                self._apis["product"]
+                .products_product_id_get(product_id=product_id, authorization=self.get_auth())
+                .to_dict()
+            )
+        except ApiException as error:
+            if error.status != 404:
+                raise
+            product = None
+        if product is None or get_product_ids([product]).get(self.name) != product_id:
+            IdIndex(self.config_yaml).forget_product(self.name)
+            return None
+        self._ids["product_id"] = product_id
+        return product
+
     def get_submission_id(self) -> str:
         """
         Get or Set Submission ID
@@ -144,9 +141,9 @@ class Offer:
     def create(self) -> dict:
         """Create new Azure Managed Application and set product id."""
 
-    def _get_draft_instance_id(self, module: str, retry: int = 0):
+    def _get_draft_instance_id(self, module: str):
         """Call Branch API to get Configuration ID"""
-        return get_draft_instance_id(self.get_product_id(), self.get_auth(), module, retry)
+        return get_draft_instance_id(self.get_product_id(), self.get_auth(), module)
 
     def _get_variant_draft_instance_id(self, plan_id, module: str) -> str:
         return get_variant_draft_instance_id(plan_id, self.get_product_id(), self.get_auth(), module)
@@ -158,3 +155,13 @@ class Offer:
     def _set_pricing_and_availability(self, azure_subscription):
         feature_availability = FeatureAvailability(product_id=self.get_product_id(), authorization=self.get_auth())
         feature_availability.set(azure_subscription=azure_subscription)
+
+
+def get_product_ids(products: list) -> dict:
+    """Map the AzureOfferId of every product to its product id"""
+    return {
+        external_id["value"]: product["id"]
+        for product in products
+        for external_id in product.get("external_i_ds") or []
+        if external_id.get("type") == "AzureOfferId"
+    }
@@ -30,5 +30,5 @@ class Application(Submission):
 class ApplicationCLI(CLIParser):
     """Managed Application CLI Parser"""
 
-    def __init__(self):
-        super().__init__(submission_type=Application)
+    def __init__(self, argv: list = None):
+        super().__init__(submission_type=Application, argv=argv)
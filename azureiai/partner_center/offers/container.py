@@ -30,5 +30,5 @@ class Container(Submission):
 class ContainerCLI(CLIParser):
     """Methods for Solution Template"""
 
-    def __init__(self):
-        super().__init__(submission_type=Container)
+    def __init__(self, argv: list = None):
+        super().__init__(submission_type=Container, argv=argv)
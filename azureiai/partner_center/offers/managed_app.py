@@ -30,5 +30,5 @@ class ManagedApp(Submission):
 class ManagedAppCLI(CLIParser):
     """Managed Application CLI Parser"""
 
-    def __init__(self):
-        super().__init__(submission_type=ManagedApp)
+    def __init__(self, argv: list = None):
+        super().__init__(submission_type=ManagedApp, argv=argv)
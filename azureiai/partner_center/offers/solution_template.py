@@ -30,5 +30,5 @@ class SolutionTemplate(Submission):
 class SolutionTemplateCLI(CLIParser):
     """Methods for Solution Template"""
 
-    def __init__(self):
-        super().__init__(submission_type=SolutionTemplate)
+    def __init__(self, argv: list = None):
+        super().__init__(submission_type=SolutionTemplate, argv=argv)
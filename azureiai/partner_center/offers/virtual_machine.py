@@ -4,12 +4,13 @@
 """CLI Wrapper for Creating, Updating, or Deleting Azure Virtual Machines"""
 import json
 import os
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
-import requests
 import yaml
-from adal import AuthenticationContext
 
+from azureiai.managed_apps import sessions
+from azureiai.managed_apps.token_cache import AccessToken, get_client_credentials_access_token, needs_refresh
 from azureiai.managed_apps.utils import AAD_CRED, AAD_ID, TENANT_ID
 from azureiai.partner_center.cli_parser import CLIParser
 from azureiai.partner_center.submission import Submission
@@ -23,6 +24,8 @@ URL_BASE = RESOURCE_CPP_API + "/api/publishers"
 class VirtualMachine(Submission):
     """Azure Partner Center Virtual Machine offer."""
 
+    listing_schema = None
+
     def __init__(
         self,
         name=None,
@@ -39,7 +42,9 @@ class VirtualMachine(Submission):
             json_listing_config=json_listing_config,
         )
         self.notification_emails = notification_emails
-        self._legacy_authorization = None
+        self._legacy_authorization: Optional[str] = None
+        self._settings = None
+        self._tokens: dict = {}
 
     def create(self):
         """
@@ -50,6 +55,7 @@ class VirtualMachine(Submission):
 
         The 'Update' command is used to create a new offer when the offer does not exist.
         """
+        self.prefetch_auth()
         try:
             if self.show()["id"]:
                 raise NameError("Virtual Machine offer already exists. Try using 'update'?")
@@ -61,28 +67,31 @@ class VirtualMachine(Submission):
         """Update Existing Virtual Machine offer"""
         headers, json_config, url = self._prepare_request()
 
-        response = requests.put(url, json=json_config, headers=headers)
+        response = sessions.put(url, json=json_config, headers=headers)
         if response.status_code != 200:
             self._raise_connection_error(response)
         return response.json()
 
     def list_contents(self) -> dict:
         """list only the Virtual Machine offers"""
-        with open(self.config_yaml, encoding="utf8") as file:
-            settings = yaml.safe_load(file)
-            if "publisherId" not in settings:
-                raise ValueError(f"Key: publisherId is missing from {self.config_yaml}")
-            publisher_id = settings["publisherId"]
+        settings = self._get_settings()
+        if "publisherId" not in settings:
+            raise ValueError(f"Key: publisherId is missing from {self.config_yaml}")
+        publisher_id = settings["publisherId"]
         offer_type_filter = "offerTypeId eq 'microsoft-azure-virtualmachines'"
         url = f"{URL_BASE}/{publisher_id}/offers?api-version=2017-10-31&$filter={offer_type_filter}"
         headers = {"Authorization": self.get_auth(RESOURCE_CPP_API), "Content-Type": "application/json"}
-        response = requests.get(url, headers=headers)
+        response = sessions.get(url, headers=headers)
         return response.json()
 
+    def iter_contents(self):
+        """Iterate over the Virtual Machine offers, the Cloud Partner Portal returns them in a single response"""
+        offers = self.list_contents()
+        yield from offers.get("value", []) if isinstance(offers, dict) else offers
+
     def publish(self):
         """Publish Existing Virtual Machine offer"""
-        with open(Path(self.app_path).joinpath(self.json_listing_config), "r", encoding="utf8") as read_file:
-            json_config = json.load(read_file)
+        json_config = self.get_listing_config()
         if "publisherId" not in json_config:
             raise ValueError(f"Key: publisherId is missing from {self.app_path}/{self.json_listing_config}")
         publisher_id = json_config["publisherId"]
@@ -92,7 +101,7 @@ class VirtualMachine(Submission):
 
         headers = {"Authorization": self.get_auth(RESOURCE_CPP_API), "Content-Type": "application/json"}
 
-        response = requests.post(
+        response = sessions.post(
             url, json={"metadata": {"notification-emails": self.notification_emails}}, headers=headers
         )
         if response.status_code != 202:
@@ -103,41 +112,51 @@ class VirtualMachine(Submission):
         """
         Create Authentication Header
 
+        Tokens are refreshed once they are about to expire, so long running operations keep a valid header.
+
+        :param resource: RESOURCE_PC_API for the ingestion API or RESOURCE_CPP_API for the Cloud Partner Portal API
         :return: Authorization Header contents
         """
+        if resource not in [RESOURCE_PC_API, RESOURCE_CPP_API]:
+            raise Exception("The provided resource is unsupported.")
+
+        token = self._tokens.get(resource)
+        if token is None or needs_refresh(token):
+            token = self._get_auth(resource)
+            self._tokens[resource] = token
+        authorization = f"Bearer {token.token}"
         if resource == RESOURCE_PC_API:
-            if self._authorization is None:
-                self._authorization = f"Bearer {self._get_auth(resource)}"
-            return self._authorization
-
-        if resource == RESOURCE_CPP_API:
-            if self._legacy_authorization is None:
-                self._legacy_authorization = f"Bearer {self._get_auth(resource)}"
-            return self._legacy_authorization
-        raise Exception("The provided resource is unsupported.")
-
-    def _get_auth(self, resource) -> str:
-        with open(self.config_yaml, encoding="utf8") as file:
-            settings = yaml.safe_load(file)
+            self._authorization = authorization
+        else:
+            self._legacy_authorization = authorization
+        return authorization
+
+    def prefetch_auth(self):
+        """Acquire the ingestion API and Cloud Partner Portal API tokens concurrently"""
+        self._get_settings()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(self.get_auth, [RESOURCE_PC_API, RESOURCE_CPP_API]))
+
+    def _get_settings(self) -> dict:
+        if self._settings is None:
+            with open(self.config_yaml, encoding="utf8") as file:
+                self._settings = yaml.safe_load(file)
+        return self._settings
+
+    def _get_auth(self, resource) -> AccessToken:
+        settings = self._get_settings()
 
         client_id = os.getenv(AAD_ID, settings["aad_id"])
         client_secret = os.getenv(AAD_CRED, settings["aad_secret"])
         tenant_id = os.getenv(TENANT_ID, settings["tenant_id"])
 
-        auth_context = AuthenticationContext(f"https://login.microsoftonline.com/{tenant_id}")
-        token_response = auth_context.acquire_token_with_client_credentials(
-            resource=resource,
-            client_id=client_id,
-            client_secret=client_secret,
-        )
-        return token_response["accessToken"]
+        return get_client_credentials_access_token(tenant_id, client_id, client_secret, resource)
 
     def _prepare_request(self):
-        with open(Path(self.app_path).joinpath(self.json_listing_config), "r", encoding="utf8") as read_file:
-            json_config = json.load(read_file)
-            if "publisherId" not in json_config:
-                raise ValueError(f"Key: publisherId is missing from {self.app_path}/{self.json_listing_config}")
-            publisher_id = json_config["publisherId"]
+        json_config = self.get_listing_config()
+        if "publisherId" not in json_config:
+            raise ValueError(f"Key: publisherId is missing from {self.app_path}/{self.json_listing_config}")
+        publisher_id = json_config["publisherId"]
         offer_id = json_config["id"]
         url = f"{URL_BASE}/{publisher_id}/offers/{offer_id}?api-version=2017-10-31"
         headers = {"Authorization": self.get_auth(RESOURCE_CPP_API), "Content-Type": "application/json"}
@@ -156,8 +175,8 @@ class VirtualMachine(Submission):
 class VirtualMachineCLI(CLIParser):
     """Methods for Virtual Machine"""
 
-    def __init__(self):
-        super().__init__(submission_type=VirtualMachine)
+    def __init__(self, argv: list = None):
+        super().__init__(submission_type=VirtualMachine, argv=argv)
 
     def publish(self):
         """Publish a Virtual Machine Offer"""
@@ -1,6 +1,5 @@
-import requests
-
-from swagger_client import ApiClient
+from azureiai.managed_apps import sessions
+from azureiai.managed_apps.clients import get_api_client
 
 
 class OffersApi(object):
@@ -8,8 +7,8 @@ class OffersApi(object):
 
     def __init__(self, api_client=None):
         if api_client is None:
-            api_client = ApiClient()
+            api_client = get_api_client()
         self.api_client = api_client
 
     def create_offer(self, resource_path, body, headers):
-        return requests.put(resource_path, body, headers=headers)
+        return sessions.put(resource_path, body, headers=headers)
@@ -1,15 +1,18 @@
 import json
-from distutils.util import strtobool
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
 import yaml
-from pygments import highlight
-from pygments.formatters import TerminalFormatter
-from pygments.lexers import JsonLexer
 
+from azureiai.managed_apps import retry
+from azureiai.managed_apps.branch_cache import BRANCH_CACHE
 from azureiai.managed_apps.confs.variant import OfferListing, FeatureAvailability, Package
+from azureiai.managed_apps.id_index import IdIndex
+from azureiai.managed_apps.paging import iter_pages
+from azureiai.managed_apps.utils import get_max_workers, resolve_draft_instance_ids
 from azureiai.partner_center import CLIParser
-from azureiai.partner_center.submission import Submission
+from azureiai.partner_center.cli_parser import OUTPUT_JSON, OUTPUT_NDJSON, strtobool
+from azureiai.partner_center.submission import VARIANT_SUBMISSION_MODULES, Submission
 from swagger_client.rest import ApiException
 
 AZURE_APPLICATION = "AzureApplication"
@@ -26,6 +29,8 @@ class Plan(Submission):
         app_path: str = ".",
         json_listing_config="ma_config.json",
         subtype="",
+        product_id: str = "",
+        plan_id: Optional[str] = None,
     ):
         super().__init__(
             name=name,
@@ -36,6 +41,7 @@ class Plan(Submission):
         )
         self.plan_name = plan_name
         self.subtype = subtype
+        self._ids.update(product_id=product_id, plan_id=plan_id)
 
     def create(self):
         """
@@ -65,6 +71,8 @@ class Plan(Submission):
             body=body,
         )
         self._ids["plan_id"] = api_response["id"]
+        IdIndex(self.config_yaml).record_plans(self._ids["product_id"], {self.plan_name: api_response["id"]})
+        BRANCH_CACHE.invalidate(self._ids["product_id"])
         self.update()
         return api_response
 
@@ -78,29 +86,105 @@ class Plan(Submission):
         self._update_technical_configuration()
         return self._ids["product_id"]
 
+    def update_all(self, max_workers: int = None) -> dict:
+        """
+        Update every plan of the listing configuration concurrently
+
+        The product id, the variant list and the branches of each variant module are looked up once and shared by all
+        plans. A plan that fails is reported in the result and does not stop the others.
+
+        :param max_workers: number of plans updated at once, default: AZPC_MAX_WORKERS or 4
+        :return: dict with the product id and, per plan name, its status and variant id or error
+        """
+        plan_names = self.get_listing_config().get_plan_names()
+        if not plan_names:
+            raise ValueError(
+                f"plan_overview of {self.json_listing_config} must be keyed by plan name to update all plans"
+            )
+        if not self._ids["product_id"]:
+            self._set_product_id()
+        plan_ids = get_plan_ids(self.list_contents()["value"])
+        resolve_draft_instance_ids(self._ids["product_id"], self.get_auth(), VARIANT_SUBMISSION_MODULES, max_workers)
+
+        with ThreadPoolExecutor(max_workers=max_workers or get_max_workers()) as executor:
+            futures = {name: executor.submit(self._update_plan, name, plan_ids.get(name)) for name in plan_names}
+            plans = {name: get_plan_result(future.exception() or future.result()) for name, future in futures.items()}
+        return {"product_id": self._ids["product_id"], "plans": plans}
+
+    def _update_plan(self, plan_name: str, plan_id: str) -> dict:
+        if plan_id is None:
+            raise LookupError(f"Plan with this name not found: {plan_name}")
+        retry.start_command()
+        plan = Plan(
+            plan_name,
+            self.name,
+            config_yaml=self.config_yaml,
+            app_path=self.app_path,
+            json_listing_config=self.json_listing_config,
+            subtype=self.subtype,
+            product_id=self._ids["product_id"],
+            plan_id=plan_id,
+        )
+        plan.update()
+        return {"status": "ok", "plan_id": plan_id}
+
     def list_contents(self):
         """List Azure Submissions."""
+        return {"value": list(self.iter_contents())}
+
+    def iter_contents(self):
+        """Iterate over the Plans of the Submission, requesting the next page only once the previous one is consumed."""
         if not self._ids["product_id"]:
             self._set_product_id()
-        api_response = self._apis["variant"].products_product_id_variants_get(
-            product_id=self._ids["product_id"], authorization=self.get_auth()
+        pages = iter_pages(
+            self._apis["variant"].products_product_id_variants_get,
+            product_id=self._ids["product_id"],
+            authorization=self.get_auth(),
         )
-        return api_response.to_dict()
+        for page in pages:
+            IdIndex(self.config_yaml).record_plans(self._ids["product_id"], get_plan_ids(page["value"]))
+            yield from page["value"]
 
     def show(self):
         if not self._ids["product_id"]:
             self._set_product_id()
 
+        submission = self._show_indexed_plan()
+        if submission is not None:
+            return submission
+
         api_response = self._apis["variant"].products_product_id_variants_get(
             product_id=self._ids["product_id"], authorization=self.get_auth()
         )
         submissions = api_response.to_dict()
+        IdIndex(self.config_yaml).record_plans(self._ids["product_id"], get_plan_ids(submissions["value"]))
         for submission in submissions["value"]:
             if "externalID" in submission and submission["externalID"] == self.plan_name:
                 self._ids["plan_id"] = submission["id"]
                 return submission
         raise LookupError(f"Plan with this name not found: {self.plan_name}")
 
+    def _show_indexed_plan(self):
+        """Get the Plan by the variant id in the ID Index, dropping the entry if it is gone or renamed"""
+        plan_id = IdIndex(self.config_yaml).get_plan_id(self._ids["product_id"], self.plan_name)
+        if not plan_id:
+            return None
+        try:
+            submission = self._apis["variant"].products_product_id_variants_variant_id_get(
+                product_id=self._ids["product_id"], variant_id=plan_id, authorization=self.get_auth()
+            )
+        except ApiException as error:
+            if error.status != 404:
+                raise
+            submission = None
+        if hasattr(submission, "to_dict"):
+            submission = submission.to_dict()
+        if not submission or submission.get("externalID") != self.plan_name:
+            IdIndex(self.config_yaml).forget_plan(self._ids["product_id"], self.plan_name)
+            return None
+        self._ids["plan_id"] = plan_id
+        return submission
+
     def delete(self) -> {}:
         if not self._ids["plan_id"]:
             self.show()
@@ -110,16 +194,20 @@ class Plan(Submission):
             variant_id=self._ids["plan_id"],
             authorization=self.get_auth(),
         )
+        IdIndex(self.config_yaml).forget_plan(self._ids["product_id"], self.plan_name)
         return {}
 
     def _set_product_id(self):
         """Set Azure Partner Center Product ID"""
+        if self._show_indexed_product() is not None:
+            return None
         filter_name = "ExternalIDs/Any(i:i/Type eq 'AzureOfferId' and i/Value eq '" + self.name + "')"
         api_response = self._apis["product"].products_get(authorization=self.get_auth(), filter=filter_name)
         submissions = api_response.to_dict()
         for submission in submissions["value"]:
             if submission["name"] == self.name:
                 self._ids["product_id"] = submission["id"]
+                IdIndex(self.config_yaml).record_products({self.name: submission["id"]})
                 return submission
         raise LookupError(f"{self.resource_type} with this name not found: {self.name}")
 
@@ -128,8 +216,7 @@ class Plan(Submission):
 
     def _update_plan_listing(self):
         plan_config = self._load_plan_config()
-        offer_listing_properties = plan_config["plan_listing"]
-        offer_listing_properties["resourceType"] = "AzureListing"
+        offer_listing_properties = dict(plan_config["plan_listing"], resourceType="AzureListing")
         offer_listing = OfferListing(
             product_id=self.get_product_id(), plan_id=self._ids["plan_id"], authorization=self.get_auth()
         )
@@ -148,6 +235,11 @@ class Plan(Submission):
         try:
             feature_availability.set(azure_subscription=azure_subscription, visibility=visibility)
         except ApiException as error:
+            # pylint: disable=import-outside-toplevel
+            from pygments import highlight
+            from pygments.formatters import TerminalFormatter
+            from pygments.lexers import JsonLexer
+
             error_message = bytes.decode(error.body).replace("\\", "").split(". ")
             if isinstance(error_message, str):
                 raise PermissionError(error_message) from error
@@ -159,9 +251,7 @@ class Plan(Submission):
             ) from error
 
     def _update_technical_configuration(self):
-        with open(Path(self.app_path).joinpath(self.json_listing_config), "r", encoding="utf8") as read_file:
-            json_config = json.load(read_file)
-
+        json_config = self.get_listing_config()
         plan_config = self._load_plan_config()
 
         with open("manifest.yml", encoding="utf8") as file:
@@ -220,8 +310,8 @@ class Plan(Submission):
 class PlanCLIParser(CLIParser):
     """CLI Parser for Marketplace Plans"""
 
-    def __init__(self):
-        super().__init__(submission_type=Plan)
+    def __init__(self, argv: list = None):
+        super().__init__(submission_type=Plan, argv=argv)
         self.parser.add_argument("plan_command", type=str, help="Which plan command to run")
         self.parser.add_argument("--name", type=str, help="Which command to run")
 
@@ -258,8 +348,12 @@ class PlanCLIParser(CLIParser):
 
     def list_command(self) -> {}:
         """Create a new Managed Application"""
-        args = self.parser.parse_args()
-        return self.submission_type(name=args.name, config_yaml=args.config_yml).list_contents()
+        self._add_output_argument()
+        args = self.parser.parse_args(self.argv)
+        plan = self.submission_type(name=args.name, config_yaml=args.config_yml)
+        if getattr(args, "output", OUTPUT_JSON) == OUTPUT_NDJSON:
+            return plan.iter_contents()
+        return plan.list_contents()
 
     def show(self) -> {}:
         """Create a new Managed Application"""
@@ -272,8 +366,25 @@ class PlanCLIParser(CLIParser):
         return self.submission_type(args.plan_name, args.name, config_yaml=args.config_yml).delete()
 
     def update(self) -> {}:
-        """Create a new Managed Application"""
+        """Update a Plan, or with --all every plan of the listing configuration"""
+        self.parser.add_argument(
+            "--all",
+            help="Update every plan of the listing configuration concurrently.",
+            type=lambda x: bool(strtobool(x)),
+            nargs="?",
+            const=True,
+            default=False,
+        )
+        self.parser.add_argument("--max-workers", type=int, help="Number of plans updated at once", default=None)
         args = self._add_name_config_json_argument()
+        if getattr(args, "all", False):
+            return self.submission_type(
+                name=args.name,
+                config_yaml=args.config_yml,
+                json_listing_config=args.config_json,
+                app_path=args.app_path,
+                subtype=args.subgroup,
+            ).update_all(max_workers=getattr(args, "max_workers", None))
         return self._update(args)
 
     def _update(self, args):
@@ -290,3 +401,20 @@ class PlanCLIParser(CLIParser):
         """Publish a Managed Application"""
         args = self._add_name_argument()
         return self.submission_type(args.plan_name, args.name, config_yaml=args.config_yml).publish()
+
+
+def get_plan_result(outcome) -> dict:
+    """
+    Get the result of a plan update, or its error
+
+    :param outcome: result of the update, or the exception it raised
+    :return: dict with the status and the variant id or error
+    """
+    if isinstance(outcome, BaseException):
+        return {"status": "error", "error": f"{type(outcome).__name__}: {outcome}"}
+    return outcome
+
+
+def get_plan_ids(variants: list) -> dict:
+    """Map the externalID of every variant to its variant id"""
+    return {variant["externalID"]: variant["id"] for variant in variants if variant.get("externalID")}
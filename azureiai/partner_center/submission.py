@@ -2,19 +2,30 @@
 #  Copyright (c) Microsoft Corporation. All rights reserved.
 #  ---------------------------------------------------------
 """CLI Wrapper for Creating, Updating, or Deleting Azure Managed Applications"""
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from azureiai.managed_apps.branch_cache import BRANCH_CACHE
 from azureiai.managed_apps.confs import Properties, ProductAvailability, Listing, ListingImage, ResellerConfiguration
 from azureiai.managed_apps.confs.reseller_configuration import DEFAULT_STATE
-from azureiai.partner_center.offer import Offer
+from azureiai.managed_apps.id_index import IdIndex
+from azureiai.managed_apps.listing_config import ListingConfig, load_listing_config
+from azureiai.managed_apps.paging import iter_pages
+from azureiai.managed_apps.schema import LISTING_CONFIG_SCHEMA
+from azureiai.managed_apps.utils import resolve_draft_instance_ids
+from azureiai.partner_center.offer import Offer, get_product_ids
 from swagger_client.rest import ApiException
 
+SUBMISSION_MODULES = ["Availability", "Property", "Package", "Listing"]
+VARIANT_SUBMISSION_MODULES = ["Availability", "Package", "Listing"]
+
 
 class Submission(Offer):
     """New Version of Offer used for v2 CLI"""
 
+    listing_schema = LISTING_CONFIG_SCHEMA
+
     def __init__(
         self,
         name=None,
@@ -30,10 +41,18 @@ class Submission(Offer):
 
     def list_contents(self):
         """List Azure Submissions."""
-        api_response = self._apis["product"].products_get(
-            authorization=self.get_auth(), filter=f"ResourceType eq '{self.resource_type}'"
+        return {"value": list(self.iter_contents())}
+
+    def iter_contents(self):
+        """Iterate over Azure Submissions, requesting the next page only once the previous one is consumed."""
+        pages = iter_pages(
+            self._apis["product"].products_get,
+            authorization=self.get_auth(),
+            filter=f"ResourceType eq '{self.resource_type}'",
         )
-        return api_response.to_dict()
+        for page in pages:
+            IdIndex(self.config_yaml).record_products(get_product_ids(page["value"]))
+            yield from page["value"]
 
     def create(self) -> dict:
         """Create new Azure Submission and set product id."""
@@ -49,6 +68,7 @@ class Submission(Offer):
             raise NameError("Application already exists. Try using 'update'?") from error
 
         self._ids["product_id"] = api_response.id
+        IdIndex(self.config_yaml).record_products({self.name: api_response.id})
         self.update()
         return api_response.to_dict()
 
@@ -66,12 +86,17 @@ class Submission(Offer):
 
     def show(self):
         """Show details of an Azure Submission"""
+        submission = self._show_indexed_product()
+        if submission is not None:
+            return submission
+
         filter_name = "ExternalIDs/Any(i:i/Type eq 'AzureOfferId' and i/Value eq '" + self.name + "')"
         api_response = self._apis["product"].products_get(authorization=self.get_auth(), filter=filter_name)
         submissions = api_response.to_dict()
         for submission in submissions["value"]:
             if submission["external_i_ds"][0]["value"] == self.name:
                 self._ids["product_id"] = submission["id"]
+                IdIndex(self.config_yaml).record_products({self.name: submission["id"]})
                 return submission
         raise LookupError(f"{self.resource_type} with this name not found: {self.name}")
 
@@ -82,44 +107,29 @@ class Submission(Offer):
         api_response = self._apis["product"].products_product_id_delete(
             product_id=self._ids["product_id"], authorization=self.get_auth()
         )
+        IdIndex(self.config_yaml).forget_product(self.name)
         return api_response
 
     def publish(self):
         """Publish Submission by submitting Instance IDs"""
         if not self._ids["product_id"]:
             self.show()
-        body = {
-            "resourceType": "SubmissionCreationRequest",
-            "targets": [{"type": "Scope", "value": "preview"}],
-            "resources": [
-                {"type": "Availability", "value": self._get_draft_instance_id("Availability")},
-                {"type": "Property", "value": self._get_draft_instance_id("Property")},
-                {"type": "Package", "value": self._get_draft_instance_id("Package")},
-                {"type": "Listing", "value": self._get_draft_instance_id("Listing")},
-                {"type": "ResellerConfiguration", "value": self.get_product_id() + "-ResellerInstance"},
-            ],
-            "variantResources": [],
-        }
-
-        response = self._apis["variant"].products_product_id_variants_get(
-            product_id=self._ids["product_id"], authorization=self.get_auth()
-        )
-
-        for variant in response.to_dict()["value"]:
-            if variant["id"] != "testdrive":
-                body["variantResources"] += [
-                    {
-                        "variantID": variant["id"],
-                        "resources": [
-                            {
-                                "type": "Availability",
-                                "value": self._get_variant_draft_instance_id(variant["id"], "Availability"),
-                            },
-                            {"type": "Package", "value": self._get_variant_draft_instance_id(variant["id"], "Package")},
-                            {"type": "Listing", "value": self._get_variant_draft_instance_id(variant["id"], "Listing")},
-                        ],
-                    }
-                ]
+        product_id = self.get_product_id()
+        authorization = self.get_auth()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            variants = executor.submit(
+                self._apis["variant"].products_product_id_variants_get,
+                product_id=product_id,
+                authorization=authorization,
+            )
+            draft_instance_ids = executor.submit(
+                resolve_draft_instance_ids, product_id, authorization, SUBMISSION_MODULES
+            )
+            variant_ids = [
+                variant["id"] for variant in variants.result().to_dict()["value"] if variant["id"] != "testdrive"
+            ]
+            body = self._get_submission_body(draft_instance_ids.result(), variant_ids)
 
         try:
             response = self._apis["submission"].products_product_id_submissions_post(
@@ -132,6 +142,7 @@ class Submission(Offer):
                 "Publish Failed! An internal error occurred when trying to publish the package"
             ) from error
         self._ids["submission_id"] = response.id
+        BRANCH_CACHE.invalidate(self.get_product_id())
 
         return self._apis["submission"].products_product_id_submissions_submission_id_get(
             authorization=self.get_auth(),
@@ -139,6 +150,22 @@ class Submission(Offer):
             submission_id=response.id,
         )
 
+    def _get_submission_body(self, draft_instance_ids: dict, variant_ids: list) -> dict:
+        """
+        Assemble the SubmissionCreationRequest from resolved Draft Instance IDs
+
+        Product level Draft Instance IDs missing from the resolved branches are waited for.
+
+        :param draft_instance_ids: dict of module to dict of variant id to draft instance id
+        :param variant_ids: ids of the variants to submit
+        :return: submission request body
+        """
+        draft_instance_ids = dict(draft_instance_ids)
+        for module in SUBMISSION_MODULES:
+            if None not in draft_instance_ids[module]:
+                draft_instance_ids[module] = {**draft_instance_ids[module], None: self._get_draft_instance_id(module)}
+        return get_submission_body(self.get_product_id(), draft_instance_ids, variant_ids)
+
     def release(self):
         """
         Release Marketplace Application by submitting Submission ID
@@ -154,20 +181,19 @@ class Submission(Offer):
         except ApiException as error:
             raise SystemError("Release Failed! Is preview creation in progress?") from error
 
-    def _load_plan_config(self, plan_name: str = None):
-        with open(Path(self.app_path).joinpath(self.json_listing_config), "r", encoding="utf8") as read_file:
-            json_config = json.load(read_file)
+    def get_listing_config(self) -> ListingConfig:
+        """
+        Get the parsed json listing configuration
 
-        plan_overview = json_config["plan_overview"]
-        if isinstance(plan_overview, list):
-            return plan_overview[0]
-        if plan_name:
-            return plan_overview[plan_name]
-        return plan_overview[next(iter(plan_overview))]
+        :return: listing configuration, parsed again only when the file has changed
+        """
+        return load_listing_config(Path(self.app_path).joinpath(self.json_listing_config))
+
+    def _load_plan_config(self, plan_name: str = None):
+        return self.get_listing_config().get_plan(plan_name)
 
     def _update_properties(self):
-        with open(Path(self.app_path).joinpath(self.json_listing_config), "r", encoding="utf8") as read_file:
-            json_config = json.load(read_file)
+        json_config = self.get_listing_config()
         plan_config = self._load_plan_config()
 
         leveled_categories = json_config["property_settings"].get("leveledCategories", {})
@@ -180,27 +206,23 @@ class Submission(Offer):
         )
 
     def _set_resell_through_csps(self):
-        with open(Path(self.app_path).joinpath(self.json_listing_config), "r", encoding="utf8") as read_file:
-            json_config = json.load(read_file)
-            reseller_channel_state = json_config["offer_listing"].get("reseller_channel", DEFAULT_STATE)
+        json_config = self.get_listing_config()
+        reseller_channel_state = json_config["offer_listing"].get("reseller_channel", DEFAULT_STATE)
 
         reseller = ResellerConfiguration(product_id=self.get_product_id(), authorization=self.get_auth())
         reseller.set(reseller_channel_state=reseller_channel_state)
 
     def _update_preview_audience(self):
-        with open(Path(self.app_path).joinpath(self.json_listing_config), "r", encoding="utf8") as read_file:
-            json_config = json.load(read_file)
+        json_config = self.get_listing_config()
 
         azure_subscription = json_config["preview_audience"]["subscriptions"]
         availability = ProductAvailability(product_id=self.get_product_id(), authorization=self.get_auth())
         availability.set(azure_subscription=azure_subscription)
 
     def _update_offer_listing(self, update_image=True):
+        json_config = self.get_listing_config()
         listing = Listing(product_id=self.get_product_id(), authorization=self.get_auth())
-        listing.set(properties=Path(self.app_path).joinpath(self.json_listing_config))
-
-        with open(Path(self.app_path).joinpath(self.json_listing_config), "r", encoding="utf8") as read_file:
-            json_config = json.load(read_file)
+        listing.set(properties=json_config)
 
         if update_image:
             logo_large = json_config["offer_listing"]["listing_logos"]["logo_large"]
@@ -218,7 +240,48 @@ class Submission(Offer):
                 raise FileNotFoundError(f"Logo Wide not Found at location: {self.app_path}/{logo_wide}")
 
             listing_image = ListingImage(product_id=self.get_product_id(), authorization=self.get_auth())
-            listing_image.set(file_name=logo_large, file_path=self.app_path, logo_type="AzureLogoLarge")
-            listing_image.set(file_name=logo_small, file_path=self.app_path, logo_type="AzureLogoSmall")
-            listing_image.set(file_name=logo_medium, file_path=self.app_path, logo_type="AzureLogoMedium")
-            listing_image.set(file_name=logo_wide, file_path=self.app_path, logo_type="AzureLogoWide")
+            listing_image.set_logos(
+                {
+                    "AzureLogoLarge": logo_large,
+                    "AzureLogoSmall": logo_small,
+                    "AzureLogoMedium": logo_medium,
+                    "AzureLogoWide": logo_wide,
+                },
+                file_path=self.app_path,
+            )
+
+
+def get_submission_body(product_id: str, draft_instance_ids: dict, variant_ids: list) -> dict:
+    """
+    Assemble the SubmissionCreationRequest of a product
+
+    :param product_id: Application Product ID
+    :param draft_instance_ids: dict of module to dict of variant id to draft instance id, product level keyed by None
+    :param variant_ids: ids of the variants to submit
+    :return: submission request body
+    """
+    return {
+        "resourceType": "SubmissionCreationRequest",
+        "targets": [{"type": "Scope", "value": "preview"}],
+        "resources": [
+            {"type": module, "value": _get_resolved_draft_instance_id(draft_instance_ids, module)}
+            for module in SUBMISSION_MODULES
+        ]
+        + [{"type": "ResellerConfiguration", "value": product_id + "-ResellerInstance"}],
+        "variantResources": [
+            {
+                "variantID": variant_id,
+                "resources": [
+                    {"type": module, "value": _get_resolved_draft_instance_id(draft_instance_ids, module, variant_id)}
+                    for module in VARIANT_SUBMISSION_MODULES
+                ],
+            }
+            for variant_id in variant_ids
+        ],
+    }
+
+
+def _get_resolved_draft_instance_id(draft_instance_ids: dict, module: str, variant_id: str = None) -> str:
+    if variant_id not in draft_instance_ids[module]:
+        raise ValueError(f"Expected Plan {variant_id} not found in {module} branches")
+    return draft_instance_ids[module][variant_id]
@@ -31,6 +31,8 @@ REQUIRES = [
     "cryptography>=3.3.1",
 ]
 
+EXTRAS_REQUIRE = {"async": ["aiohttp>=3.7"]}
+
 ENTRY_POINTS = {"console_scripts": ["ama=azureiai.ama_app:main", "azpc=azureiai.azpc_app:main"]}
 
 setup(
@@ -41,6 +43,7 @@ setup(
     url="",
     keywords=["Swagger", "https://api.partner.microsoft.com/v1.0/ingestion"],
     install_requires=REQUIRES,
+    extras_require=EXTRAS_REQUIRE,
     packages=find_packages(),
     include_package_data=True,
     long_description="""
@@ -4,11 +4,11 @@
 """CLI v2 Test Suite"""
 from collections import namedtuple
 
-import requests
 import json
 from pathlib import Path
 
 from azureiai import azpc_app
+from azureiai.managed_apps import sessions
 from azureiai.managed_apps.confs import Properties, Listing, ProductAvailability
 from azureiai.managed_apps.confs.variant import OfferListing, FeatureAvailability, Package
 from tests.cli_tests import setup_patched_app
@@ -156,7 +156,7 @@ def vm_update_command(config_yml, json_config, monkeypatch, capsys):
     def mock_put_request(url, data="", headers="", params="", json=""):
         return MockResponse()
 
-    monkeypatch.setattr(requests, "put", mock_put_request)
+    monkeypatch.setattr(sessions, "put", mock_put_request)
 
     args_test(monkeypatch, _update_command_args(config_yml, json_config, subgroup="vm"), capsys)
 
@@ -6,11 +6,14 @@ from collections import namedtuple
 from pathlib import Path
 
 import pytest
-import requests
 from adal import AuthenticationContext
-from azureiai.managed_apps import ManagedApplication
+from azureiai.managed_apps import ManagedApplication, retry, sessions
+from azureiai.managed_apps.branch_cache import BRANCH_CACHE
+from azureiai.managed_apps.circuit_breaker import BREAKER
 from azureiai.managed_apps.confs import ListingImage
 from azureiai.managed_apps.confs.variant import Package
+from azureiai.managed_apps.file_cache import CACHE_DIR
+from azureiai.managed_apps.id_index import ID_INDEX
 from swagger_client import (
     BranchesApi,
     FeatureAvailabilityApi,
@@ -27,6 +30,42 @@ from swagger_client import (
 )
 
 
+@pytest.fixture(autouse=True)
+def branch_cache():
+    """Start every test with an empty Branch Cache"""
+    BRANCH_CACHE.invalidate()
+    yield BRANCH_CACHE
+    BRANCH_CACHE.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def circuit_breaker():
+    """Start every test with closed circuits"""
+    BREAKER.reset()
+    yield BREAKER
+    BREAKER.reset()
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep caches that persist between azpc invocations out of the home directory"""
+    monkeypatch.setenv(CACHE_DIR, str(tmp_path.joinpath("azpc-cache")))
+    return tmp_path.joinpath("azpc-cache")
+
+
+@pytest.fixture(autouse=True)
+def id_index(monkeypatch):
+    """Look ids up through the mocked APIs, tests of the ID Index enable it again"""
+    monkeypatch.setenv(ID_INDEX, "0")
+
+
+@pytest.fixture(autouse=True)
+def retry_delay(monkeypatch):
+    """Retry without sleeping, starting every test with a full retry budget"""
+    monkeypatch.setenv(retry.RETRY_BASE_DELAY, "0")
+    retry.start_command()
+
+
 @pytest.fixture
 def ama_name():
     """Managed Application Offer Name"""
@@ -340,7 +379,7 @@ def ama_mock(ama_name, monkeypatch):
     )
     monkeypatch.setattr(SubmissionApi, "products_product_id_submissions_post", mock_submission_response_post)
     monkeypatch.setattr(SubmissionApi, "products_product_id_submissions_get", mock_response_submissions_get)
-    monkeypatch.setattr(requests, "put", mock_put_request)
+    monkeypatch.setattr(sessions, "put", mock_put_request)
     monkeypatch.setattr(ProductApi, "products_post", mock_products_post)
     monkeypatch.setattr(ProductApi, "products_get", mock_products_get)
 
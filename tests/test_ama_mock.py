@@ -10,15 +10,17 @@ import pytest
 import wget
 from adal import AuthenticationContext
 from azureiai import RetryException, generate_swagger
+from azureiai.managed_apps.branch_cache import BRANCH_CACHE
 from azureiai.managed_apps.confs import Listing, ListingImage, ResellerConfiguration
 from azureiai.managed_apps.confs.offer_configurations import OfferConfigurations
 from azureiai.managed_apps.confs.variant import Package
 from azureiai.managed_apps.confs.variant.variant_plan_configuration import VariantPlanConfiguration
 from azureiai.managed_apps.managed_app import ManagedApplication
 from azureiai.partner_center.offer import Offer
+from azureiai.managed_apps.polling import READINESS_TIMEOUT
 from azureiai.managed_apps.swagger import download_swagger_jar
 from azureiai.managed_apps.utils import get_draft_instance_id
-from swagger_client import BranchesApi, PackageConfigurationApi, ResellerConfigurationApi, ProductApi
+from swagger_client import BranchesApi, ListingImageApi, PackageConfigurationApi, ResellerConfigurationApi, ProductApi
 from swagger_client.rest import ApiException
 from swagger_client.rest import RESTClientObject
 
@@ -322,6 +324,7 @@ def test_variant_plan_mock_error(monkeypatch):
         return namedtuple("response", ["value", "odata_etag", "id"])(*["", "", ""])
 
     monkeypatch.setattr(BranchesApi, "products_product_id_branches_get_by_module_modulemodule_get", mock_branches_get)
+    monkeypatch.setenv(READINESS_TIMEOUT, "0")
 
     vp_config = VariantPlanConfiguration(product_id="test-id", plan_id="abc-123", authorization="test-auth")
     with pytest.raises(BaseException):
@@ -375,6 +378,7 @@ def test_branch_get_mock(monkeypatch):
         return namedtuple("response", ["value", "odata_etag", "id"])(*["", "", ""])
 
     monkeypatch.setattr(BranchesApi, "products_product_id_branches_get_by_module_modulemodule_get", mock_branches_get)
+    BRANCH_CACHE.invalidate()
     with pytest.raises(BaseException):
         get_draft_instance_id(product_id="test-id", authorization="auth", module="test-module")
 
@@ -410,3 +414,76 @@ def test_force_500(plan_name, ama_name, monkeypatch):
         except RetryException as exception:
             print(exception)
             raise exception
+
+
+def test_listing_image_set_logos_mock(ama_mock, app_path_fix, monkeypatch):
+    calls = []
+
+    def mock_listing_get(self):
+        calls.append("listing")
+        return namedtuple("listing", ["id"])(*["listing-id"])
+
+    def mock_images_get(self, authorization, product_id, listing_id):
+        calls.append("images")
+        image = namedtuple("image", ["file_name", "id"])
+        return namedtuple("response", ["value"])(*[[image("r_48_48.png", "old-small"), image("other.png", "other")]])
+
+    def mock_image_delete(self, authorization, product_id, listing_id, image_id):
+        calls.append(image_id)
+
+    monkeypatch.setattr(Listing, "get", mock_listing_get)
+    monkeypatch.setattr(ListingImageApi, "products_product_id_listings_listing_id_images_get", mock_images_get)
+    monkeypatch.setattr(
+        ListingImageApi, "products_product_id_listings_listing_id_images_image_id_delete", mock_image_delete
+    )
+
+    listing_image = ListingImage(product_id="test-id", authorization="test-auth")
+    responses = listing_image.set_logos(
+        {
+            "AzureLogoLarge": "r_216_216.png",
+            "AzureLogoSmall": "r_48_48.png",
+            "AzureLogoMedium": "r_90_90.png",
+            "AzureLogoWide": "r_255_115.png",
+        },
+        file_path=app_path_fix,
+    )
+
+    assert len(responses) == 4
+    assert calls == ["listing", "images", "old-small"]
+
+
+def test_listing_image_skips_unchanged_mock(ama_mock, app_path_fix, monkeypatch):
+    uploads = []
+    image = namedtuple("image", ["file_name", "id", "state"])
+    remote_images = []
+
+    def mock_listing_get(self):
+        return namedtuple("listing", ["id"])(*["listing-id"])
+
+    def mock_images_get(self, authorization, product_id, listing_id):
+        return namedtuple("response", ["value"])(*[list(remote_images)])
+
+    def mock_image_post(self, authorization, product_id, listing_id, body):
+        uploads.append(body["fileName"])
+        remote_images.append(image(body["fileName"], body["id"], "Processed"))
+        return namedtuple("response", ["file_sas_uri", "odata_etag", "id"])(*["", "", body["id"]])
+
+    def mock_image_delete(self, authorization, product_id, listing_id, image_id):
+        remote_images[:] = [remote_image for remote_image in remote_images if remote_image.id != image_id]
+
+    monkeypatch.setattr(Listing, "get", mock_listing_get)
+    monkeypatch.setattr(ListingImageApi, "products_product_id_listings_listing_id_images_get", mock_images_get)
+    monkeypatch.setattr(ListingImageApi, "products_product_id_listings_listing_id_images_post", mock_image_post)
+    monkeypatch.setattr(
+        ListingImageApi, "products_product_id_listings_listing_id_images_image_id_delete", mock_image_delete
+    )
+
+    logos = {"AzureLogoLarge": "r_216_216.png", "AzureLogoSmall": "r_48_48.png"}
+    listing_image = ListingImage(product_id="test-id", authorization="test-auth")
+    assert None not in listing_image.set_logos(logos, file_path=app_path_fix).values()
+    assert listing_image.set_logos(logos, file_path=app_path_fix) == {"AzureLogoLarge": None, "AzureLogoSmall": None}
+    assert sorted(uploads) == ["r_216_216.png", "r_48_48.png"]
+
+    listing_image.set_logos(logos, file_path=app_path_fix, force=True)
+    assert len(uploads) == 4
+    assert len(remote_images) == 2
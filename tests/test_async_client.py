@@ -0,0 +1,84 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Async Ingestion API Client - Unit Tests"""
+import asyncio
+import json
+import sys
+
+import pytest
+from azureiai.managed_apps.async_client import AiohttpTransport, AsyncApiError, AsyncIngestionClient, AsyncResponse
+
+
+class MockTransport:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+        self.closed = False
+
+    async def request(self, method, url, headers=None, params=None, json=None, data=None):
+        self.requests.append((method, url, dict(params or {})))
+        return self.responses.pop(0)
+
+    async def close(self):
+        self.closed = True
+
+
+def _response(status, body=None, headers=None):
+    return AsyncResponse(status, headers or {}, json.dumps(body).encode() if body is not None else b"")
+
+
+@pytest.fixture
+def waits(monkeypatch):
+    waits = []
+
+    async def mock_sleep(delay):
+        waits.append(delay)
+
+    monkeypatch.setattr(asyncio, "sleep", mock_sleep)
+    return waits
+
+
+def test_request_retries_throttled_calls(waits):
+    transport = MockTransport(_response(429, headers={"Retry-After": "3"}), _response(200, {"id": "product-1"}))
+
+    async def run():
+        async with AsyncIngestionClient(transport=transport) as client:
+            return await client.request("GET", "products/product-1", "Bearer token")
+
+    assert asyncio.run(run()) == {"id": "product-1"}
+    assert waits == [3.0]
+    assert len(transport.requests) == 2
+    assert transport.closed
+
+
+def test_request_raises_client_errors(waits):
+    transport = MockTransport(_response(404, {"message": "not found"}))
+
+    with pytest.raises(AsyncApiError) as error:
+        asyncio.run(AsyncIngestionClient(transport=transport).request("GET", "products/gone", "Bearer token"))
+    assert error.value.status == 404
+    assert len(transport.requests) == 1
+    assert waits == []
+
+
+def test_iter_values_follows_skip_tokens():
+    next_link = "products?$filter=x&$skipToken=page-2"
+    transport = MockTransport(
+        _response(200, {"value": [{"id": "a"}], "@odata.nextLink": next_link}),
+        _response(200, {"value": [{"id": "b"}]}),
+    )
+
+    async def run():
+        client = AsyncIngestionClient(transport=transport)
+        return [item["id"] async for item in client.iter_values("products", "Bearer token", {"$filter": "x"})]
+
+    assert asyncio.run(run()) == ["a", "b"]
+    assert transport.requests[1][2] == {"$filter": "x", "$skipToken": "page-2"}
+
+
+def test_missing_aiohttp_names_the_extra(monkeypatch):
+    monkeypatch.setitem(sys.modules, "aiohttp", None)
+
+    with pytest.raises(ImportError, match=r"az-partner-center-cli\[async\]"):
+        asyncio.run(AiohttpTransport().request("GET", "https://api.partner.microsoft.com"))
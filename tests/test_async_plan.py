@@ -0,0 +1,209 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Async Submission and Plan - Unit Tests"""
+import asyncio
+import io
+import json
+import zipfile
+from pathlib import Path
+
+import pytest
+from azureiai.partner_center.async_plan import AsyncPlan
+from azureiai.partner_center.async_submission import AsyncSubmission
+
+PLAN = {"plan_listing": {}, "pricing_and_availability": {}, "technical_configuration": {}}
+PRODUCT = {"id": "product-1", "externalIDs": [{"type": "AzureOfferId", "value": "offer"}]}
+VARIANTS = [{"id": "variant-a", "externalID": "plan-a"}, {"id": "variant-b", "externalID": "plan-b"}]
+
+
+class MockClient:
+    def __init__(self):
+        self.calls = []
+        self.images = []
+        self.uploads = {}
+
+    async def request(self, method, path, authorization, params=None, body=None, if_match=None):
+        self.calls.append((method, path, body))
+        if "getByInstanceID" in path:
+            instance_id = path.split("instanceID=")[1].rstrip(")")
+            return {"value": [{"id": f"settings-{instance_id}", "@odata.etag": f"etag-{instance_id}"}]}
+        if method == "POST" and path.endswith("/submissions"):
+            return {"id": "submission-1"}
+        if method == "POST" and path.endswith("/packages"):
+            return {"id": "package-1", "fileSasUri": "https://storage/package-1", "@odata.etag": "etag-package"}
+        if method == "GET" and path.endswith("/packages/package-1"):
+            return {"id": "package-1", "state": "Processed"}
+        if method == "POST" and path.endswith("/images"):
+            self.images.append({"id": body["id"], "fileName": body["fileName"], "state": "Uploaded"})
+            return dict(body, fileSasUri=f"https://storage/{body['id']}", **{"@odata.etag": "etag-image"})
+        return {"id": path.rsplit("/", 1)[1]}
+
+    async def upload_using_sas(self, sas_url, file_name_full_path):
+        self.uploads[sas_url] = Path(file_name_full_path).read_bytes()
+        return 201
+
+    async def iter_values(self, path, authorization, params=None):
+        self.calls.append(("GET", path, params))
+        for item in self._get_values(path):
+            yield item
+
+    async def iter_pages(self, path, authorization, params=None):
+        self.calls.append(("GET", path, params))
+        yield {"value": self._get_values(path)}
+
+    def _get_values(self, path):
+        if path == "products":
+            return [PRODUCT]
+        if path.endswith("/variants"):
+            return VARIANTS + [{"id": "testdrive"}]
+        if path.endswith("/images"):
+            return self.images
+        module = path.split("module=")[1].rstrip(")")
+        branches = [{"variantID": None, "currentDraftInstanceID": module}]
+        return branches + [{"variantID": f"variant-{x}", "currentDraftInstanceID": f"{module}-{x}"} for x in "ab"]
+
+
+def _get_requests(client, method, collection):
+    return {path.rsplit("/", 1)[1]: body for call, path, body in client.calls if call == method and collection in path}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def mock_auth(self):
+        return "Bearer token"
+
+    monkeypatch.setattr(AsyncSubmission, "get_auth", mock_auth)
+    return MockClient()
+
+
+def test_publish_submits_draft_instances(client):
+    submission = AsyncSubmission("offer", resource_type="AzureApplication", client=client)
+
+    assert asyncio.run(submission.publish()) == {"id": "submission-1"}
+
+    body = next(body for method, path, body in client.calls if method == "POST")
+    assert client.calls[0][2] == {"$filter": "ExternalIDs/Any(i:i/Type eq 'AzureOfferId' and i/Value eq 'offer')"}
+    assert body["resourceType"] == "SubmissionCreationRequest"
+    assert {"type": "Property", "value": "Property"} in body["resources"]
+    assert {"type": "Package", "value": "Package-a"} in body["variantResources"][0]["resources"]
+    assert [variant["variantID"] for variant in body["variantResources"]] == ["variant-a", "variant-b"]
+
+
+def test_update_all_plans(client, monkeypatch, tmp_path):
+    listing_config = {"plan_overview": {"plan-a": PLAN, "plan-b": PLAN, "plan-c": PLAN}}
+    tmp_path.joinpath("listing_config.json").write_text(json.dumps(listing_config), encoding="utf8")
+    updated = []
+
+    async def mock_update(self):
+        if self.plan_name == "plan-b":
+            raise ValueError("invalid package")
+        updated.append((self.plan_name, await self.get_product_id(), self._ids["plan_id"]))
+        return await self.get_product_id()
+
+    monkeypatch.setattr(AsyncPlan, "update", mock_update)
+    plan = AsyncPlan(name="offer", app_path=str(tmp_path), json_listing_config="listing_config.json", client=client)
+
+    result = asyncio.run(plan.update_all())
+
+    assert result == {
+        "product_id": "product-1",
+        "plans": {
+            "plan-a": {"status": "ok", "plan_id": "variant-a"},
+            "plan-b": {"status": "error", "error": "ValueError: invalid package"},
+            "plan-c": {"status": "error", "error": "LookupError: Plan with this name not found: plan-c"},
+        },
+    }
+    assert updated == [("plan-a", "product-1", "variant-a")]
+    assert len([call for call in client.calls if call[1] == "products"]) == 1
+
+
+def test_update_submission_settings(client, app_path_fix, json_listing_config):
+    submission = AsyncSubmission(
+        "offer",
+        resource_type="AzureApplication",
+        app_path=str(app_path_fix),
+        json_listing_config=json_listing_config,
+        client=client,
+    )
+
+    assert asyncio.run(submission.update()) == "product-1"
+
+    assert _get_requests(client, "PUT", "/properties/")["settings-Property"]["resourceType"] == "AzureProperty"
+    listing = _get_requests(client, "PUT", "/listings/")["settings-Listing"]
+    assert listing["title"] == "MMLSpark on Databricks"
+    assert listing["@odata.etag"] == "etag-Listing"
+    availability = _get_requests(client, "PUT", "/productavailabilities/")["settings-Availability"]
+    assert availability["audiences"][0]["Values"] == ["422895b2-0fda-4709-9ab8-7df1295fedd7"]
+    assert "products/product-1/resellerConfiguration" in [path for method, path, body in client.calls]
+
+    images = _get_requests(client, "PUT", "/listings/settings-Listing/images/")
+    assert sorted(image["fileName"] for image in images.values()) == [
+        "r_216_216.png",
+        "r_255_115.png",
+        "r_48_48.png",
+        "r_90_90.png",
+    ]
+    assert all(image["state"] == "Uploaded" for image in images.values())
+    for image in images.values():
+        assert client.uploads[image["fileSasUri"]] == app_path_fix.joinpath(image["fileName"]).read_bytes()
+
+
+def test_set_logos_skips_unchanged_logos(client, app_path_fix, json_listing_config):
+    submission = AsyncSubmission(
+        "offer", app_path=str(app_path_fix), json_listing_config=json_listing_config, client=client
+    )
+    logos = {"AzureLogoLarge": "r_216_216.png", "AzureLogoSmall": "r_48_48.png"}
+
+    first = asyncio.run(submission._set_logos("listing-1", logos))
+    second = asyncio.run(submission._set_logos("listing-1", logos))
+
+    assert all(first.values())
+    assert second == {"AzureLogoLarge": None, "AzureLogoSmall": None}
+    assert len(client.uploads) == 2
+    assert not [path for method, path, body in client.calls if method == "DELETE"]
+
+
+def test_update_plan_settings_and_package(client, app_path_fix, monkeypatch):
+    monkeypatch.chdir(app_path_fix)
+    plan = AsyncPlan(
+        "plan-a", "offer", app_path=str(app_path_fix), json_listing_config="ma_config.json", subtype="ma", client=client
+    )
+
+    assert asyncio.run(plan.update()) == "product-1"
+
+    listing = _get_requests(client, "PUT", "/listings/")["settings-Listing-a"]
+    assert listing["title"] == "<planName*>"
+    assert listing["resourceType"] == "AzureListing"
+    availability = _get_requests(client, "PUT", "/featureavailabilities/")["settings-Availability-a"]
+    assert availability["visibility"] == "private"
+    assert availability["@odata.etag"] == "etag-Availability-a"
+    assert [schedule["marketCodes"] for schedule in availability["priceSchedules"]] == [["CA"], ["US"]]
+
+    assert _get_requests(client, "POST", "/packages")["packages"]["fileName"] == "sample-app.zip"
+    assert _get_requests(client, "PUT", "/packages/")["package-1"]["State"] == "Uploaded"
+    with zipfile.ZipFile(io.BytesIO(client.uploads["https://storage/package-1"])) as package:
+        assert "pid-product-1-partnercenter" in package.read("mainTemplate.json").decode("utf8")
+    configuration = _get_requests(client, "PUT", "/packageconfigurations/")["settings-Package-a"]
+    assert configuration["packageReferences"][0]["value"] == "package-1"
+    assert configuration["version"] == "0.0.0"
+
+
+def test_update_waits_for_every_section_before_raising(client, monkeypatch):
+    finished = []
+
+    async def fail(self):
+        raise ValueError("invalid properties")
+
+    async def update_section(self):
+        for _ in range(10):
+            await asyncio.sleep(0)
+        finished.append(1)
+
+    monkeypatch.setattr(AsyncSubmission, "_update_properties", fail)
+    for section in ["_update_offer_listing", "_update_preview_audience", "_set_resell_through_csps"]:
+        monkeypatch.setattr(AsyncSubmission, section, update_section)
+
+    with pytest.raises(ValueError, match="invalid properties"):
+        asyncio.run(AsyncSubmission("offer", client=client).update())
+    assert len(finished) == 3
@@ -0,0 +1,69 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""azpc batch - Unit Tests"""
+import io
+import json
+
+from azureiai.partner_center import batch
+from azureiai.partner_center.cli_parser import CLIParser
+
+
+class MockSubmission:
+    def __init__(self, name=None, config_yaml=None, **kwargs):
+        if name == "missing":
+            raise NameError(f"{name} not found")
+        self.name = name
+        self.config_yaml = config_yaml
+
+    def show(self):
+        return {"name": self.name, "config": self.config_yaml}
+
+
+def create_cli(argv):
+    return CLIParser(submission_type=MockSubmission, argv=argv)
+
+
+def test_to_argv():
+    assert batch.to_argv({"subgroup": "ma", "command": "show", "args": {"name": "a", "config_yml": "c.yml"}}) == [
+        "ma",
+        "show",
+        "--name",
+        "a",
+        "--config-yml",
+        "c.yml",
+    ]
+    assert batch.to_argv({"subgroup": "ma", "command": "plan", "plan_command": "show", "args": ["--name", "a"]}) == [
+        "ma",
+        "plan",
+        "show",
+        "--name",
+        "a",
+    ]
+
+
+def test_run_batch_streams_results():
+    lines = [
+        json.dumps({"subgroup": "ma", "command": "show", "args": {"name": "first"}}),
+        "",
+        "# comment",
+        json.dumps({"subgroup": "ma", "command": "show", "args": ["--name", "missing"]}),
+        json.dumps({"subgroup": "ma", "command": "show", "args": {"name": "third", "config_yml": "other.yml"}}),
+        "not json",
+    ]
+    output = io.StringIO()
+
+    failures = batch.run_batch(lines, create_cli, max_workers=2, output=output)
+
+    results = {result["line"]: result for result in map(json.loads, output.getvalue().splitlines())}
+    assert failures == 2
+    assert results[1]["result"] == {"name": "first", "config": "config.yml"}
+    assert results[4] == {
+        "line": 4,
+        "argv": ["ma", "show", "--name", "missing"],
+        "status": "error",
+        "error": "NameError: missing not found",
+    }
+    assert results[5]["result"] == {"name": "third", "config": "other.yml"}
+    assert results[6]["status"] == "error"
+    assert sorted(results) == [1, 4, 5, 6]
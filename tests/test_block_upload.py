@@ -0,0 +1,134 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Block Blob Upload - Unit Tests against a local Blob stand-in"""
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from azureiai.managed_apps import block_upload
+from azureiai.managed_apps.block_upload import (
+    BLOCK_SIZE,
+    UPLOAD_RETRIES,
+    UPLOAD_WORKERS,
+    BlockUploader,
+    BlockUploadError,
+)
+from azureiai.managed_apps.confs.offer_configurations import OfferConfigurations
+
+
+class BlobStandIn(BaseHTTPRequestHandler):
+    """Minimal Block Blob endpoint: Put Block, Get Block List and Put Block List"""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        blocks = "".join(
+            f"<Block><Name>{block_id}</Name><Size>{len(data)}</Size></Block>"
+            for block_id, data in self.server.staged.items()
+        )
+        self._respond(200, f"<BlockList><UncommittedBlocks>{blocks}</UncommittedBlocks></BlockList>".encode("utf8"))
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        query = parse_qs(urlparse(self.path).query)
+        data = self.rfile.read(int(self.headers["Content-Length"]))
+        assert query["sig"] == ["secret"]
+        if query["comp"] == ["block"]:
+            self.server.requests.append(query["blockid"][0])
+            if self.server.failures:
+                self.server.failures -= 1
+                self._respond(self.server.failure_status)
+                return
+            self.server.staged[query["blockid"][0]] = data
+        else:
+            block_ids = re.findall("<Latest>(.*?)</Latest>", data.decode("utf8"))
+            self.server.blob = b"".join(self.server.staged[block_id] for block_id in block_ids)
+            self.server.content_type = self.headers["x-ms-blob-content-type"]
+        self._respond(201)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def _respond(self, status, body=b""):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def blob_server(monkeypatch):
+    monkeypatch.setattr(block_upload, "RETRY_DELAY", 0)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BlobStandIn)
+    server.staged, server.requests, server.failures, server.blob = {}, [], 0, None
+    server.failure_status = 503
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def large_file(tmp_path):
+    file_path = tmp_path.joinpath("app.zip")
+    file_path.write_bytes(bytes(range(256)) * 41)
+    return file_path
+
+
+def test_block_upload(blob_server, large_file):
+    sas_url = f"http://127.0.0.1:{blob_server.server_port}/container/app.zip?sv=2019-12-12&sig=secret"
+    blob_server.failures = 1
+
+    status = BlockUploader(block_size=1000, max_workers=4).upload(sas_url, large_file, "application/zip")
+
+    assert status == 201
+    assert blob_server.blob == large_file.read_bytes()
+    assert blob_server.content_type == "application/zip"
+    assert len(blob_server.staged) == 11
+    assert len(blob_server.requests) == 12
+
+
+def test_block_upload_resumes(blob_server, large_file):
+    sas_url = f"http://127.0.0.1:{blob_server.server_port}/container/app.zip?sig=secret"
+    blob_server.failures = 100
+    with pytest.raises(ConnectionError):
+        BlockUploader(block_size=1000, max_workers=1, retries=0, attempts=1).upload(
+            sas_url, large_file, "application/zip"
+        )
+
+    blob_server.failures = 0
+    uploader = BlockUploader(block_size=1000, max_workers=1)
+    uploader._stage_block(sas_url, large_file, 0, 0, {})
+    uploader._stage_block(sas_url, large_file, 1, 1000, {})
+    blob_server.requests.clear()
+
+    assert uploader.upload(sas_url, large_file, "application/zip") == 201
+    assert blob_server.blob == large_file.read_bytes()
+    assert len(blob_server.requests) == 9
+
+
+def test_block_upload_raises_permanent_errors(blob_server, large_file):
+    sas_url = f"http://127.0.0.1:{blob_server.server_port}/container/app.zip?sig=secret"
+    blob_server.failures, blob_server.failure_status = 100, 403
+
+    with pytest.raises(BlockUploadError) as error:
+        BlockUploader(block_size=1000, max_workers=1, retries=0, attempts=3).upload(
+            sas_url, large_file, "application/zip"
+        )
+
+    assert error.value.status == 403
+    assert len(set(blob_server.requests)) == len(blob_server.requests)
+
+
+def test_upload_using_sas_resumes_interrupted_upload(blob_server, large_file, monkeypatch):
+    monkeypatch.setenv(BLOCK_SIZE, "1000")
+    monkeypatch.setenv(UPLOAD_WORKERS, "1")
+    monkeypatch.setenv(UPLOAD_RETRIES, "0")
+    sas_url = f"http://127.0.0.1:{blob_server.server_port}/container/app.zip?sig=secret"
+    blob_server.failures = 1
+
+    assert OfferConfigurations.upload_using_sas(sas_url, str(large_file)) == 201
+
+    assert blob_server.blob == large_file.read_bytes()
+    assert len(blob_server.requests) == 12
+    assert blob_server.requests.count(blob_server.requests[0]) == 2
@@ -0,0 +1,55 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Branch Cache - Unit Tests"""
+from collections import namedtuple
+
+import pytest
+from azureiai.managed_apps.confs import Properties
+from azureiai.managed_apps.confs.variant.variant_plan_configuration import VariantPlanConfiguration
+from azureiai.managed_apps.utils import get_draft_instance_id
+from swagger_client import BranchesApi
+
+Branch = namedtuple("branch", ["variant_id", "current_draft_instance_id"])
+
+
+@pytest.fixture
+def branches_mock(monkeypatch):
+    calls = []
+
+    def mock_branches_get(self, product_id, module, authorization):
+        calls.append((product_id, module))
+        value = [Branch(None, f"{module}-product"), Branch("plan-1", f"{module}-plan-1")]
+        return namedtuple("response", ["value"])(value)
+
+    monkeypatch.setattr(BranchesApi, "products_product_id_branches_get_by_module_modulemodule_get", mock_branches_get)
+    return calls
+
+
+def test_branch_cache_shared(branch_cache, branches_mock):
+    assert get_draft_instance_id("product-id", "", "Property") == "Property-product"
+    assert Properties("product-id", "")._get_draft_instance_id("Property") == "Property-product"
+
+    plan = VariantPlanConfiguration("product-id", "plan-1", "")
+    assert plan._get_draft_instance_id("Property") == "Property-plan-1"
+
+    assert branches_mock == [("product-id", "Property")]
+
+
+def test_branch_cache_invalidate(branch_cache, branches_mock):
+    branch_cache.get("product-id", "", "Listing")
+    branch_cache.get("other-id", "", "Listing")
+    branch_cache.invalidate("product-id")
+    branch_cache.get("product-id", "", "Listing")
+    branch_cache.get("other-id", "", "Listing")
+
+    assert branches_mock == [("product-id", "Listing"), ("other-id", "Listing"), ("product-id", "Listing")]
+
+
+def test_branch_cache_refreshes_new_variant(branch_cache, branches_mock):
+    branch_cache.get("product-id", "", "Package")
+    assert branch_cache.get_variant("product-id", "", "Package", "plan-1") == "Package-plan-1"
+
+    branch_cache._entries[("product-id", "Package")] = {None: "stale"}
+    assert branch_cache.get_variant("product-id", "", "Package", "plan-1") == "Package-plan-1"
+    assert len(branches_mock) == 2
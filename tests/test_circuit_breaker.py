@@ -0,0 +1,153 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Circuit Breaker - Unit Tests"""
+import asyncio
+
+import pytest
+from azureiai.managed_apps import circuit_breaker
+from azureiai.managed_apps.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    get_endpoint_family,
+)
+
+PARTNER_CENTER = "https://api.partner.microsoft.com/v1.0/ingestion"
+LISTINGS = f"{PARTNER_CENTER}/products/product-1/listings/getByInstanceID(instanceID=1)"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+class HttpError(Exception):
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker, "time", clock)
+    return clock
+
+
+def _fail(status):
+    def send():
+        raise HttpError(status)
+
+    return send
+
+
+@pytest.mark.parametrize(
+    "url, family",
+    [
+        (f"{PARTNER_CENTER}/products", "products"),
+        (f"{PARTNER_CENTER}/products/product-1", "products"),
+        (f"{PARTNER_CENTER}/products/product-1/branches/getByModule(module=Listing)", "branches"),
+        (f"{PARTNER_CENTER}/products/product-1/listings/listing-1/images/image-1", "listings"),
+        (f"{PARTNER_CENTER}/products/product-1/submissions/submission-1/promote", "submissions"),
+        ("https://account.blob.core.windows.net/container/app.zip?sig=secret", "account.blob.core.windows.net"),
+    ],
+)
+def test_endpoint_family(url, family):
+    assert get_endpoint_family(url) == family
+
+
+def test_circuit_opens_and_recovers(clock):
+    breaker = CircuitBreaker(failures=2, reset_timeout=30)
+    events = []
+    breaker.add_listener(lambda *event: events.append(event))
+
+    for _ in range(2):
+        with pytest.raises(HttpError):
+            breaker.call(LISTINGS, _fail(500))
+    assert breaker.get_state("listings") == OPEN
+
+    with pytest.raises(CircuitOpenError):
+        breaker.call(LISTINGS, lambda: "not sent")
+    assert breaker.call(f"{PARTNER_CENTER}/products/product-1/packages", lambda: "sent") == "sent"
+
+    clock.now += 31
+    with pytest.raises(HttpError):
+        breaker.call(LISTINGS, _fail(502))
+    assert breaker.get_state("listings") == OPEN
+
+    clock.now += 31
+    assert breaker.call(LISTINGS, lambda: "probe") == "probe"
+    assert events == [
+        ("listings", CLOSED, OPEN),
+        ("listings", OPEN, HALF_OPEN),
+        ("listings", HALF_OPEN, OPEN),
+        ("listings", OPEN, HALF_OPEN),
+        ("listings", HALF_OPEN, CLOSED),
+    ]
+
+
+def test_client_errors_and_latency(clock):
+    breaker = CircuitBreaker(failures=2, latency=10)
+
+    for _ in range(3):
+        with pytest.raises(HttpError):
+            breaker.call(LISTINGS, _fail(404))
+    assert breaker.get_state("listings") == CLOSED
+
+    def slow():
+        clock.now += 11
+        return "slow"
+
+    before = []
+    for _ in range(2):
+        assert breaker.call(LISTINGS, slow, before=lambda: before.append(1)) == "slow"
+    assert breaker.get_state("listings") == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(LISTINGS, slow, before=lambda: before.append(1))
+    assert len(before) == 2
+
+
+def test_slow_blob_uploads_do_not_open_circuit(clock):
+    breaker = CircuitBreaker(failures=2, latency=10)
+    blob = "https://account.blob.core.windows.net/container/app.zip?comp=block&sig=secret"
+
+    def slow_block():
+        clock.now += 120
+        return "created"
+
+    for _ in range(5):
+        assert breaker.call(blob, slow_block) == "created"
+    assert breaker.get_state("account.blob.core.windows.net") == CLOSED
+
+
+def test_failed_before_gives_up_probe(clock):
+    breaker = CircuitBreaker(failures=1, reset_timeout=30)
+
+    def limiter_timeout():
+        raise TimeoutError("rate limiter lock")
+
+    async def async_limiter_timeout():
+        limiter_timeout()
+
+    async def send():
+        return "sent"
+
+    with pytest.raises(HttpError):
+        breaker.call(LISTINGS, _fail(500))
+    clock.now += 31
+
+    with pytest.raises(TimeoutError):
+        breaker.call(LISTINGS, lambda: "not sent", before=limiter_timeout)
+    assert breaker.get_state("listings") == OPEN
+    with pytest.raises(TimeoutError):
+        asyncio.run(breaker.call_async(LISTINGS, send, before=async_limiter_timeout))
+    assert breaker.get_state("listings") == OPEN
+
+    assert asyncio.run(breaker.call_async(LISTINGS, send)) == "sent"
+    assert breaker.get_state("listings") == CLOSED
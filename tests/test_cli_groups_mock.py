@@ -9,7 +9,7 @@ from adal import AuthenticationContext, adal_error
 from tests import cli_groups_tests as cli_tests
 from swagger_client import ProductApi
 
-import requests
+from azureiai.managed_apps import sessions
 
 
 @pytest.fixture
@@ -87,7 +87,7 @@ def test_vm_create_success_mock(config_yml, vm_config_json, monkeypatch, capsys)
     def mock_create_offer(self, headers, json={}, url=mock_url):
         return CreateMockResponse()
 
-    monkeypatch.setattr(requests, "put", mock_create_offer)
+    monkeypatch.setattr(sessions, "put", mock_create_offer)
     offer_response = cli_tests.vm_create_command(config_yml, vm_config_json, monkeypatch, capsys)
 
     offer = json.loads(offer_response)
@@ -277,7 +277,7 @@ def test_vm_list_success_mock(config_yml, vm_config_json, monkeypatch, capsys):
     def mock_list_offer(self, headers, url=mock_url):
         return MockResponse()
 
-    monkeypatch.setattr(requests, "get", mock_list_offer)
+    monkeypatch.setattr(sessions, "get", mock_list_offer)
 
     response = cli_tests.vm_list_command(config_yml, monkeypatch, capsys)
 
@@ -318,7 +318,7 @@ def test_vm_list_empty_success_mock(config_yml, vm_config_json, monkeypatch, cap
     def mock_list_offer(self, headers, url=mock_url):
         return MockResponse()
 
-    monkeypatch.setattr(requests, "get", mock_list_offer)
+    monkeypatch.setattr(sessions, "get", mock_list_offer)
 
     response = cli_tests.vm_list_command(config_yml, monkeypatch, capsys)
 
@@ -372,7 +372,7 @@ def test_vm_publish_success_mock(config_yml, monkeypatch, capsys):
     def mock_publish_offer(self, headers, url=mock_url, json={}):
         return MockResponse()
 
-    monkeypatch.setattr(requests, "post", mock_publish_offer)
+    monkeypatch.setattr(sessions, "post", mock_publish_offer)
 
     response = cli_tests.vm_publish_command(config_yml, vm_config_json, monkeypatch, capsys)
 
@@ -434,7 +434,7 @@ def test_vm_publish_offer_does_not_exist_mock(config_yml, monkeypatch, capsys):
     def mock_publish_offer(self, headers, url=mock_url, json={}):
         return ShowMockResponse()
 
-    monkeypatch.setattr(requests, "post", mock_publish_offer)
+    monkeypatch.setattr(sessions, "post", mock_publish_offer)
 
     # Expecting a failure as the offer does not exist
     cli_tests.vm_publish_command(config_yml, vm_config_json, monkeypatch, capsys)
@@ -467,7 +467,7 @@ def test_vm_publish_invalid_offer_mock(config_yml, monkeypatch, capsys):
     def mock_publish_offer(self, headers, url=mock_url, json={}):
         return ShowMockResponse()
 
-    monkeypatch.setattr(requests, "post", mock_publish_offer)
+    monkeypatch.setattr(sessions, "post", mock_publish_offer)
 
     # Expecting a failure as the offer does not exist
     cli_tests.vm_publish_command(config_yml, vm_config_json, monkeypatch, capsys)
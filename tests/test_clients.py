@@ -0,0 +1,42 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Shared Swagger API Client - Unit Tests"""
+from azureiai.managed_apps.clients import POOL_MAXSIZE, ClientRegistry
+from azureiai.managed_apps.confs import Listing, Properties
+from swagger_client import BranchesApi, ProductApi
+
+
+def test_registry_shares_client():
+    registry = ClientRegistry()
+    product_api = registry.get_api(ProductApi)
+    branches_api = registry.get_api(BranchesApi)
+
+    assert registry.get_api(ProductApi) is product_api
+    assert product_api.api_client is branches_api.api_client
+    assert product_api.api_client.default_headers["Connection"] == "keep-alive"
+
+
+def test_registry_pool_maxsize(monkeypatch):
+    monkeypatch.setenv(POOL_MAXSIZE, "3")
+    assert ClientRegistry().get_client().configuration.connection_pool_maxsize == 3
+
+    registry = ClientRegistry(pool_maxsize=7)
+    assert registry.get_client().configuration.connection_pool_maxsize == 7
+
+
+def test_registry_close_and_configure():
+    registry = ClientRegistry()
+    client = registry.get_client()
+    registry.close()
+    assert registry.get_client() is not client
+
+    registry.configure(pool_maxsize=2)
+    assert registry.get_client().configuration.connection_pool_maxsize == 2
+
+
+def test_configurations_share_client():
+    listing = Listing(product_id="product-id", authorization="")
+    properties = Properties(product_id="product-id", authorization="")
+    assert listing.branches_api is properties.branches_api
+    assert listing.api.api_client is properties.api.api_client
@@ -0,0 +1,67 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""azpc Daemon - Unit Tests"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+from azureiai.partner_center import daemon
+
+pytestmark = pytest.mark.skipif(not daemon.is_supported(), reason="Unix domain sockets are not supported")
+
+
+def mock_execute(argv):
+    if argv[0] == "fail":
+        print("no such offer", file=sys.stderr)
+        sys.exit(3)
+    if argv[0] == "env":
+        print(os.getenv("TENANT_ID"))
+        return
+    print(" ".join(argv), os.getcwd())
+
+
+@pytest.fixture
+def running_daemon(tmp_path, monkeypatch):
+    socket_path = tmp_path.joinpath("azpc.sock")
+    monkeypatch.setenv(daemon.SOCKET, str(socket_path))
+    server = daemon.Daemon(mock_execute)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.thread = thread
+    while daemon.forward_request({"command": "ping"}) is None:
+        time.sleep(0.01)
+    yield server
+    server.shutdown()
+    thread.join(5)
+
+
+def test_daemon_runs_forwarded_command(running_daemon, tmp_path):
+    response = daemon.forward(["ma", "show", "--name", "offer"])
+    assert response == {"status": 0, "stdout": f"ma show --name offer {os.getcwd()}\n", "stderr": ""}
+
+    response = daemon.forward(["fail"])
+    assert response == {"status": 3, "stdout": "", "stderr": "no such offer\n"}
+
+
+def test_daemon_runs_command_in_client_environment(running_daemon, tmp_path, monkeypatch):
+    monkeypatch.setenv("TENANT_ID", "daemon-tenant")
+    request = {"command": "run", "argv": ["env"], "cwd": str(tmp_path), "env": {"TENANT_ID": "client-tenant"}}
+
+    assert daemon.forward_request(request)["stdout"] == "client-tenant\n"
+    assert os.getenv("TENANT_ID") == "daemon-tenant"
+    assert daemon.forward(["env"])["stdout"] == "daemon-tenant\n"
+
+
+def test_daemon_stop(running_daemon):
+    assert "stopped" in daemon.serve(mock_execute, ["stop"])
+    running_daemon.thread.join(5)
+    assert daemon.forward(["ma", "list"]) is None
+
+
+def test_forward_without_daemon(tmp_path, monkeypatch):
+    monkeypatch.setenv(daemon.SOCKET, str(tmp_path.joinpath("azpc.sock")))
+    assert daemon.forward(["ma", "list"]) is None
+    assert "No azpc daemon" in daemon.serve(mock_execute, ["stop"])
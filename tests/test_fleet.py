@@ -0,0 +1,80 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""azpc fleet - Unit Tests"""
+import io
+import json
+import threading
+
+from azureiai.partner_center import fleet
+from azureiai.partner_center.cli_parser import CLIParser
+
+PUBLISHED = []
+FAST_OFFERS_DONE = threading.Event()
+
+
+class MockSubmission:
+    def __init__(self, name=None, config_yaml=None, app_path=".", json_listing_config=None):
+        self.name = name
+        self.config_yaml = config_yaml
+        self.app_path = app_path
+
+    def update(self):
+        if self.name == "broken":
+            raise LookupError(f"{self.name} not found")
+        if self.name == "slow":
+            FAST_OFFERS_DONE.wait(timeout=5)
+        return self.name
+
+    def publish(self):
+        PUBLISHED.append(self.name)
+        if len(PUBLISHED) == 1:
+            FAST_OFFERS_DONE.set()
+        return {"name": self.name, "config": self.config_yaml}
+
+
+def create_cli(argv):
+    return CLIParser(submission_type=MockSubmission, argv=argv)
+
+
+def _write_offer(root, directory, manifest, config=False):
+    offer_dir = root.joinpath(directory)
+    offer_dir.mkdir(parents=True)
+    offer_dir.joinpath("manifest.yml").write_text(manifest, encoding="utf8")
+    if config:
+        offer_dir.joinpath("config.yml").write_text("tenant_id: tenant\n", encoding="utf8")
+
+
+def test_discover_offers(tmp_path):
+    _write_offer(tmp_path, "b/offer-b", 'name: "named-offer"\napp_path: "app"\njson_listing_config: "b.json"\n')
+    _write_offer(tmp_path, "a", "plan_name: plan\n", config=True)
+
+    offers = fleet.discover_offers(tmp_path, config_yml="shared.yml")
+
+    assert [offer["name"] for offer in offers] == ["a", "named-offer"]
+    assert offers[0]["options"]["config_yml"] == str(tmp_path.joinpath("a", "config.yml"))
+    assert offers[1]["options"] == {
+        "config_yml": "shared.yml",
+        "config_json": "b.json",
+        "app_path": str(tmp_path.joinpath("b", "offer-b", "app")),
+    }
+
+
+def test_run_fleet_isolates_offers(tmp_path):
+    for name in ["slow", "fast", "broken"]:
+        _write_offer(tmp_path, name, f'name: "{name}"\n')
+    output = io.StringIO()
+
+    failures = fleet.run_fleet(fleet.discover_offers(tmp_path), create_cli, max_workers=2, output=output)
+
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    results = {line["offer"]: line for line in lines[:-1]}
+    assert failures == 1
+    assert PUBLISHED == ["fast", "slow"]
+    assert results["broken"]["status"] == "error"
+    assert results["broken"]["stage"] == "update"
+    assert results["broken"]["error"] == "LookupError: broken not found"
+    assert results["slow"]["result"] == {"name": "slow", "config": "config.yml"}
+    assert [line.get("offer") for line in lines].index("slow") == 2
+    assert lines[-1]["summary"]["offers"] == 3
+    assert lines[-1]["summary"]["failed"] == 1
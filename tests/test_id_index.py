@@ -0,0 +1,117 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""ID Index - Unit Tests"""
+import json
+from collections import namedtuple
+
+import pytest
+from azureiai.managed_apps import id_index, token_cache
+from azureiai.managed_apps.id_index import IdIndex
+from azureiai.partner_center import CLIParser, dispatch
+from azureiai.partner_center.submission import Submission
+from swagger_client import ProductApi
+from swagger_client.rest import ApiException
+
+PRODUCT = {"id": "product-1", "name": "offer", "external_i_ds": [{"type": "AzureOfferId", "value": "offer"}]}
+
+
+class Response(namedtuple("response", ["value"])):
+    def to_dict(self):
+        return self.value
+
+
+def login(config_dir, tenant_id, user):
+    subscriptions = [{"tenantId": tenant_id, "user": {"name": user}, "isDefault": True}]
+    config_dir.joinpath(token_cache.AZURE_PROFILE).write_text(json.dumps({"subscriptions": subscriptions}))
+
+
+@pytest.fixture
+def index(monkeypatch, tmp_path):
+    monkeypatch.setenv(id_index.ID_INDEX, "1")
+    monkeypatch.setenv(token_cache.AZURE_CONFIG_DIR, str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    login(tmp_path, "tenant-a", "user@a")
+    return IdIndex()
+
+
+@pytest.fixture
+def product_api(monkeypatch):
+    calls = []
+
+    def mock_products_get(self, authorization, filter):
+        calls.append("list")
+        return Response({"value": [PRODUCT]})
+
+    def mock_product_get(self, product_id, authorization):
+        calls.append(product_id)
+        if product_id != PRODUCT["id"]:
+            raise ApiException(status=404, reason="Not Found")
+        return Response(PRODUCT)
+
+    monkeypatch.setattr(ProductApi, "products_get", mock_products_get)
+    monkeypatch.setattr(ProductApi, "products_product_id_get", mock_product_get)
+    monkeypatch.setattr(Submission, "get_auth", lambda self: "")
+    return calls
+
+
+def test_id_index_records_and_forgets(index, cache_dir):
+    index.record_products({"offer": "product-1"})
+    index.record_plans("product-1", {"plan-a": "variant-a", "plan-b": "variant-b"})
+
+    assert IdIndex().get_product_id("offer") == "product-1"
+    assert IdIndex().get_plan_id("product-1", "plan-a") == "variant-a"
+    assert cache_dir.joinpath(id_index.INDEX_FILE).is_file()
+
+    index.forget_plan("product-1", "plan-a")
+    assert index.get_plan_id("product-1", "plan-a") is None
+    index.forget_product("offer")
+    assert index.get_product_id("offer") is None
+    assert index.get_plan_id("product-1", "plan-b") is None
+
+
+def test_id_index_is_kept_per_account(index, tmp_path):
+    index.record_products({"offer": "product-1"})
+
+    login(tmp_path, "tenant-b", "user@b")
+    assert IdIndex().get_product_id("offer") is None
+    IdIndex().record_products({"offer": "product-2"})
+
+    login(tmp_path, "tenant-a", "user@a")
+    assert IdIndex().get_product_id("offer") == "product-1"
+
+    tmp_path.joinpath(token_cache.AZURE_PROFILE).unlink()
+    assert IdIndex().get_product_id("offer") is None
+    IdIndex().record_products({"offer": "product-3"})
+    login(tmp_path, "tenant-b", "user@b")
+    assert IdIndex().get_product_id("offer") == "product-2"
+
+
+def test_show_uses_id_index(index, product_api):
+    assert Submission("offer").show() == PRODUCT
+    assert Submission("offer").show() == PRODUCT
+    assert product_api == ["list", "product-1"]
+
+    index.record_products({"offer": "deleted-product"})
+    assert Submission("offer").show() == PRODUCT
+    assert product_api[2:] == ["deleted-product", "list"]
+    assert index.get_product_id("offer") == "product-1"
+
+
+def test_dispatch_confirms_stale_ids_without_replaying(index, product_api):
+    index.record_products({"offer": "deleted-product"})
+    attempts = []
+
+    class CLI(CLIParser):
+        def __init__(self, argv):
+            super().__init__(argv=argv)
+
+        def show(self):
+            attempts.append(1)
+            product_id = Submission("offer").get_product_id()
+            return ProductApi().products_product_id_get(product_id=product_id, authorization="").to_dict()
+
+    assert dispatch(CLI, ["ma", "show", "--name", "offer"]) == PRODUCT
+    assert len(attempts) == 1
+    assert product_api == ["deleted-product", "list", "product-1"]
+    assert index.get_product_id("offer") == "product-1"
@@ -0,0 +1,53 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Import Time Budget for the azpc Entry Point"""
+import json
+import os
+import subprocess  # nosec
+import sys
+from pathlib import Path
+
+IMPORT_BUDGET = "AZPC_IMPORT_BUDGET"
+DEFAULT_IMPORT_BUDGET = 0.04
+HEAVY_MODULES = [
+    "swagger_client",
+    "adal",
+    "azure.identity",
+    "azure.storage.blob",
+    "pygments",
+    "yaml",
+    "requests",
+    "asyncio",
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from azureiai import azpc_app
+for argv in [["azpc", "--help"], ["azpc", "ma", "--help"], ["azpc", "vm", "plan", "--help"]]:
+    sys.argv = argv
+    if argv[1] == "--help":
+        azpc_app.main()
+    else:
+        azpc_app.run(azpc_app.create_cli, argv[1:])
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def _probe() -> dict:
+    result = subprocess.run(  # nosec
+        [sys.executable, "-c", PROBE], capture_output=True, check=True, text=True, cwd=Path(__file__).parents[1]
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_help_does_not_load_heavy_modules():
+    loaded = _probe()["modules"]
+    assert [module for module in HEAVY_MODULES if module in loaded] == []
+
+
+def test_help_import_budget():
+    budget = float(os.getenv(IMPORT_BUDGET, str(DEFAULT_IMPORT_BUDGET)))
+    assert min(_probe()["seconds"] for _ in range(3)) < budget
@@ -0,0 +1,40 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Listing Config - Unit Tests"""
+import json
+import os
+
+import pytest
+from azureiai.managed_apps.listing_config import ListingConfig, load_listing_config
+
+
+def test_listing_config_parsed_once(tmp_path):
+    config_path = tmp_path.joinpath("listing_config.json")
+    config_path.write_text(json.dumps({"offer_listing": {"title": "first"}}), encoding="utf8")
+
+    listing_config = load_listing_config(config_path)
+    assert load_listing_config(str(config_path)) is listing_config
+    assert listing_config["offer_listing"]["title"] == "first"
+
+    config_path.write_text(json.dumps({"offer_listing": {"title": "second"}}), encoding="utf8")
+    stat = os.stat(config_path)
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert load_listing_config(config_path)["offer_listing"]["title"] == "second"
+
+
+def test_listing_config_plan_index():
+    listing_config = ListingConfig({"plan_overview": {"plan-a": {"id": "a"}, "plan-b": {"id": "b"}}})
+
+    assert listing_config.get_plan() == {"id": "a"}
+    assert listing_config.get_plan("plan-b") == {"id": "b"}
+    with pytest.raises(KeyError):
+        listing_config.get_plan("plan-c")
+
+
+def test_listing_config_plan_list():
+    listing_config = ListingConfig({"plan_overview": [{"id": "only"}]})
+
+    assert listing_config.get_plan() == {"id": "only"}
+    assert listing_config.get_plan("any-plan") == {"id": "only"}
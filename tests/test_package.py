@@ -0,0 +1,76 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Package Configuration - Unit Tests"""
+import time
+import zipfile
+from collections import namedtuple
+
+import pytest
+from azureiai.managed_apps.confs.variant import package
+from azureiai.managed_apps.confs.variant.package import Package, inject_pid
+from swagger_client import PackageApi
+
+
+def _write_app_zip(source):
+    with zipfile.ZipFile(source, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+        zip_ref.writestr("createUiDefinition.json", '{"handler": "Microsoft.Azure.CreateUIDef"}' * 100)
+        zip_ref.writestr("mainTemplate.json", '{"name": "pid-old-guid-partnercenter"}')
+        zip_ref.writestr("nested/script.sh", "echo hello\n" * 100)
+
+
+def test_inject_pid_copies_entries_raw(tmp_path):
+    source = tmp_path.joinpath("app.zip")
+    _write_app_zip(source)
+    source_bytes = source.read_bytes()
+
+    output = tmp_path.joinpath("upload.zip")
+    inject_pid(str(source), "new-guid", str(output))
+
+    assert source.read_bytes() == source_bytes
+    with zipfile.ZipFile(source) as zip_in, zipfile.ZipFile(output) as zip_out:
+        assert zip_out.testzip() is None
+        assert zip_out.namelist() == zip_in.namelist()
+        assert zip_out.read("mainTemplate.json") == b'{"name": "pid-new-guid-partnercenter"}'
+        for name in ["createUiDefinition.json", "nested/script.sh"]:
+            assert zip_out.getinfo(name).compress_size == zip_in.getinfo(name).compress_size
+            assert zip_out.read(name) == zip_in.read(name)
+
+
+def test_inject_pid_recompresses_without_zip_internals(monkeypatch, tmp_path):
+    monkeypatch.setattr(package, "RAW_COPY_MAX_VERSION", (3, 0))
+    source = tmp_path.joinpath("app.zip")
+    _write_app_zip(source)
+
+    output = tmp_path.joinpath("upload.zip")
+    inject_pid(str(source), "new-guid", str(output))
+
+    with zipfile.ZipFile(source) as zip_in, zipfile.ZipFile(output) as zip_out:
+        assert zip_out.testzip() is None
+        assert zip_out.namelist() == zip_in.namelist()
+        assert zip_out.read("mainTemplate.json") == b'{"name": "pid-new-guid-partnercenter"}'
+        assert zip_out.read("nested/script.sh") == zip_in.read("nested/script.sh")
+
+
+def test_check_upload_polls_until_processed(monkeypatch):
+    states = iter(["Uploaded", "InProcessing", "Processed"])
+    sleeps = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+
+    def mock_package_get(self, product_id, package_id, authorization):
+        return namedtuple("response", ["state"])(next(states))
+
+    monkeypatch.setattr(PackageApi, "products_product_id_packages_package_id_get", mock_package_get)
+    package = Package("product-id", "plan-id", "")
+    package._check_upload(namedtuple("response", ["id"])("package-id"))
+
+    assert len(sleeps) == 2
+
+
+def test_check_upload_process_failed(monkeypatch):
+    def mock_package_get(self, product_id, package_id, authorization):
+        return namedtuple("response", ["state"])("ProcessFailed")
+
+    monkeypatch.setattr(PackageApi, "products_product_id_packages_package_id_get", mock_package_get)
+    with pytest.raises(ConnectionError):
+        Package("product-id", "plan-id", "")._check_upload(namedtuple("response", ["id"])("package-id"))
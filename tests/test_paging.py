@@ -0,0 +1,59 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Paging - Unit Tests"""
+import json
+from collections import namedtuple
+
+import pytest
+from azureiai.managed_apps.paging import get_skip_token, iter_pages
+from azureiai.partner_center import CLIParser, run
+from azureiai.partner_center.submission import Submission
+from swagger_client import ProductApi
+
+PAGES = {
+    None: {"value": [{"id": "product-1"}, {"id": "product-2"}], "odata_next_link": "products?$skipToken=page-2"},
+    "page-2": {"value": [{"id": "product-3"}], "odata_next_link": None},
+}
+
+
+class Response(namedtuple("response", ["value"])):
+    def to_dict(self):
+        return self.value
+
+
+@pytest.fixture
+def product_api(monkeypatch):
+    calls = []
+
+    def mock_products_get(self, authorization, filter, skip_token=None):
+        calls.append(skip_token)
+        return Response(PAGES[skip_token])
+
+    monkeypatch.setattr(ProductApi, "products_get", mock_products_get)
+    monkeypatch.setattr(Submission, "get_auth", lambda self: "")
+    return calls
+
+
+def test_get_skip_token():
+    assert get_skip_token("https://api.partner.microsoft.com/products?$filter=x&$skipToken=abc%3D") == "abc="
+    assert get_skip_token("products?$filter=x") is None
+
+
+def test_iter_pages_requests_next_page_lazily(product_api):
+    pages = iter_pages(ProductApi().products_get, authorization="", filter="")
+    assert next(pages)["value"][0]["id"] == "product-1"
+    assert product_api == [None]
+    assert len(list(pages)) == 1
+    assert product_api == [None, "page-2"]
+
+
+def test_list_contents_follows_next_link(product_api):
+    assert Submission().list_contents() == {"value": [{"id": "product-1"}, {"id": "product-2"}, {"id": "product-3"}]}
+
+
+def test_list_ndjson_output(product_api):
+    lines = run(lambda argv: CLIParser(argv=argv), ["ma", "list", "--output", "ndjson"])
+    assert json.loads(next(lines)) == {"id": "product-1"}
+    assert product_api == [None]
+    assert [json.loads(line)["id"] for line in lines] == ["product-2", "product-3"]
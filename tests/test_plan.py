@@ -0,0 +1,99 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Plan - Unit Tests"""
+import json
+from collections import namedtuple
+
+import pytest
+from azureiai.managed_apps import retry
+from azureiai.partner_center.plan import Plan
+from swagger_client import BranchesApi, ProductApi, VariantApi
+
+Branch = namedtuple("Branch", ["variant_id", "current_draft_instance_id"])
+PLAN = {"plan_listing": {}, "pricing_and_availability": {}, "technical_configuration": {}}
+
+
+class Response(namedtuple("response", ["value"])):
+    def to_dict(self):
+        return self.value
+
+
+@pytest.fixture
+def api_calls(monkeypatch):
+    calls = []
+
+    def mock_products_get(self, authorization, filter):
+        calls.append("products")
+        return Response({"value": [{"id": "product-1", "name": "offer"}]})
+
+    def mock_variants_get(self, product_id, authorization):
+        calls.append("variants")
+        variants = [{"id": "variant-a", "externalID": "plan-a"}, {"id": "variant-b", "externalID": "plan-b"}]
+        return Response({"value": variants})
+
+    def mock_branches_get(self, product_id, module, authorization):
+        calls.append(module)
+        return namedtuple("response", ["value"])([Branch(None, module), Branch("variant-a", f"{module}-a")])
+
+    monkeypatch.setattr(ProductApi, "products_get", mock_products_get)
+    monkeypatch.setattr(VariantApi, "products_product_id_variants_get", mock_variants_get)
+    monkeypatch.setattr(BranchesApi, "products_product_id_branches_get_by_module_modulemodule_get", mock_branches_get)
+    monkeypatch.setattr(Plan, "get_auth", lambda self: "")
+    return calls
+
+
+def test_update_all_plans(api_calls, monkeypatch, tmp_path):
+    listing_config = {"plan_overview": {"plan-a": PLAN, "plan-b": PLAN, "plan-c": PLAN}}
+    tmp_path.joinpath("listing_config.json").write_text(json.dumps(listing_config), encoding="utf8")
+    updated = []
+
+    def mock_update(self):
+        if self.plan_name == "plan-b":
+            raise ValueError("invalid package")
+        updated.append((self.plan_name, self.get_product_id(), self.get_plan_id()))
+        return self.get_product_id()
+
+    monkeypatch.setattr(Plan, "update", mock_update)
+
+    result = Plan(name="offer", app_path=str(tmp_path), json_listing_config="listing_config.json").update_all()
+
+    assert result == {
+        "product_id": "product-1",
+        "plans": {
+            "plan-a": {"status": "ok", "plan_id": "variant-a"},
+            "plan-b": {"status": "error", "error": "ValueError: invalid package"},
+            "plan-c": {"status": "error", "error": "LookupError: Plan with this name not found: plan-c"},
+        },
+    }
+    assert updated == [("plan-a", "product-1", "variant-a")]
+    assert sorted(api_calls) == ["Availability", "Listing", "Package", "products", "variants"]
+
+
+def test_update_all_gives_each_plan_a_retry_budget(api_calls, monkeypatch, tmp_path):
+    listing_config = {"plan_overview": {"plan-a": PLAN, "plan-b": PLAN}}
+    tmp_path.joinpath("listing_config.json").write_text(json.dumps(listing_config), encoding="utf8")
+    monkeypatch.setenv(retry.RETRY_BUDGET, "1")
+
+    def mock_update(self):
+        attempts = []
+
+        def send():
+            attempts.append(self.plan_name)
+            if len(attempts) == 1:
+                raise ConnectionError("connection reset")
+            return self.plan_name
+
+        return retry.POLICY.call(send)
+
+    monkeypatch.setattr(Plan, "update", mock_update)
+
+    result = Plan(name="offer", app_path=str(tmp_path), json_listing_config="listing_config.json").update_all(1)
+
+    assert [plan["status"] for plan in result["plans"].values()] == ["ok", "ok"]
+
+
+def test_update_all_needs_named_plans(tmp_path):
+    tmp_path.joinpath("listing_config.json").write_text(json.dumps({"plan_overview": [PLAN]}), encoding="utf8")
+    with pytest.raises(ValueError):
+        Plan(name="offer", app_path=str(tmp_path), json_listing_config="listing_config.json").update_all()
@@ -0,0 +1,89 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Readiness Polling - Unit Tests"""
+import time
+
+import pytest
+from azureiai.managed_apps import polling
+from azureiai.managed_apps.metrics import METRICS
+
+
+def test_poll_ready_returns_immediately(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    METRICS.reset()
+
+    assert polling.poll_until_ready(lambda: "ready", lambda result: result == "ready", metric="test") == "ready"
+    assert not sleeps
+    assert METRICS.snapshot()["observations"]["test.wait_seconds"]["total"] == 0
+
+
+def test_poll_backs_off_until_ready(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    results = iter([None, None, None, "ready"])
+    METRICS.reset()
+
+    result = polling.poll_until_ready(lambda: next(results), lambda value: value == "ready", metric="test")
+
+    assert result == "ready"
+    assert len(sleeps) == 3
+    assert 0.25 <= sleeps[0] <= 0.5
+    assert 1.0 <= sleeps[2] <= 2.0
+    snapshot = METRICS.snapshot()
+    assert snapshot["counters"]["test.polls"] == 4
+    assert snapshot["observations"]["test.wait_seconds"]["total"] == sum(sleeps)
+
+
+def test_poll_gives_up_after_timeout(monkeypatch):
+    monkeypatch.setenv(polling.READINESS_TIMEOUT, "0")
+    assert polling.poll_until_ready(lambda: None, lambda value: value is not None) is None
+
+
+class ThrottledError(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Too Many Requests")
+        self.status = 429
+        self.headers = {"Retry-After": retry_after}
+
+
+def test_poll_honors_retry_after(monkeypatch):
+    sleeps = []
+    progress = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    results = iter([ThrottledError("7"), "pending", "ready"])
+    METRICS.reset()
+
+    def fetch():
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    result = polling.poll_until_ready(
+        fetch,
+        lambda value: value == "ready",
+        metric="test",
+        on_progress=lambda polls, elapsed, value: progress.append((polls, value)),
+    )
+
+    assert result == "ready"
+    assert sleeps[0] == 7
+    assert progress == [(2, "pending")]
+    snapshot = METRICS.snapshot()
+    assert snapshot["counters"]["test.throttled"] == 1
+    assert snapshot["observations"]["test.polls_per_wait"]["max"] == 3
+
+
+def test_poll_raises_other_errors():
+    def fetch():
+        raise ValueError("not throttled")
+
+    with pytest.raises(ValueError):
+        polling.poll_until_ready(fetch, lambda value: True)
+
+
+def test_retry_after_http_date():
+    assert polling.get_retry_after(ThrottledError("Wed, 21 Oct 2015 07:28:00 GMT")) == 0
+    assert polling.get_retry_after(ValueError()) is None
@@ -0,0 +1,74 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Client-side Rate Limiting - Unit Tests"""
+import subprocess  # nosec
+import sys
+from pathlib import Path
+
+import pytest
+from azureiai.managed_apps import rate_limit
+from azureiai.managed_apps.rate_limit import RATE_LIMITS, RateLimiter, parse_rate_limits
+
+URL = "https://api.partner.microsoft.com/v1.0/ingestion/products"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+        self.waits = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.waits.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+def test_parse_rate_limits():
+    assert parse_rate_limits("a.com=5/10, b.com=0.5,") == {"a.com": (5.0, 10.0), "b.com": (0.5, 1.0)}
+    with pytest.raises(ValueError):
+        parse_rate_limits("a.com")
+
+
+def test_rate_limit_from_environment(monkeypatch):
+    monkeypatch.setenv(RATE_LIMITS, "api.partner.microsoft.com=0,example.com=2")
+    assert RateLimiter().get_limit("api.partner.microsoft.com") == (0.0, 1.0)
+    assert RateLimiter().get_limit("example.com") == (2.0, 2.0)
+    assert RateLimiter().get_limit("blob.core.windows.net") == (0.0, 0.0)
+
+
+def test_rate_limit_burst_then_rate(clock, tmp_path):
+    limiter = RateLimiter({"api.partner.microsoft.com": (2.0, 3.0)}, path=tmp_path)
+
+    assert [limiter.acquire(URL) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire(URL) == 0.5
+    assert limiter.acquire(URL) == 0.5
+
+    clock.now += 10
+    assert limiter.acquire(URL) == 0.0
+    assert limiter.acquire("https://blob.core.windows.net/container/app.zip") == 0.0
+    assert clock.waits == [0.5, 0.5]
+
+
+def test_rate_limit_shared_across_processes(tmp_path, monkeypatch):
+    limits = {"api.partner.microsoft.com": (0.01, 2.0)}
+    script = (
+        "from azureiai.managed_apps.rate_limit import RateLimiter;"
+        f"RateLimiter({limits!r}, path={str(tmp_path)!r}).acquire({URL!r})"
+    )
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", script], check=True, cwd=Path(__file__).parents[1])  # nosec
+
+    waits = []
+    monkeypatch.setattr(rate_limit.time, "sleep", waits.append)
+    assert RateLimiter(limits, path=tmp_path).acquire(URL) > 90
+    assert len(waits) == 1
@@ -0,0 +1,93 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Retry Policy - Unit Tests"""
+from collections import namedtuple
+
+import pytest
+from azureiai.managed_apps import retry
+from azureiai.managed_apps.metrics import METRICS
+from azureiai.managed_apps.retry import RetryPolicy, classify
+
+Response = namedtuple("Response", ["status_code", "headers"])
+
+
+class HttpError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(status)
+        self.status = status
+        self.headers = headers or {}
+
+
+@pytest.fixture
+def waits(monkeypatch):
+    waits = []
+    monkeypatch.setattr(retry.time, "sleep", waits.append)
+    METRICS.reset()
+    return waits
+
+
+def _responses(*responses):
+    responses = list(responses)
+
+    def send():
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    return send
+
+
+@pytest.mark.parametrize(
+    "method, outcome, reason",
+    [
+        ("POST", Response(429, {}), "throttled"),
+        ("POST", HttpError(503), "throttled"),
+        ("POST", HttpError(500), None),
+        ("PUT", HttpError(502), "server_error"),
+        ("GET", ConnectionResetError(), "connection"),
+        ("POST", TimeoutError(), None),
+        ("GET", HttpError(404), None),
+        ("GET", Response(200, {}), None),
+    ],
+)
+def test_classify(method, outcome, reason):
+    assert classify(method, outcome) == reason
+
+
+def test_retry_honors_retry_after(waits):
+    send = _responses(HttpError(429, {"Retry-After": "7"}), Response(503, {}), Response(201, {}))
+
+    assert RetryPolicy(base_delay=1).call(send, method="POST").status_code == 201
+    assert waits[0] == 7
+    assert 1 <= waits[1] <= 2
+    assert METRICS.snapshot()["counters"]["retry.throttled"] == 2
+
+
+def test_retry_gives_up(waits):
+    assert RetryPolicy(retries=2).call(_responses(*[Response(500, {})] * 3), method="GET").status_code == 500
+    assert len(waits) == 2
+
+    with pytest.raises(HttpError):
+        RetryPolicy(retries=2).call(_responses(HttpError(500)), method="POST")
+    assert len(waits) == 2
+
+
+def test_retry_budget(waits, monkeypatch):
+    monkeypatch.setenv(retry.RETRY_BUDGET, "3")
+    retry.start_command()
+
+    with pytest.raises(HttpError):
+        RetryPolicy(retries=5).call(_responses(*[HttpError(503)] * 6))
+    assert len(waits) == 3
+    assert METRICS.snapshot()["counters"]["retry.budget_exhausted"] == 1
+
+    retry.start_command()
+    assert RetryPolicy().call(_responses(HttpError(503), Response(200, {}))).status_code == 200
+
+
+def test_retry_until_ready(waits):
+    send = _responses({}, {}, {None: "draft-instance-id"})
+    assert RetryPolicy().call(send, should_retry=lambda ids: None not in ids) == {None: "draft-instance-id"}
+    assert len(waits) == 2
@@ -0,0 +1,67 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Schema Validation - Unit Tests"""
+import json
+from pathlib import Path
+
+import pytest
+from azureiai.managed_apps import schema
+from azureiai.managed_apps.schema import SchemaValidationError
+
+SAMPLE_APP = Path(__file__).parents[0].joinpath("sample_app")
+ROOT = Path(__file__).parents[1]
+
+
+@pytest.mark.parametrize(
+    "path, schema_name",
+    [
+        (SAMPLE_APP.joinpath("sample_app_listing_config.json"), schema.LISTING_CONFIG_SCHEMA),
+        (SAMPLE_APP.joinpath("st_config.json"), schema.LISTING_CONFIG_SCHEMA),
+        (ROOT.joinpath("template.listing_config.json"), schema.LISTING_CONFIG_SCHEMA),
+        (ROOT.joinpath("template.config.yml"), schema.CONFIG_SCHEMA),
+        (SAMPLE_APP.joinpath("manifest.yml"), schema.MANIFEST_SCHEMA),
+    ],
+)
+def test_sample_files_match_schema(path, schema_name):
+    schema.validate_file(path, schema_name)
+
+
+def test_listing_config_reports_all_errors(tmp_path):
+    with open(SAMPLE_APP.joinpath("sample_app_listing_config.json"), "r", encoding="utf8") as read_file:
+        listing_config = json.load(read_file)
+    del listing_config["offer_listing"]["title"]
+    listing_config["offer_listing"]["listing_logos"].pop("logo_wide")
+    listing_config["plan_overview"] = {"plan-a": {"plan_listing": {}}}
+    config_path = tmp_path.joinpath("listing_config.json")
+    config_path.write_text(json.dumps(listing_config), encoding="utf8")
+
+    with pytest.raises(SchemaValidationError) as error:
+        schema.validate_file(config_path, schema.LISTING_CONFIG_SCHEMA)
+
+    assert error.value.errors == [
+        "$.offer_listing: missing required key 'title'",
+        "$.offer_listing.listing_logos: missing required key 'logo_wide'",
+        "$.plan_overview.plan-a: missing required key 'pricing_and_availability'",
+        "$.plan_overview.plan-a: missing required key 'technical_configuration'",
+    ]
+
+
+def test_validation_disabled(tmp_path, monkeypatch):
+    config_path = tmp_path.joinpath("config.yml")
+    config_path.write_text("tenant_id: 1\n", encoding="utf8")
+    with pytest.raises(SchemaValidationError):
+        schema.validate_file(config_path, schema.CONFIG_SCHEMA)
+
+    monkeypatch.setenv(schema.VALIDATE, "0")
+    schema.validate_file(config_path, schema.CONFIG_SCHEMA)
+
+
+def test_compile_schema_types_and_bounds():
+    check = schema.compile_schema(
+        {"type": "array", "items": {"type": "string", "enum": ["a", "b"]}, "maxItems": 2, "uniqueItems": True}
+    )
+    errors = []
+    check(["a", "a", 1], "$", errors)
+
+    assert errors == ["$[2]: expected string, got int", "$: expected at most 2 items, got 3", "$: 'a' is not unique"]
@@ -0,0 +1,94 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Shared HTTP Sessions - Unit Tests"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from azureiai.managed_apps.confs.offer_configurations import OfferConfigurations
+from azureiai.managed_apps.sessions import READ_TIMEOUT, SessionRegistry
+
+
+class FlakyBlobStandIn(BaseHTTPRequestHandler):
+    """Blob endpoint answering 503 to the first upload and 201 afterwards, recording the bytes of every upload"""
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        self.server.bodies.append(self.rfile.read(int(self.headers["Content-Length"])))
+        self.send_response(503 if len(self.server.bodies) == 1 else 201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture
+def flaky_blob_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyBlobStandIn)
+    server.bodies = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_sessions_share_adapter():
+    registry = SessionRegistry(pool_connections=2, pool_maxsize=4)
+    sessions = []
+
+    def get_session():
+        sessions.append(registry.get_session())
+
+    thread = threading.Thread(target=get_session)
+    thread.start()
+    thread.join()
+    get_session()
+
+    assert sessions[0] is not sessions[1]
+    assert sessions[0].get_adapter("https://example.com") is sessions[1].get_adapter("https://example.com")
+    assert registry.get_session() is sessions[1]
+
+
+def test_sessions_default_timeout(monkeypatch):
+    calls = []
+
+    def mock_request(self, method, url, **kwargs):
+        calls.append((method, url, kwargs))
+
+    monkeypatch.setattr(requests.Session, "request", mock_request)
+    monkeypatch.setenv(READ_TIMEOUT, "42")
+
+    registry = SessionRegistry()
+    registry.request("PUT", "https://example.com", data=b"")
+    registry.request("GET", "https://example.com", timeout=1)
+
+    assert calls[0][2]["timeout"][1] == 42.0
+    assert calls[1][2]["timeout"] == 1
+
+
+def test_sessions_close():
+    registry = SessionRegistry()
+    session = registry.get_session()
+    registry.close()
+    assert registry.get_session() is not session
+
+
+def test_retried_upload_resends_file(flaky_blob_server, tmp_path):
+    file_path = tmp_path.joinpath("logo.png")
+    file_path.write_bytes(bytes(range(250)) * 20)
+    sas_url = f"http://127.0.0.1:{flaky_blob_server.server_port}/container/logo.png?sig=secret"
+
+    assert OfferConfigurations.upload_using_sas(sas_url, str(file_path)) == 201
+
+    assert flaky_blob_server.bodies == [file_path.read_bytes(), file_path.read_bytes()]
+
+
+def test_streamed_body_is_not_retried(flaky_blob_server):
+    url = f"http://127.0.0.1:{flaky_blob_server.server_port}/container/stream"
+
+    response = SessionRegistry().request("PUT", url, data=iter([b"chunk"]), headers={"Content-Length": "5"})
+
+    assert response.status_code == 503
+    assert flaky_blob_server.bodies == [b"chunk"]
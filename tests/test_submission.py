@@ -0,0 +1,47 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Submission - Unit Tests"""
+from collections import namedtuple
+
+import pytest
+from azureiai.managed_apps.utils import resolve_draft_instance_ids
+from azureiai.partner_center.submission import SUBMISSION_MODULES, Submission
+from swagger_client import BranchesApi
+
+Branch = namedtuple("branch", ["variant_id", "current_draft_instance_id"])
+
+
+@pytest.fixture
+def branches_mock(monkeypatch):
+    calls = []
+
+    def mock_branches_get(self, product_id, module, authorization):
+        calls.append(module)
+        value = [Branch(None, f"{module}-product"), Branch("plan-1", f"{module}-plan-1")]
+        return namedtuple("response", ["value"])(value)
+
+    monkeypatch.setattr(BranchesApi, "products_product_id_branches_get_by_module_modulemodule_get", mock_branches_get)
+    return calls
+
+
+def test_resolve_draft_instance_ids(branches_mock):
+    draft_instance_ids = resolve_draft_instance_ids("product-id", "", SUBMISSION_MODULES, max_workers=2)
+
+    assert sorted(branches_mock) == sorted(SUBMISSION_MODULES)
+    assert draft_instance_ids["Listing"][None] == "Listing-product"
+    assert draft_instance_ids["Package"]["plan-1"] == "Package-plan-1"
+
+
+def test_submission_body(branches_mock):
+    submission = Submission("test_ma")
+    submission._ids["product_id"] = "product-id"
+    draft_instance_ids = resolve_draft_instance_ids("product-id", "", SUBMISSION_MODULES)
+
+    body = submission._get_submission_body(draft_instance_ids, ["plan-1"])
+
+    assert body["resources"][0] == {"type": "Availability", "value": "Availability-product"}
+    assert body["resources"][-1] == {"type": "ResellerConfiguration", "value": "product-id-ResellerInstance"}
+    assert body["variantResources"][0]["resources"][2] == {"type": "Listing", "value": "Listing-plan-1"}
+    with pytest.raises(ValueError):
+        submission._get_submission_body(draft_instance_ids, ["plan-2"])
@@ -0,0 +1,99 @@
+#  ---------------------------------------------------------
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#  ---------------------------------------------------------
+"""Token Cache - Unit Tests"""
+import json
+import os
+import stat
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import azure.identity
+from azureiai.managed_apps import token_cache
+
+
+def test_token_cache_reuses_token(cache_dir):
+    acquired = []
+
+    def acquire():
+        acquired.append(1)
+        return f"token-{len(acquired)}", time.time() + 3600
+
+    assert token_cache.get_token("tenant", "client", "https://api.partner.microsoft.com", acquire) == "token-1"
+    assert token_cache.get_token("tenant", "client", "https://api.partner.microsoft.com", acquire) == "token-1"
+    assert token_cache.get_token("tenant", "client", "https://cloudpartner.azure.com", acquire) == "token-2"
+    assert len(acquired) == 2
+
+    cache_file = token_cache.get_token_path("tenant", "client", "https://api.partner.microsoft.com")
+    assert cache_file.parent == cache_dir.joinpath(token_cache.TOKEN_CACHE_DIR)
+    if os.name != "nt":
+        assert stat.S_IMODE(os.stat(cache_file).st_mode) == 0o600
+
+
+def test_token_cache_refreshes_before_expiry(cache_dir, monkeypatch):
+    monkeypatch.setenv(token_cache.TOKEN_REFRESH_MARGIN, "300")
+    tokens = iter([("old", time.time() + 200), ("new", time.time() + 3600)])
+
+    assert token_cache.get_token("tenant", "client", "resource", lambda: next(tokens)) == "old"
+    assert token_cache.get_token("tenant", "client", "resource", lambda: next(tokens)) == "new"
+
+
+def test_token_cache_disabled(cache_dir, monkeypatch):
+    monkeypatch.setenv(token_cache.TOKEN_CACHE, "0")
+    assert token_cache.get_token("tenant", "client", "resource", lambda: ("token", time.time() + 3600)) == "token"
+    assert not cache_dir.joinpath(token_cache.TOKEN_CACHE_DIR).exists()
+
+
+def test_token_cache_returns_expiry(cache_dir):
+    expires_on = time.time() + 3600
+    access_token = token_cache.get_access_token("tenant", "client", "resource", lambda: ("token", expires_on))
+    assert access_token == token_cache.AccessToken("token", expires_on)
+    assert not token_cache.needs_refresh(access_token)
+    assert token_cache.needs_refresh(token_cache.AccessToken("token", time.time() + 60))
+
+
+def test_token_cache_acquires_resources_concurrently(cache_dir):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def acquire():
+        barrier.wait()
+        return "token", time.time() + 3600
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(token_cache.get_token, "tenant", "client", resource, acquire)
+            for resource in ["https://api.partner.microsoft.com", "https://cloudpartner.azure.com"]
+        ]
+        assert [future.result() for future in futures] == ["token", "token"]
+
+
+def test_cli_token_follows_logged_in_account(cache_dir, monkeypatch, tmp_path):
+    monkeypatch.setenv(token_cache.AZURE_CONFIG_DIR, str(tmp_path))
+    acquired = []
+
+    class MockAzureCliCredential:
+        def get_token(self, resource):
+            acquired.append(resource)
+            return namedtuple("token", ["token", "expires_on"])(f"token-{len(acquired)}", time.time() + 3600)
+
+    def login(tenant_id, user):
+        subscriptions = [
+            {"tenantId": "other", "user": {"name": "other"}, "isDefault": False},
+            {"tenantId": tenant_id, "user": {"name": user}, "isDefault": True},
+        ]
+        profile = json.dumps({"subscriptions": subscriptions})
+        tmp_path.joinpath(token_cache.AZURE_PROFILE).write_text(profile, encoding="utf-8-sig")
+
+    monkeypatch.setattr(azure.identity, "AzureCliCredential", MockAzureCliCredential)
+    login("tenant-a", "user@a")
+    assert token_cache.get_cli_token("resource") == "token-1"
+    assert token_cache.get_cli_token("resource") == "token-1"
+
+    login("tenant-b", "user@b")
+    assert token_cache.get_cli_token("resource") == "token-2"
+
+    tmp_path.joinpath(token_cache.AZURE_PROFILE).unlink()
+    assert token_cache.get_cli_token("resource") == "token-3"
+    assert token_cache.get_cli_token("resource") == "token-4"